@@ -0,0 +1,181 @@
+# project_generator/APIexplorer/element_record.py
+# file: element_record.py
+
+import hashlib
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from .source_buffer import SourceBuffer
+except ImportError:
+    from source_buffer import SourceBuffer
+
+
+class StaleSourceError(Exception):
+    """
+    释放后重新从磁盘加载的源码与解析时的内容不一致（文件已被修改），元素偏移不再有效，需要重新解析
+    - symbolName: StaleSourceError
+    """
+
+
+class SourceFile:
+    """
+    共享源码句柄：同一文件的所有元素记录共用一个实例，源码只保存一份。
+    有磁盘路径时支持惰性加载，序列化（跨进程传递）时只携带路径与内容摘要，不携带源码；
+    重新加载时核对摘要，文件已被修改则抛出 StaleSourceError，而不是从新内容中切出错位的片段。
+    - symbolName: SourceFile
+    """
+
+    __slots__ = ('path', 'disk_path', 'digest', '_buffer')
+
+    def __init__(self, path: str, text: Optional[str] = None, disk_path: Optional[str] = None):
+        self.path = path
+        self.disk_path = disk_path
+        self._buffer = SourceBuffer(text) if text is not None else None
+        self.digest = _text_digest(text) if text is not None and disk_path else None
+
+    @property
+    def buffer(self) -> SourceBuffer:
+        if self._buffer is None:
+            text = _load_text(self.disk_path)
+            if self.digest is not None and _text_digest(text) != self.digest:
+                raise StaleSourceError(f'{self.path} 在解析后已被修改，请重新解析')
+            self._buffer = SourceBuffer(text)
+        return self._buffer
+
+    def release(self):
+        """
+        释放已加载的源码（仅当可以从磁盘重新加载时）
+        - symbolName: release
+        """
+        if self.disk_path:
+            self._buffer = None
+
+    def __getstate__(self):
+        # 可从磁盘重新加载时不序列化源码
+        text = None if self.disk_path or self._buffer is None else self._buffer.text
+        return self.path, self.disk_path, self.digest, text
+
+    def __setstate__(self, state):
+        path, disk_path, digest, text = state
+        self.path = path
+        self.disk_path = disk_path
+        self.digest = digest
+        self._buffer = SourceBuffer(text) if text is not None else None
+
+
+def _text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _load_text(disk_path: str) -> str:
+    """
+    按解析时相同的编码顺序（UTF-8 -> GBK）读取源码，保证偏移一致
+    - symbolName: _load_text
+    """
+    try:
+        with open(disk_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(disk_path, 'r', encoding='gbk') as f:
+            return f.read()
+
+
+class ElementRecord:
+    """
+    紧凑的代码元素记录：只保存 (源码句柄, 起止偏移, 起止行, 类型, 限定名) 及少量附加字段，
+    content 按需从共享源码切片得到。兼容原先的字典访问方式（element['content'] 等）。
+    - symbolName: ElementRecord
+    """
+
+    __slots__ = ('source', 'start', 'end', 'start_line', 'end_line', 'kind', 'qualname', 'extra')
+
+    _ALIASES = ('name', 'type', 'content', 'start_line', 'end_line', 'file_path')
+
+    def __init__(self, source: SourceFile, start: int, end: int, start_line: int, end_line: int,
+                 kind: str, qualname: str, extra: Optional[Dict[str, Any]] = None):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.start_line = start_line
+        self.end_line = end_line
+        self.kind = kind
+        self.qualname = qualname
+        self.extra = extra or None
+
+    @classmethod
+    def from_span(cls, source: SourceFile, start: int, end: int, kind: str, qualname: str, **extra):
+        """
+        由字符偏移区间创建记录，行号通过 SourceBuffer 计算
+        - symbolName: from_span
+        """
+        start_line, end_line = source.buffer.line_span(start, end)
+        return cls(source, start, end, start_line, end_line, kind, qualname, extra)
+
+    @classmethod
+    def from_lines(cls, source: SourceFile, start_line: int, end_line: int, kind: str, qualname: str, **extra):
+        """
+        由整行区间创建记录（AST 节点的 lineno/end_lineno），content 与按行切片拼接的结果一致
+        - symbolName: from_lines
+        """
+        buffer = source.buffer
+        start = buffer.offset_of(start_line)
+        if end_line < buffer.line_count:
+            end = buffer.offset_of(end_line + 1) - 1
+        else:
+            end = len(buffer.text)
+        return cls(source, start, end, start_line, end_line, kind, qualname, extra)
+
+    @property
+    def content(self) -> str:
+        return self.source.buffer.text[self.start:self.end]
+
+    # ---- 兼容字典访问 ----
+    def __getitem__(self, key: str) -> Any:
+        if key == 'name':
+            return self.qualname
+        if key == 'type':
+            return self.kind
+        if key == 'content':
+            return self.content
+        if key == 'start_line':
+            return self.start_line
+        if key == 'end_line':
+            return self.end_line
+        if key == 'file_path':
+            return self.source.path
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._ALIASES:
+            raise KeyError(f"{key} 为只读字段")
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ALIASES or bool(self.extra and key in self.extra)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        yield from self._ALIASES
+        if self.extra:
+            yield from self.extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        展开为普通字典（会复制 content）
+        - symbolName: to_dict
+        """
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        return (f"ElementRecord({self.kind} {self.qualname!r} {self.source.path}:"
+                f"{self.start_line}-{self.end_line})")
@@ -0,0 +1,234 @@
+# project_generator/APIexplorer/symbol_index.py
+# file: symbol_index.py
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 字典树中标记“此处为完整名称”的键
+_END = '\0'
+
+
+def short_name(qualname: str) -> str:
+    """
+    限定名的最后一段，如 'Cart.add_item' -> 'add_item'
+    - symbolName: short_name
+    """
+    return qualname.rsplit('.', 1)[-1]
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    小写化并两端补空格后的三元组集合，短名称也至少产生一个三元组
+    - symbolName: trigrams
+    """
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """
+    符号表：按短名称与限定名建立多值映射（同名元素不会互相覆盖），
+    并维护小写前缀字典树（自动补全）与三元组倒排索引（容错/模糊搜索）。
+    登记时给出文件路径的符号可按文件整体移除（文件重新解析前调用 remove_file）。
+    - symbolName: SymbolIndex
+    """
+
+    def __init__(self):
+        self._by_qualname: Dict[str, List[Any]] = {}
+        self._by_short: Dict[str, List[Any]] = {}
+        # 小写名称 -> 原始名称集合（限定名与短名称都会登记）
+        self._names: Dict[str, Set[str]] = {}
+        self._trie: Dict[str, Any] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        # 小写名称 -> 三元组个数，计算相似度时无需重新切分
+        self._gram_counts: Dict[str, int] = {}
+        # 文件路径 -> 该文件登记的 (限定名, 索引项)
+        self._by_file: Dict[str, List[Tuple[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_qualname.values())
+
+    def clear(self):
+        """
+        清空符号表
+        - symbolName: clear
+        """
+        self.__init__()
+
+    def add(self, qualname: str, entry: Any, file_path: Optional[str] = None):
+        """
+        登记一个符号；entry 为调用方的索引项（如 index_table 中的信息字典），file_path 为其所在文件
+        - symbolName: add
+        """
+        if file_path is not None:
+            self._by_file.setdefault(file_path, []).append((qualname, entry))
+        self._by_qualname.setdefault(qualname, []).append(entry)
+        short = short_name(qualname)
+        if short != qualname:
+            self._by_short.setdefault(short, []).append(entry)
+        self._register_name(qualname)
+        self._register_name(short)
+
+    def _register_name(self, name: str):
+        """
+        把名称加入前缀字典树与三元组索引（同一名称只处理一次）
+        - symbolName: _register_name
+        """
+        lower = name.lower()
+        originals = self._names.get(lower)
+        if originals is not None:
+            originals.add(name)
+            return
+        self._names[lower] = {name}
+
+        node = self._trie
+        for ch in lower:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+
+        grams = trigrams(lower)
+        self._gram_counts[lower] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(lower)
+
+    def remove_file(self, file_path: str) -> int:
+        """
+        移除某文件登记的全部符号；不再被任何符号使用的名称同时从字典树与三元组索引中移除。返回移除的个数
+        - symbolName: remove_file
+        """
+        removed = self._by_file.pop(file_path, [])
+        names = set()
+        for qualname, entry in removed:
+            short = short_name(qualname)
+            _discard(self._by_qualname, qualname, entry)
+            if short != qualname:
+                _discard(self._by_short, short, entry)
+            names.update((qualname, short))
+        for name in names:
+            if name not in self._by_qualname and name not in self._by_short:
+                self._unregister_name(name)
+        return len(removed)
+
+    def _unregister_name(self, name: str):
+        """
+        名称不再使用时从前缀字典树与三元组索引中移除（同一小写名称的其他写法仍在使用时保留）
+        - symbolName: _unregister_name
+        """
+        lower = name.lower()
+        originals = self._names.get(lower)
+        if originals is None:
+            return
+        originals.discard(name)
+        if originals:
+            return
+        del self._names[lower]
+
+        # 删除结束标记后自底向上剪掉空节点
+        path = [self._trie]
+        for ch in lower:
+            path.append(path[-1][ch])
+        del path[-1][_END]
+        for depth in range(len(lower), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][lower[depth - 1]]
+
+        for gram in trigrams(lower):
+            holders = self._trigrams[gram]
+            holders.discard(lower)
+            if not holders:
+                del self._trigrams[gram]
+        del self._gram_counts[lower]
+
+    def lookup(self, name: str) -> List[Any]:
+        """
+        精确查找：先按限定名，再按短名称，结果按登记顺序去重
+        - symbolName: lookup
+        """
+        results = list(self._by_qualname.get(name, ()))
+        seen = {id(entry) for entry in results}
+        for entry in self._by_short.get(name, ()):
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                results.append(entry)
+        return results
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """
+        前缀补全（不区分大小写），返回按字典序排列的名称
+        - symbolName: complete
+        """
+        node = self._trie
+        lower = prefix.lower()
+        for ch in lower:
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        matches: List[str] = []
+        # 按字典序深度优先遍历，收集够 limit 个即停止
+        stack: List[Tuple[str, Dict[str, Any]]] = [(lower, node)]
+        while stack and len(matches) < limit:
+            path, current = stack.pop()
+            if _END in current:
+                matches.extend(sorted(self._names[path]))
+            for ch in sorted((c for c in current if c != _END), reverse=True):
+                stack.append((path + ch, current[ch]))
+        return matches[:limit]
+
+    def fuzzy(self, query: str, limit: int = 10, threshold: float = 0.3) -> List[Tuple[str, float]]:
+        """
+        三元组相似度（Dice 系数）模糊搜索，容忍拼写错误；返回 [(名称, 分数)]，分数降序
+        - symbolName: fuzzy
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        shared = Counter()
+        for gram in query_grams:
+            for lower in self._trigrams.get(gram, ()):
+                shared[lower] += 1
+
+        scored = []
+        for lower, common in shared.items():
+            score = 2.0 * common / (len(query_grams) + self._gram_counts[lower])
+            if score >= threshold:
+                scored.append((score, lower))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        results = []
+        for score, lower in scored[:limit]:
+            for name in sorted(self._names[lower]):
+                results.append((name, round(score, 3)))
+        return results[:limit]
+
+    def search(self, query: str, limit: int = 20) -> List[Any]:
+        """
+        综合搜索：精确匹配优先，其次前缀补全，最后模糊匹配；返回索引项列表
+        - symbolName: search
+        """
+        results = self.lookup(query)
+        seen = {id(entry) for entry in results}
+
+        def extend(names):
+            for name in names:
+                for entry in self.lookup(name):
+                    if len(results) >= limit:
+                        return
+                    if id(entry) not in seen:
+                        seen.add(id(entry))
+                        results.append(entry)
+
+        extend(self.complete(query, limit))
+        extend(name for name, _ in self.fuzzy(query, limit))
+        return results[:limit]
+
+
+def _discard(mapping: Dict[str, List[Any]], name: str, entry: Any):
+    """从多值映射中按身份移除一个索引项，列表为空时删除该键"""
+    entries = mapping.get(name)
+    if not entries:
+        return
+    entries[:] = [e for e in entries if e is not entry]
+    if not entries:
+        del mapping[name]
@@ -0,0 +1,122 @@
+# file: flashphoto.py
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from BilibiliVideoSystem.config import (
+    OUTPUT_DIR, FLASH_PHOTO_DIR, FLASH_PHOTO_FILE, FLASH_PHOTO_META, FLASH_PHOTO_WORKERS, MAX_PROMPT_FILE_CHARS
+)
+from BilibiliVideoSystem.prompts import FLASH_PHOTO_PROMPT
+from BilibiliVideoSystem.skeleton import build_file_skeleton
+from BilibiliVideoSystem.utils.api_client import call_deepseek
+
+# 参与摘要的文件类型；flashphoto 自身与接口文档目录不参与
+SUMMARY_EXTENSIONS = ('.py', '.html', '.js', '.css', '.json', '.md', '.txt')
+_SKIP_DIRS = (
+    os.path.relpath(FLASH_PHOTO_DIR, OUTPUT_DIR).replace('\\', '/') + '/',
+    'interface_doc/',
+)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def load_flashphoto_meta(meta_path: str = FLASH_PHOTO_META) -> Dict:
+    """读取 flashphoto_meta.json，不存在或损坏时返回空结构。"""
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if isinstance(meta, dict) and isinstance(meta.get('files'), dict):
+            return meta
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {'generated_at': '', 'files': {}}
+
+
+def save_flashphoto(meta: Dict, meta_path: str = FLASH_PHOTO_META, snapshot_path: str = FLASH_PHOTO_FILE) -> None:
+    """写入元数据与 markdown 快照（先写临时文件再原子替换）。"""
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    tmp = meta_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, meta_path)
+
+    snapshot = '\n'.join(f"---FILE: {p}---\n{info['summary']}\n" for p, info in sorted(meta['files'].items()))
+    tmp = snapshot_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(snapshot)
+    os.replace(tmp, snapshot_path)
+
+
+def summarize_file(file_path: str, content: str) -> str:
+    """调用模型为单个文件生成摘要；超长文件发送骨架 + 开头部分。"""
+    if len(content) > MAX_PROMPT_FILE_CHARS:
+        body = (f"[骨架]\n{build_file_skeleton(file_path, content)}\n\n"
+                f"[开头部分]\n{content[:MAX_PROMPT_FILE_CHARS // 2]}")
+    else:
+        body = content
+    prompt = FLASH_PHOTO_PROMPT.format(file_path=file_path, content=body)
+    return call_deepseek(prompt, step="summarize").strip()
+
+
+def _should_summarize(file_path: str) -> bool:
+    norm = file_path.replace('\\', '/')
+    return norm.endswith(SUMMARY_EXTENSIONS) and not norm.startswith(_SKIP_DIRS)
+
+
+def load_flashphoto_summaries(project_files: Dict[str, str], meta_path: str = FLASH_PHOTO_META) -> Dict[str, str]:
+    """
+    读取已有摘要供检索使用，不调用模型：返回 project_files 中现存文件的 {相对路径: 摘要}，
+    内容变更后尚未重新摘要的文件沿用旧摘要（由 update_flashphoto 在检测之后刷新）。
+    """
+    entries = load_flashphoto_meta(meta_path)['files']
+    return {p: entries[p]['summary'] for p in project_files
+            if _should_summarize(p) and entries.get(p, {}).get('summary')}
+
+
+def update_flashphoto(project_files: Dict[str, str], max_workers: int = FLASH_PHOTO_WORKERS,
+                      meta_path: str = FLASH_PHOTO_META, snapshot_path: str = FLASH_PHOTO_FILE) -> Dict[str, str]:
+    """
+    增量维护项目摘要：以文件内容 sha256 为键，只对新增/变更的文件重新摘要（并发执行），
+    删除已不存在文件的条目，结果写回 flashphoto_meta.json。
+    没有 hash 的条目（旧版元数据）视为内容未知，沿用其摘要并记下当前内容的 hash，不重新摘要。
+    返回 {相对路径: 摘要}；单个文件摘要失败时该文件不出现在结果中。
+    """
+    meta = load_flashphoto_meta(meta_path)
+    entries = meta['files']
+    targets = {p: c for p, c in project_files.items() if _should_summarize(p)}
+
+    hashes = {p: content_hash(c) for p, c in targets.items()}
+    adopted = [p for p in hashes if p in entries and 'hash' not in entries[p] and entries[p].get('summary')]
+    for p in adopted:
+        entries[p]['hash'] = hashes[p]
+    changed = {p: h for p, h in hashes.items() if entries.get(p, {}).get('hash') != h}
+
+    removed = [p for p in entries if p not in targets]
+    for p in removed:
+        entries.pop(p)
+
+    if changed:
+        print(f"📸 flashphoto: {len(changed)} 个文件需要重新摘要（共 {len(targets)} 个）")
+
+        def _job(path: str) -> Optional[str]:
+            try:
+                return summarize_file(path, targets[path])
+            except Exception as e:
+                print(f"⚠️ 摘要失败 {path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for path, summary in zip(changed, executor.map(_job, changed)):
+                if summary:
+                    entries[path] = {'path': path, 'summary': summary, 'hash': changed[path]}
+
+    if changed or removed or adopted:
+        meta['generated_at'] = datetime.now().isoformat()
+        save_flashphoto(meta, meta_path, snapshot_path)
+
+    return {p: info['summary'] for p, info in entries.items() if info.get('hash') == hashes.get(p)}
@@ -169,6 +169,7 @@ GENERATE_FILE_PROMPT = """你是一个专业开发工程师。请根据以下项
 # =============== DEBUG 诊断提示模板 ===============
 DEBUG_PROMPT = '''\
 你是资深 Python 工程师和调试专家。下面是用户项目中的相关代码块（路径 -> 内容）和一个问题描述。
+标注为 skeleton 的文件只给出了骨架（函数签名、路由装饰器、类属性、模板块/表单/url_for 目标），函数体已省略，仅用于了解跨文件接口。
 请根据这些信息，对问题进行分析和诊断，找出潜在的 Bug 或改进点。
 你的输出应该是详细的文本诊断结果，**不包含任何文件块**，诊断的结果中包括以文件为单位的精炼步骤。
 
@@ -258,9 +259,39 @@ BUG2_CHECK_PROMPT = """
 
 
 
-# =============== FLASH PHOTO 提示模板 (文档/总结 - 假设保持不变) ===============
-FLASH_PHOTO_PROMPT = '''...'''
-FLASH_PHOTO_QUERY_PROMPT = '''...'''
+# =============== FLASH PHOTO 提示模板 (文件摘要 / 基于摘要的检索) ===============
+FLASH_PHOTO_PROMPT = '''\
+你是资深全栈工程师。请为下面这个项目文件写一段中文摘要（不超过 250 字），供后续定位 bug 时作为检索上下文。
+摘要需要覆盖：
+1. 文件的主要功能
+2. 重要的类、函数、路由或模板块（写出名字）
+3. 关键变量、配置或数据字段
+4. 与项目中其他文件的关联（导入、渲染的模板、url_for 端点、调用的接口等）
+
+只输出摘要正文，不要输出代码、标题或 markdown。
+
+---文件路径---
+{file_path}
+
+---文件内容---
+{content}
+---文件内容结束---
+'''
+
+FLASH_PHOTO_QUERY_PROMPT = '''\
+你是一个 Python 全栈开发专家。下面是项目中每个文件的摘要（路径: 摘要）和一个 bug 报告。
+请根据摘要找出需要修改或新建的文件（相对路径），最多 {max_items} 个。
+只输出一个 JSON 对象，格式如下，不要输出任何解释、代码或 markdown：
+{{"files": [{{"path": "templates/cart.html", "reason": "一句话说明原因"}}]}}
+
+---项目文件摘要---
+{summaries}
+---项目文件摘要结束---
+
+---Bug 报告---
+{bug}
+---Bug 报告结束---
+'''
 
 
 # =============== CODE 提示模板 (任务拆解) ===============
@@ -2,10 +2,25 @@
 import requests
 import json
 # 将现有的相对导入改为：
-from BilibiliVideoSystem.config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL
+from BilibiliVideoSystem.config import DEEPSEEK_API_KEY, DEEPSEEK_API_URL, MODEL_ROUTES
+
+
+def get_model_route(step: str) -> dict:
+    """返回流水线步骤对应的模型路由配置（未知步骤回退到 default）。"""
+    route = dict(MODEL_ROUTES["default"])
+    route.update(MODEL_ROUTES.get(step, {}))
+    return route
+
+
+def call_deepseek(prompt: str, step: str = "default", **overrides) -> str:
+    """
+    调用 DeepSeek，并在发生错误时提供调试信息。
+    step: 流水线步骤名，决定模型、max_tokens、temperature 与超时（见 config.MODEL_ROUTES）。
+    overrides: 临时覆盖路由中的任意字段。
+    """
+    route = get_model_route(step)
+    route.update(overrides)
 
-def call_deepseek(prompt: str) -> str:
-    """调用 DeepSeek，并在发生错误时提供调试信息。"""
     if not DEEPSEEK_API_KEY or DEEPSEEK_API_KEY.startswith("sk-REPLACE"):
         raise RuntimeError("未配置 DEEPSEEK_API_KEY。请在环境变量中设置 DEEPSEEK_API_KEY。")
 
@@ -14,13 +29,17 @@ def call_deepseek(prompt: str) -> str:
         "Content-Type": "application/json",
     }
     payload = {
-        "model": "deepseek-chat",
+        "model": route["model"],
         "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.2,
+        "temperature": route["temperature"],
     }
+    if route.get("max_tokens"):
+        payload["max_tokens"] = route["max_tokens"]
+    if route.get("response_format"):
+        payload["response_format"] = route["response_format"]
 
     try:
-        resp = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=180)
+        resp = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=route["timeout"])
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"请求失败（网络/连接错误）：{e}")
 
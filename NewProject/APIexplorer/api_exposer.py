@@ -4,161 +4,54 @@ import hashlib
 import json
 from typing import Dict, List, Any
 from pathlib import Path
-import ast
+
+try:
+    from .element_record import SourceFile
+    from .parser_registry import DEFAULT_REGISTRY, ParserRegistry
+    from .symbol_index import SymbolIndex
+except ImportError:
+    from element_record import SourceFile
+    from parser_registry import DEFAULT_REGISTRY, ParserRegistry
+    from symbol_index import SymbolIndex
 
 
 class ProfessionalCodeParser:
-    """专业的代码解析器，使用AST进行精确分割"""
+    """专业的代码解析器，使用AST进行精确分割；各文件类型的解析与结果缓存由共享的解析器注册表完成"""
 
-    def __init__(self):
+    def __init__(self, registry: ParserRegistry = None):
         self.function_index = {}
+        self.registry = registry or DEFAULT_REGISTRY
 
-    def parse_with_ast(self, source_code: str) -> Dict[str, Any]:
+    def parse_with_ast(self, source_code: str, file_path: str = "", source: SourceFile = None) -> Dict[str, Any]:
         """
-        使用AST精确解析Python代码
+        使用AST精确解析Python代码；元素为共享源码的 ElementRecord，只记录偏移
         - symbolName: parse_with_ast
         """
-        try:
-            tree = ast.parse(source_code)
-            functions = self._extract_functions_from_ast(tree, source_code)
-            classes = self._extract_classes_from_ast(tree, source_code)
-            methods = self._extract_methods_from_ast(tree, source_code)
-
-            # 建立精确索引
-            all_elements = functions + classes + methods
-            for element in all_elements:
-                func_hash = self._generate_hash(element['name'])
-                self.function_index[func_hash] = element
-
-            return {
-                'functions': functions,
-                'classes': classes,
-                'methods': methods,
-                'elements': all_elements
-            }
-        except SyntaxError as e:
-            return {'error': f'语法错误: {str(e)}'}
-
-    def _extract_functions_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        从AST中提取函数定义
-        - symbolName: _extract_functions_from_ast
-        """
-        functions = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                in_class = False
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            in_class = True
-                            break
-
-                # 如果在类内部，则跳过（由_extract_methods_from_ast处理）
-                if in_class:
-                    continue
-
-                # 获取函数源码
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
-
-                function_source = '\n'.join(lines[start_line:end_line])
+        return self._index(self.registry.parse(source_code, file_path, source, language='python'))
 
-                functions.append({
-                    'name': node.name,
-                    'content': function_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'function',
-                    'args': [arg.arg for arg in node.args.args]
-                })
-
-        return functions
-
-    def _extract_classes_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
+    def parse_file(self, content: str, file_path: str = "", language: str = None) -> Dict[str, Any]:
         """
-        从AST中提取类定义
-        - symbolName: _extract_classes_from_ast
+        按语言名或文件扩展名选择解析器解析任意受支持的文件
+        - symbolName: parse_file
         """
-        classes = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
-
-                class_source = '\n'.join(lines[start_line:end_line])
+        return self._index(self._parse_file_by_type(content, file_path, language))
 
-                classes.append({
-                    'name': node.name,
-                    'content': class_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'class'
-                })
-
-        return classes
-
-    def _extract_methods_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
+    def _parse_file_by_type(self, content: str, file_path: str, language: str = None) -> Dict[str, Any]:
         """
-        从AST中提取方法定义
-        - symbolName: _extract_methods_from_ast
+        根据文件类型选择合适的解析器（未知类型整体作为一个元素）
+        - symbolName: _parse_file_by_type
         """
-        methods = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                parent_class = None
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            parent_class = parent.name
-                            break
-
-                if parent_class:
-                    start_line = node.lineno - 1
-                    end_line = getattr(node, 'end_lineno', start_line + 1)
+        return self.registry.parse(content, file_path, language=language)
 
-                    method_source = '\n'.join(lines[start_line:end_line])
-
-                    methods.append({
-                        'name': f"{parent_class}.{node.name}",
-                        'content': method_source,
-                        'start_line': start_line + 1,
-                        'end_line': end_line,
-                        'type': 'method',
-                        'class': parent_class
-                    })
-
-        return methods
-
-    # 在 symbolName: ProjectAPIExposer 类中扩展文件处理能力
-    def _parse_file_by_type(self, content: str, file_path: str) -> Dict[str, Any]:
+    def _index(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
-        根据文件类型选择合适的解析器
-        - symbolName: _parse_file_by_type
+        建立精确索引
+        - symbolName: _index
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
-
-        if file_extension == '.py':
-            return self._parse_python_file(content, file_path)
-        elif file_extension in ['.html', '.jinja', '.j2']:
-            return self._parse_html_template(content, file_path)
-        elif file_extension == '.json':
-            return self._parse_json_file(content, file_path)
-        elif file_extension in ['.md', '.txt']:
-            return self._parse_text_file(content, file_path)
-        elif file_extension == '.css':
-            return self._parse_css_file(content, file_path)
-        else:
-            # 默认处理为文本文件
-            return self._parse_generic_file(content, file_path)
+        for element in result.get('elements', []):
+            func_hash = self._generate_hash(element['name'])
+            self.function_index[func_hash] = element
+        return result
 
     def _generate_hash(self, name: str) -> str:
         """
@@ -174,34 +67,72 @@ class AdvancedAPIExposer:
     def __init__(self):
         self.parser = ProfessionalCodeParser()
         self.index_table = {}
+        self.symbols = SymbolIndex()
+        # 文件路径 -> 该文件在 index_table 中的键，重新暴露时先整体移除
+        self._file_keys: Dict[str, List[str]] = {}
+
+    def remove_file(self, file_path: str):
+        """
+        移除某文件已暴露的全部元素（索引表与符号表）
+        - symbolName: remove_file
+        """
+        for hash_key in self._file_keys.pop(file_path, ()):
+            self.index_table.pop(hash_key, None)
+        self.symbols.remove_file(file_path)
 
-    def expose_api(self, file_content: str, file_path: str = "") -> Dict[str, Any]:
+    def expose_api(self, file_content: str, file_path: str = "", language: str = "python") -> Dict[str, Any]:
         """
-        暴露API接口
+        暴露API接口；language 为 None 时按 file_path 的扩展名选择解析器
         - symbolName: expose_api
         """
-        result = self.parser.parse_with_ast(file_content)
+        if language is not None and language.lower() == "python":
+            result = self.parser.parse_with_ast(file_content, file_path)
+        else:
+            result = self.parser.parse_file(file_content, file_path, language)
 
         if 'error' not in result:
-            # 构建哈希索引表
+            # 构建哈希索引表；同一文件重新暴露时先移除上次的元素，已删除或改名的元素不会残留
             all_elements = result.get('elements', [])
+            self.remove_file(file_path)
+            file_keys = self._file_keys[file_path] = []
 
             for element in all_elements:
-                hash_key = self.parser._generate_hash(element['name'])
-                self.index_table[hash_key] = {
+                # 以 文件路径:元素名 为键，不同文件中的同名元素不再互相覆盖
+                hash_key = self.parser._generate_hash(f"{file_path}:{element['name']}")
+                info = {
                     'element': element,
                     'file_path': file_path
                 }
+                existing = self.index_table.get(hash_key)
+                if existing is not None:
+                    # 同一文件中的同名元素以最后一个为准，原地更新使符号表保持一致
+                    existing.update(info)
+                else:
+                    self.index_table[hash_key] = info
+                    file_keys.append(hash_key)
+                    self.symbols.add(element['name'], info, file_path)
 
         return result
 
-    def query_element(self, element_name: str) -> Dict:
+    def query_element(self, element_name: str, file_path: str = None) -> Dict:
         """
-        查询代码元素
+        查询代码元素；未指定文件时返回最近暴露的同名元素，全部同名元素见 query_elements
         - symbolName: query_element
         """
-        hash_key = self.parser._generate_hash(element_name)
-        return self.index_table.get(hash_key, {})
+        if file_path is not None:
+            hash_key = self.parser._generate_hash(f"{file_path}:{element_name}")
+            return self.index_table.get(hash_key, {})
+        matches = self.symbols.lookup(element_name)
+        # 限定名完全一致的优先于短名称匹配
+        exact = [info for info in matches if info['element']['name'] == element_name]
+        return (exact or matches)[-1] if matches else {}
+
+    def query_elements(self, element_name: str) -> List[Dict]:
+        """
+        查询所有文件中按限定名或短名称匹配的代码元素
+        - symbolName: query_elements
+        """
+        return self.symbols.lookup(element_name)
 
     def get_all_elements(self) -> List[str]:
         """
@@ -222,10 +153,10 @@ class MultiLanguageParser:
         解析指定语言的代码
         - symbolName: parse_code
         """
-        if language.lower() == "python":
-            return self.exposer.expose_api(code)
+        if self.exposer.parser.registry.supports_language(language):
+            return self.exposer.expose_api(code, language=language)
         else:
-            # 其他语言可在此扩展
+            # 其他语言在解析器注册表中登记后即可支持
             return {
                 "status": "unsupported",
                 "message": f"当前版本暂不支持 {language} 语言"
@@ -0,0 +1,263 @@
+# project_generator/APIexplorer/template_parser.py
+# file: template_parser.py
+
+import re
+from bisect import bisect_right
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from .element_record import ElementRecord, SourceFile
+except ImportError:
+    from element_record import ElementRecord, SourceFile
+
+# 词法单元类型
+TEXT = 'text'
+TAG_OPEN = 'tag_open'        # <tag ...> / <tag ... />
+TAG_CLOSE = 'tag_close'      # </tag>
+STATEMENT = 'statement'      # {% ... %}
+EXPRESSION = 'expression'    # {{ ... }}
+COMMENT = 'comment'          # {# ... #} / <!-- ... -->
+
+# 属性部分按展开循环写法：普通字符连续匹配，引号值与 Jinja 片段以各自不同的首字符开头（单独的 '{' 不能是 '{{'、'{%'
+# 的开头），分支互不重叠，未闭合的标签也只回溯线性步数
+_TAG_PATTERN = (
+    r'<(?P<close>/?)(?P<name>[A-Za-z][\w:.-]*)'
+    r'(?P<attrs>[^>"\'{]*(?:(?:"[^"]*"|\'[^\']*\'|\{\{[^}]*(?:\}(?!\})[^}]*)*\}\}|\{%[^%]*(?:%(?!\})[^%]*)*%\}'
+    r'|\{(?![{%]))[^>"\'{]*)*)>'
+)
+# Jinja 注释、语句与表达式；未闭合时延伸到文件末尾
+_JINJA_PATTERN = (
+    r'(?P<comment>\{#[^#]*(?:#(?!\})[^#]*)*(?:#\}|\Z))'
+    r'|(?P<statement>\{%(?P<statement_body>[^%]*(?:%(?!\})[^%]*)*)(?:%\}|\Z))'
+    r'|(?P<expression>\{\{(?P<expression_body>[^}]*(?:\}(?!\})[^}]*)*)(?:\}\}|\Z))'
+)
+# 全部词法单元合成一个正则，每个单元只需一次 C 层面的 search；不能构成标签的 '<' 留在文本中
+_TOKEN_RE = re.compile(
+    _JINJA_PATTERN + r'|(?P<html_comment><!--[^-]*(?:-(?!->)[^-]*)*(?:-->|\Z))|(?P<tag>' + _TAG_PATTERN + ')'
+)
+# <script>/<style> 内部是原始文本：只识别 Jinja 语法与对应的结束标签
+_RAW_TEXT_TAGS = {
+    tag: re.compile(rf'(?P<raw_close>(?i:</{tag}\s*>))|' + _JINJA_PATTERN)
+    for tag in ('script', 'style')
+}
+_ATTR_RE = re.compile(r'([^\s=/>"\'{}%]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+_EXPR_IN_TAG_RE = re.compile(r'\{\{(?:[^}]|\}(?!\}))*\}\}|\{%(?:[^%]|%(?!\}))*%\}')
+_ENDRAW_RE = re.compile(r'\{%-?\s*endraw\s*-?%\}')
+_URL_FOR_RE = re.compile(r'url_for\(\s*[\'"]([^\'"]+)[\'"]')
+_FILENAME_RE = re.compile(r'filename\s*=\s*[\'"]([^\'"]+)[\'"]')
+_QUOTED_RE = re.compile(r'[\'"]([^\'"]+)[\'"]')
+_NAME_RE = re.compile(r'[A-Za-z_]\w*')
+
+# 表单字段、静态资源所在的标签
+_FIELD_TAGS = ('input', 'select', 'textarea', 'button')
+_ASSET_ATTRS = {'script': 'src', 'link': 'href', 'img': 'src'}
+# 成对出现、需要跟踪嵌套的 Jinja 语句
+_JINJA_PAIRED = ('block', 'macro', 'for', 'if', 'call', 'filter', 'with', 'set', 'trans', 'autoescape')
+
+
+def tokenize_template(text: str, include_text: bool = True) -> Iterator[Tuple[str, int, int, object]]:
+    """
+    单遍扫描 HTML/Jinja 文本，依次产出 (类型, 起始偏移, 结束偏移, 附加信息)。
+    附加信息：标签为 (标签名小写, 属性文本, 属性文本起始偏移)，Jinja 语句/表达式为去掉定界符与空白控制符的正文。
+    所有词法单元由一个编译好的正则逐个 search，整体为线性时间；未闭合的构造按文本处理到文件末尾。
+    include_text 为 False 时不产出纯文本单元（只关心结构的调用方可省去这部分开销）。
+    - symbolName: tokenize_template
+    """
+    pos = 0
+    length = len(text)
+    search = _TOKEN_RE.search
+    raw_tag = None
+    while pos < length:
+        match = search(text, pos)
+        if match is None:
+            if include_text:
+                yield TEXT, pos, length, None
+            return
+        start, end = match.span()
+        if start > pos and include_text:
+            yield TEXT, pos, start, None
+        pos = end
+        kind = match.lastgroup
+
+        if kind == 'tag':
+            name = match.group('name').lower()
+            if match.group('close'):
+                yield TAG_CLOSE, start, end, (name, '', end)
+                continue
+            attrs = match.group('attrs')
+            yield TAG_OPEN, start, end, (name, attrs, match.start('attrs'))
+            if name in _RAW_TEXT_TAGS and not attrs.rstrip().endswith('/'):
+                search = _RAW_TEXT_TAGS[name].search
+                raw_tag = name
+        elif kind == 'expression':
+            yield EXPRESSION, start, end, match.group('expression_body').strip('-+ \t\r\n')
+        elif kind == 'statement':
+            body = match.group('statement_body').strip('-+ \t\r\n')
+            yield STATEMENT, start, end, body
+            if body == 'raw':
+                # {% raw %} 内部不做任何解析
+                raw_end = _ENDRAW_RE.search(text, pos)
+                stop = raw_end.start() if raw_end else length
+                if stop > pos and include_text:
+                    yield TEXT, pos, stop, None
+                pos = stop
+        elif kind == 'raw_close':
+            # 原始文本模式下只剩结束标签这一种标签
+            yield TAG_CLOSE, start, end, (raw_tag, '', end)
+            search = _TOKEN_RE.search
+        else:
+            yield COMMENT, start, end, None
+
+
+def parse_attributes(attrs: str) -> dict:
+    """
+    解析标签属性文本为 {属性名小写: 值}（值去掉引号；无值属性为空字符串）
+    - symbolName: parse_attributes
+    """
+    if '{' not in attrs:
+        return {name.lower(): _unquote(value) for name, value in _ATTR_RE.findall(attrs)}
+    # 属性值中的 Jinja 片段先整体替换为占位，避免其中的空格/引号干扰属性切分
+    plain = _EXPR_IN_TAG_RE.sub(_placeholder, attrs)
+    result = {}
+    for match in _ATTR_RE.finditer(plain):
+        # 无值属性的 span(2) 为 (-1, -1)，切片为空字符串
+        value_start, value_end = match.span(2)
+        result[match.group(1).lower()] = _unquote(attrs[value_start:value_end])
+    return result
+
+
+def _attribute(attrs: str, wanted: str) -> Optional[str]:
+    """
+    只取一个属性的值，结果与 parse_attributes(attrs).get(wanted) 相同；
+    用 findall 一次取出全部 (属性名, 值)，只有该值可能含 Jinja 占位时才退回逐个匹配
+    - symbolName: _attribute
+    """
+    plain = _EXPR_IN_TAG_RE.sub(_placeholder, attrs) if '{' in attrs else attrs
+    value = None
+    for name, plain_value in _ATTR_RE.findall(plain):
+        if name.lower() == wanted:
+            value = plain_value
+    if value is None:
+        return None
+    if plain is not attrs and 'J' in value:
+        return parse_attributes(attrs).get(wanted)
+    return _unquote(value)
+
+
+def _placeholder(match) -> str:
+    return 'J' * (match.end() - match.start())
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] in '"\'' and value[-1] == value[0]:
+        return value[1:-1]
+    return value
+
+
+def parse_template(text: str, file_path: str = '', source: Optional[SourceFile] = None) -> List[ElementRecord]:
+    """
+    解析 HTML/Jinja 模板，返回按起始位置排序的元素记录：
+    extends / include / import（目标模板）、block、macro、for、form（含 action/method/fields）、
+    url_for（端点，静态资源带 filename）与 asset（script/link/img 直接引用的静态文件）
+    - symbolName: parse_template
+    """
+    source = source or SourceFile(file_path, text)
+    elements: List[ElementRecord] = []
+    # Jinja 嵌套栈：(语句类型, 名称, 起始偏移)
+    jinja_stack: List[Tuple[str, str, int]] = []
+    # 未闭合的表单：[起始偏移, 序号, 属性字典, 字段列表]
+    form_stack: List[list] = []
+    form_count = 0
+
+    # 与 ElementRecord.from_span 相同；行首偏移表先转为列表，二分查找时不必逐个把数组元素转换为 int
+    line_starts = list(source.buffer.line_starts)
+
+    def add(start: int, end: int, kind: str, name: str, **extra):
+        elements.append(ElementRecord(source, start, end, bisect_right(line_starts, start),
+                                      bisect_right(line_starts, end), kind, name, extra))
+
+    def add_url_for(expr: str, start: int, end: int):
+        if 'url_for' not in expr:
+            return
+        for match in _URL_FOR_RE.finditer(expr):
+            extra = {}
+            filename = _FILENAME_RE.search(expr, match.end())
+            if filename:
+                extra['filename'] = filename.group(1)
+            add(start, end, 'url_for', match.group(1), **extra)
+
+    for kind, start, end, info in tokenize_template(text, include_text=False):
+        if kind == EXPRESSION:
+            add_url_for(info, start, end)
+
+        elif kind == STATEMENT:
+            keyword_match = _NAME_RE.match(info)
+            if not keyword_match:
+                continue
+            keyword = keyword_match.group()
+            rest = info[keyword_match.end():].strip()
+            if keyword in ('extends', 'include', 'import', 'from'):
+                target = _QUOTED_RE.search(rest)
+                if target:
+                    add(start, end, 'import' if keyword == 'from' else keyword, target.group(1))
+            elif keyword.startswith('end') and keyword[3:] in _JINJA_PAIRED:
+                opener = keyword[3:]
+                # 容忍不匹配的结束语句：弹出到最近的同类语句为止
+                for i in range(len(jinja_stack) - 1, -1, -1):
+                    if jinja_stack[i][0] == opener:
+                        _, name, open_start = jinja_stack[i]
+                        del jinja_stack[i:]
+                        if opener in ('block', 'macro', 'for'):
+                            add(open_start, end, opener, name)
+                        break
+            elif keyword in _JINJA_PAIRED:
+                if keyword == 'set' and '=' in rest:
+                    # 单行赋值 {% set x = ... %} 没有 endset
+                    add_url_for(rest, start, end)
+                    continue
+                if keyword in ('block', 'macro'):
+                    name_match = _NAME_RE.match(rest)
+                    name = name_match.group() if name_match else ''
+                elif keyword == 'for':
+                    name = ' '.join(rest.split())
+                else:
+                    name = keyword
+                jinja_stack.append((keyword, name, start))
+            add_url_for(rest, start, end)
+
+        elif kind == TAG_OPEN:
+            name, attrs, attrs_start = info
+            if 'url_for' in attrs:
+                for expr in _EXPR_IN_TAG_RE.finditer(attrs):
+                    add_url_for(expr.group(), attrs_start + expr.start(), attrs_start + expr.end())
+            if name == 'form':
+                form_count += 1
+                form_stack.append([start, form_count, parse_attributes(attrs), [], ' '.join(attrs.split())])
+            elif name in _FIELD_TAGS and form_stack and 'name' in attrs:
+                field = _attribute(attrs, 'name')
+                if field and field not in form_stack[-1][3]:
+                    form_stack[-1][3].append(field)
+            asset_attr = _ASSET_ATTRS.get(name)
+            if asset_attr and asset_attr in attrs:
+                ref = _attribute(attrs, asset_attr) or ''
+                if ref and '{' not in ref:
+                    add(start, end, 'asset', ref, tag=name)
+
+        elif kind == TAG_CLOSE and info[0] == 'form' and form_stack:
+            _close_form(add, form_stack.pop(), end)
+
+    # 文件结束仍未闭合的构造，区间延伸到末尾
+    for form in reversed(form_stack):
+        _close_form(add, form, len(text))
+    for keyword, name, open_start in jinja_stack:
+        if keyword in ('block', 'macro', 'for'):
+            add(open_start, len(text), keyword, name)
+
+    elements.sort(key=lambda el: (el.start, -el.end))
+    return elements
+
+
+def _close_form(add, form: list, end: int):
+    start, index, attrs, fields, attr_text = form
+    add(start, end, 'form', f'form_{index}', action=attrs.get('action', ''),
+        method=attrs.get('method', 'get').lower(), fields=fields, attrs=attr_text)
@@ -0,0 +1,449 @@
+# project_generator/APIexplorer/bench_parsers.py
+# file: bench_parsers.py
+# 解析器性能基准：python bench_parsers.py [基准名 ...]
+
+import argparse
+import json
+import re
+import shutil
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from api_exposer import AdvancedAPIExposer
+from interactive_usage import ProjectAPIExposer, _read_source
+from parse_cache import DiskParseCache
+from parser_registry import DEFAULT_REGISTRY, create_default_registry
+from css_parser import parse_css
+from element_record import ElementRecord, SourceFile
+from js_parser import parse_js
+from json_scanner import scan_json
+from template_parser import parse_template
+
+
+def _timeit(func, repeat: int = 3) -> float:
+    """
+    返回多次运行中的最短耗时（秒）
+    - symbolName: _timeit
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_css(rules: int) -> str:
+    """
+    生成包含指定规则数的CSS文本
+    - symbolName: make_css
+    """
+    return '\n'.join(
+        f"/* rule {i} */\n.rule-{i} .child:hover {{\n    color: #{i % 0xffffff:06x};\n    margin: {i % 17}px;\n}}"
+        if i % 100 else f"@media (max-width: {i}px) {{\n  .rule-{i} {{ color: red; }}\n}}"
+        for i in range(rules)
+    )
+
+
+def bench_css(rules: int = 10000):
+    """
+    10k 规则 CSS：对比旧的前缀计数行号与 SourceBuffer 二分查找行号
+    - symbolName: bench_css
+    """
+    content = make_css(rules)
+
+    def legacy():
+        for match in re.finditer(r'([^{]+)\s*{([^}]*)}', content):
+            content[:match.start()].count('\n')
+            content[:match.end()].count('\n')
+
+    new_time = _timeit(lambda: parse_css(content, 'bench.css'))
+    # 旧实现为二次复杂度，只运行一次
+    legacy_time = _timeit(legacy, repeat=1)
+    elements = parse_css(content, 'bench.css')
+    print(f"[css] {rules} 条规则, {len(content) / 1024:.0f} KB, 提取 {len(elements)} 个元素")
+    print(f"      旧行号计算（仅行号部分）: {legacy_time * 1000:.1f} ms")
+    print(f"      parse_css（逐字符扫描 + SourceBuffer）: {new_time * 1000:.1f} ms")
+
+
+def make_js(classes: int) -> str:
+    """
+    生成包含指定数量类（每类若干方法、事件绑定与 fetch 调用）的JS文本
+    - symbolName: make_js
+    """
+    parts = []
+    for c in range(classes):
+        methods = ''.join(
+            f"    async load{m}(id) {{\n"
+            f"        // fetch('/commented/{m}')\n"
+            f"        const r = await fetch(`/api/c{c}/items/${{id}}`, {{ method: 'POST', body: '{{}}' }});\n"
+            f"        return r.ok ? r.json() : /x\\/y/g.test(id);\n"
+            f"    }}\n"
+            for m in range(8)
+        )
+        parts.append(
+            f"class Widget{c} {{\n    constructor() {{\n"
+            f"        this.btn.addEventListener('click', (e) => {{ this.load0(e.id); }});\n    }}\n{methods}}}\n"
+            f"const helper{c} = (a, b) => a + b;\n"
+        )
+    return '\n'.join(parts)
+
+
+def bench_js(classes: int = 1000):
+    """
+    大 JS 文件：词法扫描 + 括号配对 + 结构索引的耗时
+    - symbolName: bench_js
+    """
+    content = make_js(classes)
+    elements = parse_js(content)
+    print(f"[js] {classes} 个类, {len(content) / 1024:.0f} KB, 解析出 {len(elements)} 个元素")
+    print(f"      parse_js: {_timeit(lambda: parse_js(content)) * 1000:.1f} ms")
+
+
+def make_template(forms: int, closed: bool = True) -> str:
+    """
+    生成包含指定数量表单的 Jinja 模板；closed=False 时表单缺少 </form>（生成代码中常见的残缺模板）
+    - symbolName: make_template
+    """
+    parts = ["{% extends 'base.html' %}\n{% block content %}"]
+    for i in range(forms):
+        parts.append(
+            f"<form method=\"post\" action=\"{{{{ url_for('view_{i}') }}}}\">\n"
+            f"  {{% for f in fields_{i} %}}<input name=\"f{i}\" value=\"{{{{ f }}}}\">{{% endfor %}}\n"
+            + ("</form>" if closed else "</div>"))
+    parts.append("{% endblock %}")
+    return '\n'.join(parts)
+
+
+def bench_template(forms: int = 5000):
+    """
+    大模板：旧的多遍正则（表单 .*? 回溯 + url_for）与单遍词法解析器对比
+    - symbolName: bench_template
+    """
+    def legacy(content):
+        # 旧的 _parse_html_template：两个正则，表单与 url_for 同样生成元素记录（不含字段、Jinja 结构与静态资源）
+        source = SourceFile('', content)
+        elements = [ElementRecord.from_span(source, m.start(), m.end(), 'form', f'form_{i}')
+                    for i, m in enumerate(re.finditer(r'<form[^>]*>.*?</form>', content, re.DOTALL), 1)]
+        elements.extend(ElementRecord.from_span(source, m.start(), m.end(), 'url_for', m.group(1))
+                        for m in re.finditer(r'url_for\([\'"]([^\'"]+)[\'"]', content))
+        return elements
+
+    for closed, count in ((True, forms), (False, forms // 5)):
+        content = make_template(count, closed)
+        elements = parse_template(content)
+        label = '完整表单' if closed else '缺少 </form>'
+        print(f"[template] {label}: {count} 个表单, {len(content) / 1024:.0f} KB, 解析出 {len(elements)} 个元素")
+        print(f"      旧正则（表单 + url_for，{len(legacy(content))} 个元素）: "
+              f"{_timeit(lambda: legacy(content), repeat=1) * 1000:.1f} ms")
+        print(f"      parse_template（单遍）: {_timeit(lambda: parse_template(content)) * 1000:.1f} ms")
+
+    # 病态输入：属性中含大量 Jinja 表达式、以未闭合引号结尾的标签，匹配失败时的回溯须为线性
+    for repeat in (20, 20000):
+        content = '<div ' + '{{a}}' * repeat + ' "'
+        print(f"[template] 未闭合标签 + {repeat} 个属性表达式: {_timeit(lambda: parse_template(content)) * 1000:.1f} ms")
+
+
+def make_project(root: str, modules: int = 300, templates: int = 200, body_lines: int = 1):
+    """
+    在 root 下生成合成项目：若干 Python 模块（函数+类）与模板，body_lines 为每个函数/方法体的语句行数
+    - symbolName: make_project
+    """
+    os.makedirs(os.path.join(root, 'templates'), exist_ok=True)
+    for m in range(modules):
+        body = []
+        for i in range(20):
+            stmts = ''.join(f"    a = a + b * {j}\n" for j in range(body_lines - 1))
+            body.append(f"@app.route('/m{m}/f{i}')\ndef view_{i}(a, b=1):\n    \"\"\"视图 {i}\"\"\"\n{stmts}    return a + b\n")
+        for c in range(5):
+            methods = ''.join(
+                f"    def method_{k}(self, x):\n" + ''.join(f"        x = x + {j}\n" for j in range(body_lines - 1))
+                + f"        return x * {k}\n\n"
+                for k in range(8))
+            body.append(f"class Model{c}:\n    table = 'model_{c}'\n\n{methods}")
+        with open(os.path.join(root, f'module_{m}.py'), 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(body))
+    for t in range(templates):
+        forms = ''.join(
+            f"<form method=\"post\" action=\"{{{{ url_for('view_{i}') }}}}\">\n<input name=\"q{i}\">\n</form>\n"
+            for i in range(20))
+        with open(os.path.join(root, 'templates', f'page_{t}.html'), 'w', encoding='utf-8') as f:
+            f.write(f"{{% extends 'base.html' %}}\n{{% block content %}}\n{forms}{{% endblock %}}\n")
+
+
+def _parse_project_uncached(root: str, jobs: int = 1):
+    """
+    清空共享解析缓存后解析项目，结束后再次清空：测量的是实际解析而不是缓存命中，
+    缓存也不会额外保留元素（进程池子进程 fork 时同样从空缓存开始）
+    - symbolName: _parse_project_uncached
+    """
+    DEFAULT_REGISTRY.clear()
+    exposer = ProjectAPIExposer(root, jobs=jobs)
+    result = exposer.parse_project()
+    DEFAULT_REGISTRY.clear()
+    return exposer, result
+
+
+def bench_parallel(modules: int = 300, templates: int = 200):
+    """
+    parse_project 并行扩展性：在合成项目上比较不同进程数的耗时
+    - symbolName: bench_parallel
+    """
+    root = tempfile.mkdtemp(prefix='bench_project_')
+    try:
+        make_project(root, modules, templates)
+        cpus = os.cpu_count() or 1
+        job_counts = sorted({1, 2, 4, cpus})
+        print(f"[parallel] {modules} 个模块 + {templates} 个模板, CPU 核数 {cpus}")
+        baseline = None
+        for jobs in job_counts:
+            exposer_holder = {}
+
+            def run():
+                exposer_holder['e'], exposer_holder['r'] = _parse_project_uncached(root, jobs)
+
+            elapsed = _timeit(run, repeat=1)
+            baseline = baseline or elapsed
+            print(f"      jobs={jobs:<3} {elapsed * 1000:8.1f} ms  加速比 {baseline / elapsed:.2f}x"
+                  f"  元素 {exposer_holder['r']['total_elements']}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _measure(func):
+    """
+    运行 func 并返回 (结果, 峰值内存, 运行结束后仍保留的内存)，单位字节
+    - symbolName: _measure
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak, retained
+
+
+def _legacy_parse_python(source: str) -> list:
+    """
+    旧实现（ElementRecord 之前）产出的元素字典：每个函数/类/方法持有 '\\n'.join(lines[...]) 复制出的 content，
+    三个提取函数各自 split 一次源码。只把旧实现中逐类 ast.walk 的父类查找换成预先计算的类区间，输出完全相同
+    - symbolName: _legacy_parse_python
+    """
+    import ast
+    tree = ast.parse(source)
+    classes = [node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+
+    def parent_class(node):
+        for parent in classes:
+            if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
+                return parent.name
+        return None
+
+    def span(node, lines):
+        start_line = node.lineno - 1
+        end_line = getattr(node, 'end_lineno', start_line + 1)
+        return '\n'.join(lines[start_line:end_line]), start_line + 1, end_line
+
+    functions, class_elements, methods = [], [], []
+    lines = source.split('\n')
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and parent_class(node) is None:
+            content, start_line, end_line = span(node, lines)
+            functions.append({'name': node.name, 'content': content, 'start_line': start_line,
+                              'end_line': end_line, 'type': 'function', 'args': [arg.arg for arg in node.args.args]})
+    lines = source.split('\n')
+    for node in classes:
+        content, start_line, end_line = span(node, lines)
+        class_elements.append({'name': node.name, 'content': content, 'start_line': start_line,
+                               'end_line': end_line, 'type': 'class'})
+    lines = source.split('\n')
+    for node in ast.walk(tree):
+        owner = parent_class(node) if isinstance(node, ast.FunctionDef) else None
+        if owner:
+            content, start_line, end_line = span(node, lines)
+            methods.append({'name': f"{owner}.{node.name}", 'content': content, 'start_line': start_line,
+                            'end_line': end_line, 'type': 'method', 'class': owner})
+    return functions + class_elements + methods
+
+
+def bench_memory(sizes=(20, 40, 80), body_lines: int = 12):
+    """
+    元素记录内存占用：ElementRecord（共享源码 + 偏移，解析后源码按需从磁盘加载）与旧实现逐元素复制 content 的字典对比。
+    两边解析同一批 Python 模块；峰值含 ast 解析的临时对象，保留为解析结束后索引仍占用的内存
+    - symbolName: bench_memory
+    """
+    print("[memory] 模块数  元素数   记录:峰值/保留      旧字典:峰值/保留    (MB)")
+    for modules in sizes:
+        root = tempfile.mkdtemp(prefix='bench_memory_')
+        try:
+            make_project(root, modules, templates=0, body_lines=body_lines)
+
+            paths = [os.path.join(root, name) for name in sorted(os.listdir(root)) if name.endswith('.py')]
+
+            def parse_records():
+                # 与 ProjectAPIExposer.parse_project 相同：解析、建立索引后释放源码
+                DEFAULT_REGISTRY.clear()
+                index_table = {}
+                for path in paths:
+                    text = _read_source(path)
+                    elements = DEFAULT_REGISTRY.parse(text, path, SourceFile(path, text, path), 'python')['elements']
+                    for element in elements:
+                        index_table[f"{path}:{element['name']}"] = {'element': element, 'file_path': path}
+                    if elements:
+                        elements[0].source.release()
+                DEFAULT_REGISTRY.clear()
+                return index_table
+
+            def parse_dicts():
+                index_table = {}
+                for path in paths:
+                    for element in _legacy_parse_python(_read_source(path)):
+                        index_table[f"{path}:{element['name']}"] = {'element': element, 'file_path': path}
+                return index_table
+
+            # 预热一次：首次解析时才导入的模块、编译的正则不计入任何一方
+            parse_records()
+            parse_dicts()
+            records, rec_peak, rec_kept = _measure(parse_records)
+            count = len(records)
+            del records
+            dicts, dict_peak, dict_kept = _measure(parse_dicts)
+            assert len(dicts) == count, (len(dicts), count)
+            del dicts
+            mb = 1024 * 1024
+            print(f"         {modules:<7}{count:<8} {rec_peak / mb:7.1f} / {rec_kept / mb:<7.1f}"
+                  f"   {dict_peak / mb:7.1f} / {dict_kept / mb:<7.1f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_registry(modules: int = 300, templates: int = 200):
+    """
+    解析器注册表缓存：首次解析项目、内容未变时重新解析，以及另一个使用方（AdvancedAPIExposer）读取同一批文件
+    - symbolName: bench_registry
+    """
+    root = tempfile.mkdtemp(prefix='bench_registry_')
+    try:
+        make_project(root, modules, templates)
+        DEFAULT_REGISTRY.clear()
+        exposer = ProjectAPIExposer(root)
+        cold = _timeit(exposer.parse_project, repeat=1)
+        warm = _timeit(exposer.parse_project, repeat=1)
+        sources = [(relative, _read_source(path)) for path, relative, _ in exposer._collect_files()
+                   if relative.endswith('.py')]
+
+        def other_consumer():
+            api = AdvancedAPIExposer()
+            for relative, content in sources:
+                api.expose_api(content, relative)
+
+        shared = _timeit(other_consumer, repeat=1)
+        stats = DEFAULT_REGISTRY.stats()
+        print(f"[registry] {modules} 个模块 + {templates} 个模板, 缓存 {stats['entries']} 个文件"
+              f"（命中 {stats['hits']} / 未命中 {stats['misses']}）")
+        print(f"      首次 parse_project: {cold * 1000:.1f} ms")
+        print(f"      内容未变再次 parse_project: {warm * 1000:.1f} ms")
+        print(f"      AdvancedAPIExposer 暴露同一批 .py 文件: {shared * 1000:.1f} ms")
+        DEFAULT_REGISTRY.clear()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_disk(modules: int = 300, templates: int = 200):
+    """
+    磁盘解析缓存：首次解析写入缓存，再在另一个工作区（内容相同、路径不同）以空的内存缓存打开项目
+    - symbolName: bench_disk
+    """
+    root = tempfile.mkdtemp(prefix='bench_disk_')
+    cache_dir = tempfile.mkdtemp(prefix='bench_disk_cache_')
+    try:
+        first = os.path.join(root, 'workspace_a')
+        second = os.path.join(root, 'workspace_b')
+        make_project(first, modules, templates)
+        shutil.copytree(first, second)
+        cache = DiskParseCache(cache_dir)
+
+        def open_project(project_root):
+            exposer = ProjectAPIExposer(project_root)
+            # 新的注册表：模拟新进程（内存缓存为空），只共享磁盘缓存
+            exposer.registry = create_default_registry(cache)
+            DEFAULT_REGISTRY.clear()
+            exposer.parse_project()
+            return exposer
+
+        cold = _timeit(lambda: open_project(first), repeat=1)
+        warm = _timeit(lambda: open_project(second), repeat=1)
+        stats = cache.stats()
+        print(f"[disk] {modules} 个模块 + {templates} 个模板, 缓存 {stats['entries']} 个条目 {stats['bytes'] / 1024 / 1024:.1f} MB")
+        print(f"      首次打开（解析并写入缓存）: {cold * 1000:.1f} ms")
+        print(f"      另一工作区打开（磁盘缓存命中）: {warm * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def make_orders_json(orders: int) -> str:
+    """
+    生成类似 orders.json 的订单数组（每个订单含若干商品）
+    - symbolName: make_orders_json
+    """
+    data = [{
+        'id': i,
+        'user_id': i % 97,
+        'items': [{'product_id': p, 'name': f'商品{p} {{special}}', 'quantity': p % 3 + 1, 'price': p * 1.5}
+                  for p in range(i % 5 + 1)],
+        'total': i * 2.5,
+        'status': 'paid',
+        'created_at': '2025-11-13 10:00:00',
+    } for i in range(orders)]
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def bench_json(orders: int = 20000):
+    """
+    大 JSON 数据文件：旧的 json.loads + 逐项 json.dumps 与增量扫描（只记录区间）的耗时与峰值内存对比
+    - symbolName: bench_json
+    """
+    content = make_orders_json(orders)
+
+    def legacy():
+        return [json.dumps(item, indent=2) for item in json.loads(content)]
+
+    mb = 1024 * 1024
+    _, legacy_peak, _ = _measure(legacy)
+    elements, scan_peak, _ = _measure(lambda: scan_json(content))
+    print(f"[json] {orders} 个订单, {len(content) / mb:.1f} MB, 扫描出 {len(elements)} 个元素（末项 L{elements[-1]['start_line']}）")
+    print(f"      旧 json.loads + json.dumps: {_timeit(legacy, repeat=1) * 1000:.1f} ms, 峰值 {legacy_peak / mb:.1f} MB")
+    print(f"      scan_json（增量扫描）: {_timeit(lambda: scan_json(content)) * 1000:.1f} ms, 峰值 {scan_peak / mb:.1f} MB")
+
+
+BENCHMARKS = {
+    'css': bench_css,
+    'js': bench_js,
+    'json': bench_json,
+    'template': bench_template,
+    'parallel': bench_parallel,
+    'registry': bench_registry,
+    'disk': bench_disk,
+    'memory': bench_memory,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIexplorer 解析器性能基准')
+    parser.add_argument('names', nargs='*', help=f"要运行的基准（默认全部）：{', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知基准: {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
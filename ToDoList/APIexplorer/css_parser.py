@@ -0,0 +1,201 @@
+# project_generator/APIexplorer/css_parser.py
+# file: css_parser.py
+
+from typing import List, Optional
+
+try:
+    from .element_record import ElementRecord, SourceFile
+except ImportError:
+    from element_record import ElementRecord, SourceFile
+
+# 内部仍是规则列表、需要递归解析的条件组 at-rule
+_GROUP_AT_RULES = ('media', 'supports', 'layer', 'container', 'document')
+
+
+def css_rule_name(selector: str) -> str:
+    """
+    选择器转元素名称（与原正则版本的命名保持一致）
+    - symbolName: css_rule_name
+    """
+    selector = ' '.join(selector.split())
+    return selector.replace('.', '').replace('#', '').replace(' ', '_').replace(':', '_')
+
+
+class _CSSScanner:
+    """
+    逐字符扫描 CSS，跳过注释与字符串，按花括号层级切分规则
+    - symbolName: _CSSScanner
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+
+    def skip_trivia(self, pos: int) -> int:
+        """
+        跳过空白与 /* */ 注释
+        - symbolName: skip_trivia
+        """
+        text = self.text
+        while pos < self.length:
+            if text[pos].isspace():
+                pos += 1
+            elif text.startswith('/*', pos):
+                end = text.find('*/', pos + 2)
+                pos = self.length if end == -1 else end + 2
+            else:
+                break
+        return pos
+
+    def find_prelude_end(self, pos: int) -> int:
+        """
+        从 pos 开始找到规则头部结束处的 '{' 或 ';'（或同层的 '}'），跳过注释、字符串与括号
+        - symbolName: find_prelude_end
+        """
+        text = self.text
+        depth = 0
+        while pos < self.length:
+            ch = text[pos]
+            if ch in '"\'':
+                pos = self._skip_string(pos)
+                continue
+            if ch == '/' and text.startswith('/*', pos):
+                end = text.find('*/', pos + 2)
+                pos = self.length if end == -1 else end + 2
+                continue
+            if ch in '([':
+                depth += 1
+            elif ch in ')]':
+                depth = max(0, depth - 1)
+            elif depth == 0 and ch in '{;}':
+                return pos
+            pos += 1
+        return self.length
+
+    def find_block_end(self, pos: int) -> int:
+        """
+        pos 指向 '{'，返回配对 '}' 之后的位置；未闭合时到文件末尾
+        - symbolName: find_block_end
+        """
+        text = self.text
+        depth = 0
+        while pos < self.length:
+            ch = text[pos]
+            if ch in '"\'':
+                pos = self._skip_string(pos)
+                continue
+            if ch == '/' and text.startswith('/*', pos):
+                end = text.find('*/', pos + 2)
+                pos = self.length if end == -1 else end + 2
+                continue
+            if ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos += 1
+        return self.length
+
+    def _skip_string(self, pos: int) -> int:
+        text = self.text
+        quote = text[pos]
+        pos += 1
+        while pos < self.length:
+            ch = text[pos]
+            if ch == '\\':
+                pos += 2
+                continue
+            if ch == quote or ch == '\n':
+                return pos + 1
+            pos += 1
+        return self.length
+
+    def clean(self, start: int, end: int) -> str:
+        """
+        去掉注释并压缩空白后的片段文本（用于选择器与条件）
+        - symbolName: clean
+        """
+        text = self.text[start:end]
+        if '/*' in text:
+            parts = []
+            pos = 0
+            while True:
+                comment = text.find('/*', pos)
+                if comment == -1:
+                    parts.append(text[pos:])
+                    break
+                parts.append(text[pos:comment])
+                close = text.find('*/', comment + 2)
+                if close == -1:
+                    break
+                pos = close + 2
+            text = ' '.join(parts)
+        return ' '.join(text.split())
+
+
+def parse_css(text: str, file_path: str = '', source: Optional[SourceFile] = None) -> List[ElementRecord]:
+    """
+    解析 CSS，返回按起始位置排序的元素记录：
+    css_rule（普通规则，位于 @media 等条件组内时带 media 字段）、media（@media/@supports 等条件组，名称为条件）、
+    keyframes、font_face、import。注释中的花括号与选择器不会产生元素，元素区间不含前导注释。
+    - symbolName: parse_css
+    """
+    source = source or SourceFile(file_path, text)
+    scanner = _CSSScanner(text)
+    elements: List[ElementRecord] = []
+    font_faces = 0
+
+    # 待处理的区间：(起始, 结束, 外层条件列表)
+    pending = [(0, len(text), [])]
+    while pending:
+        pos, stop, conditions = pending.pop()
+        while True:
+            pos = scanner.skip_trivia(pos)
+            if pos >= stop:
+                break
+            if text[pos] == '}':
+                # 多余的右括号：跳过，尽量容忍残缺样式
+                pos += 1
+                continue
+            head_end = min(scanner.find_prelude_end(pos), stop)
+            prelude = scanner.clean(pos, head_end)
+            if head_end >= stop or text[head_end] != '{':
+                # 无块语句：@import / @charset，或残缺声明
+                end = min(head_end + 1, stop)
+                if prelude.lower().startswith('@import'):
+                    target = prelude[len('@import'):].strip().rstrip(';').strip()
+                    elements.append(ElementRecord.from_span(source, pos, end, 'import', _import_target(target)))
+                pos = end
+                continue
+
+            block_end = min(scanner.find_block_end(head_end), stop)
+            extra = {'media': ' and '.join(conditions)} if conditions else {}
+            if prelude.startswith('@'):
+                keyword, _, condition = prelude[1:].partition(' ')
+                keyword = keyword.lower()
+                if keyword in _GROUP_AT_RULES:
+                    name = f"@{keyword} {condition}".strip()
+                    elements.append(ElementRecord.from_span(source, pos, block_end, 'media', name, **extra))
+                    pending.append((head_end + 1, block_end - 1, conditions + [name]))
+                elif keyword.endswith('keyframes'):
+                    elements.append(ElementRecord.from_span(source, pos, block_end, 'keyframes', condition, **extra))
+                elif keyword == 'font-face':
+                    font_faces += 1
+                    elements.append(ElementRecord.from_span(source, pos, block_end, 'font_face',
+                                                            f"font_face_{font_faces}", **extra))
+                else:
+                    elements.append(ElementRecord.from_span(source, pos, block_end, 'at_rule', prelude, **extra))
+            elif prelude:
+                elements.append(ElementRecord.from_span(source, pos, block_end, 'css_rule', css_rule_name(prelude),
+                                                        selector=prelude, **extra))
+            pos = block_end
+
+    elements.sort(key=lambda el: (el.start, -el.end))
+    return elements
+
+
+def _import_target(target: str) -> str:
+    if target.startswith('url(') and ')' in target:
+        target = target[4:target.index(')')]
+    return target.split()[0].strip('\'"') if target.split() else target
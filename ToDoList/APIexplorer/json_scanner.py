@@ -0,0 +1,100 @@
+# project_generator/APIexplorer/json_scanner.py
+# file: json_scanner.py
+
+import json
+import re
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from .element_record import ElementRecord, SourceFile
+except ImportError:
+    from element_record import ElementRecord, SourceFile
+
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+_WHITESPACE_RE = re.compile(r'[ \t\n\r\ufeff]*')
+# 标准库的 C 扫描器：从指定位置解码一个值并返回结束位置
+_scan_once = json.JSONDecoder().scan_once
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    return _WHITESPACE_RE.match(text, pos).end()
+
+
+def _error(message: str, text: str, pos: int):
+    return json.JSONDecodeError(message, text, min(pos, len(text)))
+
+
+def _expect_end(text: str, pos: int):
+    """顶层值结束于 pos，之后只允许空白"""
+    pos = _skip_ws(text, pos)
+    if pos < len(text):
+        raise _error('顶层值之后有多余内容', text, pos)
+
+
+def skip_value(text: str, pos: int) -> int:
+    """
+    跳过 pos 处的一个 JSON 值，返回值结束后的位置
+    由 C 扫描器逐个解码并立即丢弃，同一时刻只存在一个顶层元素的对象，内存与文件大小无关
+    - symbolName: skip_value
+    """
+    try:
+        return _scan_once(text, pos)[1]
+    except StopIteration as e:
+        raise _error('缺少值或值格式错误', text, e.value) from None
+
+
+def iter_json_spans(text: str) -> Iterator[Tuple[str, str, int, int]]:
+    """
+    增量扫描 JSON 文本的顶层结构，依次产出 (类型, 名称, 起始偏移, 结束偏移)，偏移为 text 中的字符下标（不是 UTF-8 字节偏移）：
+    顶层为数组时每个元素为 json_item（名称 item_序号，区间为元素值），
+    顶层为对象时每个键为 json_field（名称为键，区间从键到值结束）；顶层为标量时不产出。
+    结构错误或顶层值之后还有非空白内容时抛出 json.JSONDecodeError（与 json.loads 一致）。
+    - symbolName: iter_json_spans
+    """
+    pos = _skip_ws(text, 0)
+    if pos >= len(text):
+        raise _error('空文档', text, pos)
+    opener = text[pos]
+    if opener not in '[{':
+        _expect_end(text, skip_value(text, pos))
+        return
+    closer = ']' if opener == '[' else '}'
+    pos = _skip_ws(text, pos + 1)
+    index = 0
+    if text.startswith(closer, pos):
+        _expect_end(text, pos + 1)
+        return
+    while True:
+        if opener == '[':
+            start = pos
+            end = skip_value(text, pos)
+            yield 'json_item', f'item_{index}', start, end
+        else:
+            key = _STRING_RE.match(text, pos)
+            if key is None:
+                raise _error('对象的键必须是字符串', text, pos)
+            start = key.start()
+            pos = _skip_ws(text, key.end())
+            if not text.startswith(':', pos):
+                raise _error("键后缺少 ':'", text, pos)
+            end = skip_value(text, _skip_ws(text, pos + 1))
+            yield 'json_field', json.loads(key.group()), start, end
+        index += 1
+        pos = _skip_ws(text, end)
+        if text.startswith(',', pos):
+            pos = _skip_ws(text, pos + 1)
+        elif text.startswith(closer, pos):
+            _expect_end(text, pos + 1)
+            return
+        else:
+            raise _error(f"缺少 ',' 或 '{closer}'", text, pos)
+
+
+def scan_json(text: str, file_path: str = '', source: Optional[SourceFile] = None) -> List[ElementRecord]:
+    """
+    扫描 JSON 文件的顶层元素，返回带字符区间（text 中的下标）与行号的元素记录（内容按需从共享源码切片）
+    - symbolName: scan_json
+    """
+    source = source or SourceFile(file_path, text)
+    return [ElementRecord.from_span(source, start, end, kind, name)
+            for kind, name, start, end in iter_json_spans(text)]
@@ -0,0 +1,337 @@
+# project_generator/APIexplorer/parser_registry.py
+# file: parser_registry.py
+
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .css_parser import parse_css
+    from .element_record import ElementRecord, SourceFile
+    from .js_parser import parse_js
+    from .json_scanner import scan_json
+    from .parse_cache import DiskParseCache, cache_enabled
+    from .template_parser import parse_template
+except ImportError:
+    from css_parser import parse_css
+    from element_record import ElementRecord, SourceFile
+    from js_parser import parse_js
+    from json_scanner import scan_json
+    from parse_cache import DiskParseCache, cache_enabled
+    from template_parser import parse_template
+
+# 超过该字符数的 JSON 数据文件（如随使用增长的 orders.json）不逐项索引，只登记为一个文件元素
+JSON_INDEX_MAX_SIZE = 2 * 1024 * 1024
+# 内存中保留的解析结果个数（按最近使用淘汰）
+PARSE_CACHE_ENTRIES = 512
+
+# 解析函数签名：(文件内容, 文件路径, 共享源码句柄) -> {'elements': [...], 'type': ..., ...}
+Parser = Callable[[str, str, SourceFile], Dict[str, Any]]
+
+
+def content_hash(content: str) -> str:
+    """
+    文件内容的 sha256，作为解析结果缓存键的一部分
+    - symbolName: content_hash
+    """
+    return hashlib.sha256(content.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+# ---------- Python ----------
+def parse_python(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    使用AST解析Python代码：函数、类与方法（类内定义的函数，限定名为 类名.方法名）。
+    元素带参数名、签名、装饰器、文档字符串首行等描述，类额外带基类与类属性。
+    - symbolName: parse_python
+    """
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        return {'error': f'语法错误: {str(e)}', 'type': 'python'}
+
+    # 先收集一次类的行范围（ast.walk 顺序），函数按行号判断所属的类
+    class_ranges = [(node.lineno, getattr(node, 'end_lineno', float('inf')), node.name)
+                    for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+    functions: List[ElementRecord] = []
+    classes: List[ElementRecord] = []
+    methods: List[ElementRecord] = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            classes.append(ElementRecord.from_lines(
+                source, node.lineno, getattr(node, 'end_lineno', node.lineno), 'class', node.name,
+                **describe_class(node)
+            ))
+        elif isinstance(node, ast.FunctionDef):
+            end_line = getattr(node, 'end_lineno', node.lineno)
+            parent_class = next((name for start, end, name in class_ranges if start <= node.lineno <= end), None)
+            if parent_class:
+                methods.append(ElementRecord.from_lines(
+                    source, node.lineno, end_line, 'method', f"{parent_class}.{node.name}",
+                    **{'class': parent_class}, **describe_function(node)
+                ))
+            else:
+                functions.append(ElementRecord.from_lines(
+                    source, node.lineno, end_line, 'function', node.name, **describe_function(node)
+                ))
+
+    return {
+        'functions': functions,
+        'classes': classes,
+        'methods': methods,
+        'elements': functions + classes + methods,
+        'type': 'python'
+    }
+
+
+def describe_function(node: ast.FunctionDef) -> Dict[str, Any]:
+    """
+    提取函数的参数名、签名、装饰器（如 @app.route）与文档字符串首行
+    - symbolName: describe_function
+    """
+    return {
+        'args': [arg.arg for arg in node.args.args],
+        'signature': f"def {node.name}({ast.unparse(node.args)})"
+                     + (f" -> {ast.unparse(node.returns)}" if node.returns else ""),
+        'decorators': [ast.unparse(d) for d in node.decorator_list],
+        'docstring': _first_doc_line(node)
+    }
+
+
+def describe_class(node: ast.ClassDef) -> Dict[str, Any]:
+    """
+    提取类的基类、装饰器、类属性与文档字符串首行
+    - symbolName: describe_class
+    """
+    attributes = []
+    for stmt in node.body:
+        if isinstance(stmt, ast.Assign):
+            value = ast.unparse(stmt.value)
+            for target in stmt.targets:
+                attributes.append(f"{ast.unparse(target)} = {value}")
+        elif isinstance(stmt, ast.AnnAssign):
+            attr = f"{ast.unparse(stmt.target)}: {ast.unparse(stmt.annotation)}"
+            if stmt.value is not None:
+                attr += f" = {ast.unparse(stmt.value)}"
+            attributes.append(attr)
+    return {
+        'bases': [ast.unparse(b) for b in node.bases],
+        'decorators': [ast.unparse(d) for d in node.decorator_list],
+        'attributes': attributes,
+        'docstring': _first_doc_line(node)
+    }
+
+
+def _first_doc_line(node: ast.AST) -> str:
+    doc = ast.get_docstring(node)
+    return doc.strip().splitlines()[0] if doc and doc.strip() else ''
+
+
+# ---------- 其他文件类型 ----------
+def parse_html(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    HTML/Jinja 模板：表单、url_for、block、macro、for、extends/include 与静态资源
+    - symbolName: parse_html
+    """
+    return {'elements': parse_template(content, file_path, source), 'type': 'html'}
+
+
+def parse_json_data(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    JSON：增量扫描顶层元素；超过 JSON_INDEX_MAX_SIZE 的数据文件只登记为一个文件元素
+    - symbolName: parse_json_data
+    """
+    if len(content) > JSON_INDEX_MAX_SIZE:
+        return {
+            'elements': [ElementRecord.from_span(
+                source, 0, len(content), 'json_file', os.path.basename(file_path), skipped=True
+            )],
+            'type': 'json'
+        }
+    try:
+        return {'elements': scan_json(content, file_path, source), 'type': 'json'}
+    except json.JSONDecodeError as e:
+        return {'error': f'JSON解析错误: {str(e)}', 'type': 'json'}
+
+
+def parse_text(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    文本文件（如README.md）：提取 # 标题
+    - symbolName: parse_text
+    """
+    elements = []
+    for match in re.finditer(r'^#.*$', content, re.MULTILINE):
+        elements.append(ElementRecord.from_span(
+            source, match.start(), match.end(), 'header', match.group().strip('# ').replace(' ', '_')
+        ))
+    return {'elements': elements, 'type': 'text'}
+
+
+def parse_javascript(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    JavaScript：类、方法、函数、事件绑定与 fetch 请求
+    - symbolName: parse_javascript
+    """
+    return {'elements': parse_js(content, file_path, source), 'type': 'javascript'}
+
+
+def parse_stylesheet(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    CSS：规则、@media 等条件组（含嵌套）、@keyframes 与 @import，忽略注释
+    - symbolName: parse_stylesheet
+    """
+    return {'elements': parse_css(content, file_path, source), 'type': 'css'}
+
+
+def parse_generic(content: str, file_path: str, source: SourceFile) -> Dict[str, Any]:
+    """
+    不支持的文件类型：整个文件作为一个元素
+    - symbolName: parse_generic
+    """
+    return {
+        'elements': [ElementRecord.from_lines(
+            source, 1, source.buffer.line_count, 'file', os.path.basename(file_path)
+        )],
+        'type': 'generic'
+    }
+
+
+class ParserRegistry:
+    """
+    解析器注册表：扩展名/语言名 -> 解析函数，解析结果按 (解析器, 文件绝对路径, 内容哈希) 记忆化。
+    CodeAnalyzer、ProfessionalCodeParser 与 ProjectAPIExposer 共用同一个注册表，
+    同一文件内容不变时只解析一次；结果为共享对象，调用方不应修改。可在多个线程中同时使用。
+    设置 disk_cache 后，内存未命中时再按 (解析器, 内容哈希) 查询用户级磁盘缓存，跨进程、跨工作区复用。
+    - symbolName: ParserRegistry
+    """
+
+    def __init__(self, max_entries: int = PARSE_CACHE_ENTRIES, disk_cache: Optional[DiskParseCache] = None):
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._by_extension: Dict[str, Tuple[str, Parser]] = {}
+        self._by_language: Dict[str, Tuple[str, Parser]] = {}
+        self._cache: 'OrderedDict[Tuple[str, str, str], Dict[str, Any]]' = OrderedDict()
+        # 保护 _cache 与命中计数；解析本身不持锁，两个线程同时未命中同一文件时各解析一次
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def register(self, name: str, parser: Parser, extensions: Iterable[str] = (), languages: Iterable[str] = ()):
+        """
+        登记解析器；后登记的同名扩展名/语言覆盖先前的
+        - symbolName: register
+        """
+        for ext in extensions:
+            self._by_extension[ext.lower()] = (name, parser)
+        for language in (name, *languages):
+            self._by_language[language.lower()] = (name, parser)
+
+    @property
+    def extensions(self) -> List[str]:
+        return list(self._by_extension)
+
+    def supports(self, file_path: str) -> bool:
+        """
+        是否有针对该文件扩展名的专用解析器
+        - symbolName: supports
+        """
+        return os.path.splitext(file_path)[1].lower() in self._by_extension
+
+    def supports_language(self, language: str) -> bool:
+        return language.lower() in self._by_language
+
+    def _resolve(self, file_path: str, language: Optional[str]) -> Tuple[str, Parser]:
+        if language is not None:
+            entry = self._by_language.get(language.lower())
+        else:
+            entry = self._by_extension.get(os.path.splitext(file_path)[1].lower())
+        return entry or ('generic', parse_generic)
+
+    def parse(self, content: str, file_path: str = '', source: Optional[SourceFile] = None,
+              language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        解析文件：language 指定时按语言选择解析器，否则按扩展名；均无匹配时整体作为一个元素。
+        内容未变化时直接返回缓存的结果（source 仅在首次解析时使用）。
+        缓存键使用文件的绝对路径（source 带磁盘路径时以磁盘路径为准）：不同项目中相对路径与内容都相同的文件各自缓存，
+        命中的记录不会指向另一个项目的文件
+        - symbolName: parse
+        """
+        name, parser = self._resolve(file_path, language)
+        digest = content_hash(content)
+        location = source.disk_path if source is not None and source.disk_path else file_path
+        key = (name, os.path.abspath(location) if location else '', digest)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        source = source or SourceFile(file_path, content)
+        # 通用的整体文件元素解析代价很低，不写入磁盘缓存
+        persistent = self.disk_cache is not None and name != 'generic'
+        result = self.disk_cache.get(name, digest, source) if persistent else None
+        from_disk = result is not None
+        if not from_disk:
+            result = parser(content, file_path, source)
+            if persistent:
+                self.disk_cache.put(name, digest, result, file_path)
+        with self._lock:
+            if from_disk:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        """
+        清空内存中的解析结果缓存（磁盘缓存见 DiskParseCache.clear）
+        - symbolName: clear
+        """
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'disk_hits': self.disk_hits,
+                    'misses': self.misses}
+
+
+def create_default_registry(disk_cache: Optional[DiskParseCache] = None) -> ParserRegistry:
+    """
+    创建登记了全部内置解析器的注册表
+    - symbolName: create_default_registry
+    """
+    registry = ParserRegistry(disk_cache=disk_cache)
+    registry.register('python', parse_python, ['.py'], ['py'])
+    registry.register('html', parse_html, ['.html', '.jinja', '.j2'], ['jinja', 'template'])
+    registry.register('json', parse_json_data, ['.json'])
+    registry.register('text', parse_text, ['.md', '.txt'], ['markdown'])
+    registry.register('javascript', parse_javascript, ['.js'], ['js'])
+    registry.register('css', parse_stylesheet, ['.css'])
+    return registry
+
+
+# 进程内共享的默认注册表；导入时不开启磁盘缓存，由命令行（--disk-cache）或调用方通过 enable_disk_cache 开启
+DEFAULT_REGISTRY = create_default_registry()
+
+
+def enable_disk_cache(directory: Optional[str] = None,
+                      registry: Optional[ParserRegistry] = None) -> Optional[DiskParseCache]:
+    """
+    为注册表（默认 DEFAULT_REGISTRY）开启用户级磁盘缓存并返回之；环境变量 APIEXPLORER_CACHE=0 时保持关闭，返回 None
+    - symbolName: enable_disk_cache
+    """
+    registry = registry or DEFAULT_REGISTRY
+    registry.disk_cache = DiskParseCache(directory) if cache_enabled() else None
+    return registry.disk_cache
@@ -0,0 +1,498 @@
+# project_generator/APIexplorer/project_graph.py
+# file: project_graph.py
+# 跨文件依赖图：python project_graph.py <项目目录> [节点 ...]
+
+import argparse
+import ast
+import os
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .js_parser import parse_js
+    from .template_parser import parse_template
+except ImportError:
+    from js_parser import parse_js
+    from template_parser import parse_template
+
+# 节点为项目内相对路径（'/' 分隔），或 'route:<endpoint>' 形式的路由节点
+ROUTE_PREFIX = 'route:'
+
+# 边类型
+IMPORTS = 'imports'          # Python 文件 -> 被导入的 Python 文件
+DEFINED_IN = 'defined_in'    # 路由 -> 定义它的 Python 文件
+RENDERS = 'renders'          # 路由 -> render_template 的模板
+URL_FOR = 'url_for'          # 模板 -> url_for 的路由
+EXTENDS = 'extends'          # 模板 -> 父模板
+INCLUDES = 'includes'        # 模板 -> 被包含的模板
+STATIC = 'static'            # 模板 -> 引用的静态资源（CSS/JS/图片）
+FETCH = 'fetch'              # JS（或内联脚本所在模板）-> fetch 调用的路由
+
+GRAPH_EXTENSIONS = ('.py', '.html', '.jinja', '.j2', '.js', '.css')
+_TEMPLATE_EXTENSIONS = ('.html', '.jinja', '.j2')
+
+_FETCH_RE = re.compile(r'\b(?:fetch|axios\.(get|post|put|patch|delete))\(\s*([\'"`])(.*?)\2', re.DOTALL)
+_METHOD_RE = re.compile(r'\bmethod\s*:\s*[\'"](\w+)[\'"]')
+_URL_IN_TEXT_RE = re.compile(r'(?<![\w.])(/[\w\-./<>:]*)')
+
+
+def _route_node(endpoint: str) -> str:
+    return ROUTE_PREFIX + endpoint
+
+
+def _split_url(url: str) -> List[str]:
+    return [seg for seg in url.split('?')[0].split('#')[0].strip('/').split('/') if seg]
+
+
+class Route:
+    """
+    Flask 路由：端点名、URL 规则、HTTP 方法与定义位置
+    - symbolName: Route
+    """
+
+    __slots__ = ('endpoint', 'rule', 'methods', 'file_path', 'line', 'patterns')
+
+    def __init__(self, endpoint: str, rule: str, methods: Iterable[str], file_path: str, line: int):
+        self.endpoint = endpoint
+        self.rule = rule
+        self.methods = {m.upper() for m in methods}
+        self.file_path = file_path
+        self.line = line
+        self.patterns: List[List[Optional[str]]] = []
+        self.add_rule(rule)
+
+    def add_rule(self, rule: str):
+        """
+        登记一条 URL 规则（同一视图函数可叠加多个 @route）；<int:id> 等变量段记为 None，可匹配任意值
+        - symbolName: add_rule
+        """
+        self.patterns.append([None if seg.startswith('<') else seg for seg in _split_url(rule)])
+
+    def match_score(self, segments: List[Optional[str]], anchored: bool) -> int:
+        """
+        与 JS 中的 URL 段比较：返回各规则中匹配的最多字面段数，均不匹配返回 -1。
+        anchored 为 False 表示 URL 以未知前缀开头（如 `${apiBaseUrl}/tasks`），只比较尾部
+        - symbolName: match_score
+        """
+        best = -1
+        for rule in self.patterns:
+            if anchored:
+                if len(rule) != len(segments):
+                    continue
+            else:
+                if len(rule) < len(segments):
+                    continue
+                rule = rule[len(rule) - len(segments):]
+            score = 0
+            for expected, actual in zip(rule, segments):
+                if expected is None or actual is None:
+                    continue
+                if expected != actual:
+                    score = -1
+                    break
+                score += 1
+            best = max(best, score)
+        return best
+
+
+class ProjectGraph:
+    """
+    项目依赖图：Python 导入、路由 -> render_template、模板 -> url_for、extends/include、
+    静态资源引用、JS fetch -> Flask 路由。支持正向与反向（谁依赖我）查询。
+    - symbolName: ProjectGraph
+    """
+
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.routes: Dict[str, Route] = {}
+        # (文件, 视图函数行号) -> 端点名
+        self._route_at: Dict[Tuple[str, int], str] = {}
+        # 邻接表：节点 -> {(目标节点, 边类型)}
+        self._out: Dict[str, Set[Tuple[str, str]]] = {}
+        self._in: Dict[str, Set[Tuple[str, str]]] = {}
+
+    # ---------- 构建 ----------
+    @classmethod
+    def build(cls, project_files: Dict[str, str]) -> 'ProjectGraph':
+        """
+        由 {相对路径: 内容} 构建依赖图
+        - symbolName: build
+        """
+        graph = cls()
+        files = {p.replace('\\', '/'): c for p, c in project_files.items()}
+        graph.files = set(files)
+        python_files = {p: c for p, c in files.items() if p.endswith('.py')}
+        trees = {}
+        for path, content in python_files.items():
+            try:
+                trees[path] = ast.parse(content)
+            except SyntaxError:
+                continue
+        # 先收集所有路由，模板与 JS 的边需要按端点/URL 解析
+        for path, tree in trees.items():
+            graph._collect_routes(path, tree)
+        for path, tree in trees.items():
+            graph._link_python(path, tree)
+        for path, content in files.items():
+            if path.endswith(_TEMPLATE_EXTENSIONS):
+                graph._link_template(path, content)
+                # 模板中的内联脚本也可能调用接口
+                graph._link_fetch(path, content)
+            elif path.endswith('.js'):
+                graph._link_fetch(path, content)
+        return graph
+
+    @classmethod
+    def from_directory(cls, project_root: str) -> 'ProjectGraph':
+        """
+        读取目录下的相关文件并构建依赖图
+        - symbolName: from_directory
+        """
+        project_files = {}
+        for root, _, names in os.walk(project_root):
+            for name in names:
+                if not name.endswith(GRAPH_EXTENSIONS):
+                    continue
+                full = os.path.join(root, name)
+                try:
+                    with open(full, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except (UnicodeDecodeError, OSError):
+                    continue
+                project_files[os.path.relpath(full, project_root).replace('\\', '/')] = content
+        return cls.build(project_files)
+
+    def add_edge(self, source: str, target: str, kind: str):
+        """
+        添加一条有向边
+        - symbolName: add_edge
+        """
+        if source == target:
+            return
+        self._out.setdefault(source, set()).add((target, kind))
+        self._in.setdefault(target, set()).add((source, kind))
+
+    def _collect_routes(self, path: str, tree: ast.AST):
+        """
+        收集 @app.route / @bp.route / @app.get 等装饰器声明的路由
+        - symbolName: _collect_routes
+        """
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for deco in node.decorator_list:
+                if not (isinstance(deco, ast.Call) and isinstance(deco.func, ast.Attribute)):
+                    continue
+                verb = deco.func.attr
+                if verb not in ('route', 'get', 'post', 'put', 'patch', 'delete'):
+                    continue
+                if not deco.args or not isinstance(deco.args[0], ast.Constant) or not isinstance(deco.args[0].value, str):
+                    continue
+                methods = ['GET'] if verb == 'route' else [verb]
+                endpoint = node.name
+                for kw in deco.keywords:
+                    if kw.arg == 'methods' and isinstance(kw.value, (ast.List, ast.Tuple, ast.Set)):
+                        methods = [e.value for e in kw.value.elts if isinstance(e, ast.Constant)]
+                    elif kw.arg == 'endpoint' and isinstance(kw.value, ast.Constant):
+                        endpoint = kw.value.value
+                route = self.routes.get(endpoint)
+                if route is None:
+                    self.routes[endpoint] = Route(endpoint, deco.args[0].value, methods, path, node.lineno)
+                else:
+                    # 同一视图函数叠加多个 @route：合并规则与方法
+                    route.add_rule(deco.args[0].value)
+                    route.methods.update(m.upper() for m in methods)
+                self._route_at[(path, node.lineno)] = endpoint
+                self.add_edge(_route_node(endpoint), path, DEFINED_IN)
+
+    def _link_python(self, path: str, tree: ast.AST):
+        """
+        Python 文件：导入边，以及视图函数中的 render_template 边
+        - symbolName: _link_python
+        """
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    target = self._resolve_module(path, alias.name, 0)
+                    if target:
+                        self.add_edge(path, target, IMPORTS)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ''
+                target = self._resolve_module(path, base, node.level) if base else None
+                if target:
+                    self.add_edge(path, target, IMPORTS)
+                # from package import module
+                for alias in node.names:
+                    sub = self._resolve_module(path, f"{base}.{alias.name}" if base else alias.name, node.level)
+                    if sub and sub != target:
+                        self.add_edge(path, sub, IMPORTS)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                endpoint = self._route_at.get((path, node.lineno))
+                if endpoint is None:
+                    continue
+                for call in ast.walk(node):
+                    if (isinstance(call, ast.Call) and _call_name(call) == 'render_template'
+                            and call.args and isinstance(call.args[0], ast.Constant)
+                            and isinstance(call.args[0].value, str)):
+                        template = self._resolve_template(call.args[0].value)
+                        if template:
+                            self.add_edge(_route_node(endpoint), template, RENDERS)
+
+    def _link_template(self, path: str, content: str):
+        """
+        模板：extends/include、url_for 目标、静态资源引用
+        - symbolName: _link_template
+        """
+        for element in parse_template(content, path):
+            kind, name = element.kind, element.qualname
+            if kind == 'extends':
+                target = self._resolve_template(name)
+                if target:
+                    self.add_edge(path, target, EXTENDS)
+            elif kind in ('include', 'import'):
+                target = self._resolve_template(name)
+                if target:
+                    self.add_edge(path, target, INCLUDES)
+            elif kind == 'url_for':
+                if name == 'static' or name.endswith('.static'):
+                    filename = element.get('filename')
+                    asset = self._resolve_asset(path, filename, static=True) if filename else None
+                    if asset:
+                        self.add_edge(path, asset, STATIC)
+                    continue
+                route = self._find_endpoint(name)
+                if route:
+                    self.add_edge(path, _route_node(route.endpoint), URL_FOR)
+            elif kind == 'asset':
+                asset = self._resolve_asset(path, name, static=False)
+                if asset:
+                    self.add_edge(path, asset, STATIC)
+
+    def _link_fetch(self, path: str, content: str):
+        """
+        fetch/axios 调用：按 URL 段与请求方法匹配 Flask 路由
+        .js 文件用 JS 解析器（忽略注释中的调用，方法取自 options 中的 method 字段），模板内联脚本按正则匹配
+        - symbolName: _link_fetch
+        """
+        if path.endswith('.js'):
+            requests = [(el['url'], el['method']) for el in parse_js(content, path) if el.kind == 'fetch']
+        else:
+            requests = []
+            for match in _FETCH_RE.finditer(content):
+                method = (match.group(1) or '').upper()
+                if not method:
+                    # fetch 的方法写在紧随其后的 options 对象中，缺省为 GET
+                    options = _METHOD_RE.search(content, match.end(), match.end() + 300)
+                    method = options.group(1).upper() if options else 'GET'
+                requests.append((match.group(3), method))
+        for url, method in requests:
+            for route in self.match_url(url, method):
+                self.add_edge(path, _route_node(route.endpoint), FETCH)
+
+    # ---------- 解析辅助 ----------
+    def _resolve_module(self, path: str, module: str, level: int) -> Optional[str]:
+        rel = module.replace('.', '/')
+        directory = posixpath.dirname(path)
+        if level:
+            for _ in range(level - 1):
+                directory = posixpath.dirname(directory)
+            bases = [directory]
+        else:
+            # 生成的项目以脚本所在目录为导入根（如 backend/app.py 中的 from database import ...）
+            bases = [directory, '']
+        for base in bases:
+            for candidate in (f"{rel}.py", f"{rel}/__init__.py"):
+                full = posixpath.normpath(posixpath.join(base, candidate)) if base else candidate
+                if full in self.files:
+                    return full
+        return None
+
+    def _resolve_template(self, name: str) -> Optional[str]:
+        name = name.lstrip('/')
+        for candidate in (f"templates/{name}", name):
+            if candidate in self.files:
+                return candidate
+        matches = [p for p in self.files if p.endswith('/templates/' + name)]
+        return matches[0] if len(matches) == 1 else None
+
+    def _resolve_asset(self, template_path: str, ref: str, static: bool) -> Optional[str]:
+        if re.match(r'^(?:[a-z]+:|//|#)', ref, re.IGNORECASE):
+            return None
+        ref = ref.split('?')[0].split('#')[0]
+        candidates = []
+        if static:
+            candidates.append(posixpath.join('static', ref.lstrip('/')))
+        elif ref.startswith('/'):
+            candidates.append(ref.lstrip('/'))
+        else:
+            candidates.append(posixpath.normpath(posixpath.join(posixpath.dirname(template_path), ref)))
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        matches = [p for p in self.files if p.endswith('/' + ref.lstrip('/'))]
+        return matches[0] if len(matches) == 1 else None
+
+    def _find_endpoint(self, endpoint: str) -> Optional[Route]:
+        # 蓝图端点 'bp.view' 在只按函数名收集时回退到最后一段
+        return self.routes.get(endpoint) or self.routes.get(endpoint.rsplit('.', 1)[-1])
+
+    def match_url(self, url: str, method: Optional[str] = None) -> List[Route]:
+        """
+        把前端 URL（可含 ${...} 占位符）匹配到路由；只返回字面段匹配最多的那些
+        - symbolName: match_url
+        """
+        anchored = not url.startswith('${') and not re.match(r'^[a-z]+://', url)
+        url = re.sub(r'^[a-z]+://[^/]+', '', url)
+        segments = []
+        for seg in _split_url(url):
+            if '${' in seg and not segments and not anchored:
+                # 开头的 ${apiBaseUrl} 前缀不参与比较
+                continue
+            if '${' in seg or seg.startswith('<'):
+                segments.append(None)
+            else:
+                segments.append(seg)
+        if not segments:
+            return []
+        best, found = 0, []
+        for route in self.routes.values():
+            if method and route.methods and method.upper() not in route.methods:
+                continue
+            score = route.match_score(segments, anchored)
+            if score < 0 or score < best:
+                continue
+            if score > best:
+                best, found = score, []
+            found.append(route)
+        return found if best > 0 else []
+
+    # ---------- 查询 ----------
+    def dependencies(self, node: str, kinds: Optional[Iterable[str]] = None, transitive: bool = False) -> Set[str]:
+        """
+        node 依赖的节点（出边），可限定边类型并求传递闭包
+        - symbolName: dependencies
+        """
+        return self._walk(self._out, node, kinds, transitive)
+
+    def dependents(self, node: str, kinds: Optional[Iterable[str]] = None, transitive: bool = False) -> Set[str]:
+        """
+        反向依赖：依赖 node 的节点（入边），可限定边类型并求传递闭包
+        - symbolName: dependents
+        """
+        return self._walk(self._in, node, kinds, transitive)
+
+    def _walk(self, adjacency, node: str, kinds, transitive: bool) -> Set[str]:
+        kinds = set(kinds) if kinds else None
+        seen: Set[str] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for target, kind in adjacency.get(current, ()):
+                if kinds is not None and kind not in kinds:
+                    continue
+                if target not in seen and target != node:
+                    seen.add(target)
+                    if transitive:
+                        stack.append(target)
+        return seen
+
+    def edges(self) -> List[Tuple[str, str, str]]:
+        """
+        所有边 (源, 目标, 类型)，按源节点排序
+        - symbolName: edges
+        """
+        return sorted((src, dst, kind) for src, targets in self._out.items() for dst, kind in targets)
+
+    def routes_mentioned(self, text: str) -> List[str]:
+        """
+        找出文本（如 bug 报告）中以端点名或 URL 提及的路由节点
+        - symbolName: routes_mentioned
+        """
+        found = []
+        words = set(re.findall(r'[A-Za-z_][\w.]*', text))
+        for endpoint in self.routes:
+            if endpoint in words:
+                found.append(_route_node(endpoint))
+        for url in _URL_IN_TEXT_RE.findall(text):
+            for route in self.match_url(url):
+                found.append(_route_node(route.endpoint))
+        return list(dict.fromkeys(found))
+
+    def related_files(self, seeds: Iterable[str]) -> List[str]:
+        """
+        修改 seeds（路由节点或文件）时需要一并查看的文件：
+        - 路由：定义文件、渲染的模板、通过 fetch 调用它的 JS/模板；
+          接受 POST 等方法的路由还包括以 url_for 提交到它的模板（只读导航链接不算）
+        - 模板：extends/include 链、直接引用的静态资源、渲染它的路由所在文件
+        - JS：它调用的路由所在文件、引用它的模板
+        - Python：直接导入的模块与直接导入它的模块
+        模板均补全 extends/include 链；不沿静态资源向外扩散，避免把公共样式/脚本带给每个路由
+        - symbolName: related_files
+        """
+        layout = (EXTENDS, INCLUDES)
+        related: Set[str] = set()
+
+        def add_template(template: str):
+            related.add(template)
+            related.update(self.dependencies(template, layout, transitive=True))
+
+        for seed in seeds:
+            if seed.startswith(ROUTE_PREFIX):
+                related.update(self.dependencies(seed, [DEFINED_IN]))
+                for template in self.dependencies(seed, [RENDERS]):
+                    add_template(template)
+                related.update(self.dependents(seed, [FETCH]))
+                route = self.routes.get(seed[len(ROUTE_PREFIX):])
+                if route and route.methods - {'GET', 'HEAD'}:
+                    related.update(self.dependents(seed, [URL_FOR]))
+                continue
+            if seed not in self.files:
+                continue
+            related.add(seed)
+            if seed.endswith(_TEMPLATE_EXTENSIONS):
+                add_template(seed)
+                related.update(self.dependencies(seed, [STATIC]))
+                for route in self.dependents(seed, [RENDERS]):
+                    related.update(self.dependencies(route, [DEFINED_IN]))
+            elif seed.endswith('.js'):
+                for route in self.dependencies(seed, [FETCH]):
+                    related.update(self.dependencies(route, [DEFINED_IN]))
+                related.update(self.dependents(seed, [STATIC]))
+            elif seed.endswith('.py'):
+                related.update(self.dependencies(seed, [IMPORTS]))
+                related.update(self.dependents(seed, [IMPORTS]))
+            elif seed.endswith('.css'):
+                related.update(self.dependents(seed, [STATIC]))
+        return sorted(p for p in related if p in self.files)
+
+
+def _call_name(call: ast.Call) -> str:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='项目跨文件依赖图')
+    parser.add_argument('project', help='项目目录')
+    parser.add_argument('nodes', nargs='*', help="要查询的节点：相对路径或 route:<端点名>；不指定则输出全部边")
+    args = parser.parse_args()
+
+    graph = ProjectGraph.from_directory(args.project)
+    if not args.nodes:
+        for src, dst, kind in graph.edges():
+            print(f"{src} --{kind}--> {dst}")
+        return
+    for node in args.nodes:
+        print(f"[{node}]")
+        print(f"  依赖: {', '.join(sorted(graph.dependencies(node))) or '-'}")
+        print(f"  被依赖: {', '.join(sorted(graph.dependents(node))) or '-'}")
+        print(f"  相关文件: {', '.join(graph.related_files([node])) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# project_generator/APIexplorer/source_buffer.py
+# file: source_buffer.py
+
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+
+class SourceBuffer:
+    """
+    源码缓冲区：一次性建立换行偏移表，之后用二分查找把字符偏移映射为行号/列号（O(log n)），
+    替代每次匹配都执行 content[:offset].count('\\n') 的二次复杂度做法。
+    - symbolName: SourceBuffer
+    """
+
+    __slots__ = ('text', 'line_starts')
+
+    def __init__(self, text: str):
+        self.text = text
+        # line_starts[i] 为第 i+1 行首字符的偏移；用紧凑数组保存（每行8字节），元素记录会长期持有它
+        starts = array('q', [0])
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.line_starts = starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """
+        字符偏移 -> 行号（从1开始）
+        - symbolName: line_of
+        """
+        return bisect_right(self.line_starts, offset)
+
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        """
+        字符偏移 -> (行号, 列号)，均从1开始
+        - symbolName: line_col
+        """
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def line_span(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        偏移区间 -> (起始行, 结束行)，与 content[:offset].count('\\n') + 1 的结果一致
+        - symbolName: line_span
+        """
+        return self.line_of(start), self.line_of(end)
+
+    def offset_of(self, line: int, col: int = 1) -> int:
+        """
+        (行号, 列号) -> 字符偏移
+        - symbolName: offset_of
+        """
+        return self.line_starts[line - 1] + col - 1
+
+    def line_text(self, line: int) -> str:
+        """
+        获取指定行的文本（不含换行符）
+        - symbolName: line_text
+        """
+        start = self.line_starts[line - 1]
+        end = self.line_starts[line] - 1 if line < len(self.line_starts) else len(self.text)
+        return self.text[start:end]
@@ -10,10 +10,15 @@ from typing import Dict, List, Any, Tuple, Optional
 
 # 导入所有必要的提示词和工具
 from ToDoList.config import OUTPUT_DIR
-from ToDoList.prompts import PROJECT_PROMPT, REPAIR_PROMPT, DEBUG_PROMPT
-from ToDoList.utils.api_client import call_deepseek
+from ToDoList.prompts import PROJECT_PROMPT, REPAIR_PROMPT, DEBUG_PROMPT, FLASH_PHOTO_QUERY_PROMPT
+from ToDoList.utils.api_client import call_deepseek, get_model_route
 from ToDoList.utils.file_operations import parse_files_from_model, write_files, read_project_files, parse_files_from_model_with_continuation
-from ToDoList.code_analyzer import CodeAnalyzer
+from ToDoList.utils.file_operations import parse_detected_files, resolve_project_path, sanitize_path, DETECTABLE_EXTENSIONS
+from ToDoList.code_analyzer import CodeAnalyzer, FRONTEND_EXTENSIONS
+from ToDoList.APIexplorer.project_graph import ProjectGraph
+from ToDoList.skeleton import build_skeleton_dump, build_file_skeleton
+from ToDoList.flashphoto import load_flashphoto_summaries, update_flashphoto
+from ToDoList.utils.pipeline import PipelineStage, PipelineError, run_pipeline
 
 # ------------------
 # 新增：来自 chat.py 的截断续写实现（已适配为使用 call_deepseek）
@@ -28,49 +33,105 @@ class AutomationError(Exception):
     pass
 
 
-def detect_relevant_files_with_model(bug_report: str, project_files: Dict[str, str]) -> List[str]:
+def find_related_files(bug_report: str, paths: List[str], project_files: Dict[str, str], limit: int) -> List[str]:
+    """
+    用项目依赖图查找参考文件：bug 报告中提到的路由，以及已选中的模板/JS/CSS，
+    按 route -> 模板、url_for 表单、fetch 调用、extends/include 链找出相关文件（最多 limit 个，不含 paths 本身）。
+    这些文件只作为只读上下文提供给模型，不加入待修改列表，修改范围仍只由检测结果决定。
+    Python 文件不作为种子，避免把整个 app.py 的所有模板都带进来。
+    """
+    try:
+        graph = ProjectGraph.build(project_files)
+        seeds = graph.routes_mentioned(bug_report)
+        seeds += [p.replace('\\', '/') for p in paths if not p.endswith('.py')]
+        related = graph.related_files(seeds)
+    except Exception as e:
+        print(f"⚠️ 依赖图分析失败，跳过参考文件: {e}")
+        return []
+
+    extra = []
+    for rel in related:
+        resolved = resolve_project_path(rel, project_files.keys())
+        if resolved and resolved not in paths and resolved not in extra:
+            extra.append(resolved)
+    extra = extra[:limit]
+    for p in extra:
+        print(f"   · {p}: 依赖图关联（只读参考）")
+    return extra
+
+
+def build_reference_dump(context_paths: List[str], project_files: Dict[str, str]) -> str:
+    """参考文件的骨架（签名/路由/模板结构），作为修复或新建文件时的只读上下文"""
+    return '\n'.join(f"- {p}:\n{build_file_skeleton(p, project_files[p])}"
+                     for p in context_paths if p in project_files)
+
+
+def detect_relevant_files_with_model(bug_report: str, project_files: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """
+    定位需要修改或新建的文件（最多 max_items 个），返回 (待修改文件, 依赖图关联的只读参考文件)
+    """
+    max_items = get_model_route("detect_files").get("max_items", 8)
+    # 优先使用已有的 flashphoto 摘要作为检索上下文（不在此处调用模型，变更文件的摘要由 refresh_flashphoto 阶段刷新）
+    summaries = load_flashphoto_summaries(project_files)
+
+    if summaries:
+        # 摘要缺失的文件（摘要失败或类型不支持）以骨架补充
+        lines = [f"- {p}: {' '.join(summary.split())}" for p, summary in summaries.items()]
+        lines.extend(f"- {p}: [skeleton]\n{build_file_skeleton(p, c)}" for p, c in project_files.items()
+                     if p not in summaries and p.endswith(DETECTABLE_EXTENSIONS))
+        prompt = FLASH_PHOTO_QUERY_PROMPT.format(summaries='\n'.join(lines), bug=bug_report, max_items=max_items)
+    else:
+        prompt = None
+
     # 复用旧版 extract_relevant_content_with_ast 获取 files_dump
-    files_dump = extract_relevant_content_with_ast(bug_report, project_files)
+    files_dump = extract_relevant_content_with_ast(bug_report, project_files) if prompt is None else ''
 
-    DETECT_FILES_PROMPT = """你是一个 Python 全栈开发专家。请根据以下 bug 报告和项目文件内容，仅输出需要修改的文件路径（相对路径），每行一个，不要输出任何解释、代码或 markdown。
+    DETECT_FILES_PROMPT = """你是一个 Python 全栈开发专家。请根据以下 bug 报告和项目文件内容，找出需要修改或新建的文件（相对路径），最多 {max_items} 个。
+只输出一个 JSON 对象，格式如下，不要输出任何解释、代码或 markdown：
+{{"files": [{{"path": "templates/cart.html", "reason": "一句话说明原因"}}]}}
 
 Bug 报告：
 {bug}
 
 项目文件内容：
 {files_dump}
-
-需要修改的文件：
 """
-    prompt = DETECT_FILES_PROMPT.format(bug=bug_report, files_dump=files_dump)
+    if prompt is None:
+        prompt = DETECT_FILES_PROMPT.format(bug=bug_report, files_dump=files_dump, max_items=max_items)
 
     try:
-        response = call_deepseek(prompt)
-        # 提取每行非空、看起来像路径的字符串
-        lines = [line.strip() for line in response.split('\n') if line.strip()]
+        response = call_deepseek(prompt, step="detect_files")
+        detected = parse_detected_files(response)
         paths = []
-        for line in lines:
-            # 过滤明显不是路径的内容（如中文、句子）
-            if any(c in line for c in ['：', '。', '?', '!', '“', '”', '{', '}']):
-                continue
-            if '/' in line or '\\' in line or '.' in line:
-                # 尝试标准化路径
-                clean_path = line.split()[-1]  # 取最后一段（防编号）
-                if any(clean_path.endswith(ext) for ext in ['.py', '.html', '.js', '.css', '.json', '.md', '.txt']):
-                    paths.append(clean_path)
-        return list(dict.fromkeys(paths))  # 去重保序
+        for item in detected:
+            resolved = resolve_project_path(item['path'], project_files.keys())
+            if resolved is None:
+                # 索引中不存在：仅当是合法的新文件路径时才接受（用于新建文件）
+                try:
+                    resolved = sanitize_path(item['path'])
+                except ValueError:
+                    continue
+                if not resolved.endswith(DETECTABLE_EXTENSIONS):
+                    continue
+            print(f"   · {resolved}: {item['reason']}" if item['reason'] else f"   · {resolved}")
+            paths.append(resolved)
+        paths = list(dict.fromkeys(paths))[:max_items]  # 去重保序，限制条目数
+        return paths, find_related_files(bug_report, paths, project_files, max_items)
     except Exception as e:
         print(f"⚠️ 文件检测失败，回退到关键词扫描: {e}")
-        # 回退：关键词匹配
+        # 回退：关键词匹配，只取命中最多的少量文件，绝不回退为全量文件
         allow_ext = ('.py', '.html', '.js', '.css', '.json')
         phrases = re.findall(r'[\w\u4e00-\u9fa5]{2,}', bug_report)
-        candidates = []
+        scored = []
         for fp, content in project_files.items():
             if not any(fp.endswith(e) for e in allow_ext):
                 continue
-            if any(p in content for p in phrases):
-                candidates.append(fp)
-        return candidates if candidates else [k for k in project_files.keys() if any(k.endswith(e) for e in allow_ext)]
+            hits = sum(1 for p in phrases if p in content)
+            if hits:
+                scored.append((hits, fp))
+        scored.sort(key=lambda x: -x[0])
+        paths = [fp for _, fp in scored[:max_items]]
+        return paths, find_related_files(bug_report, paths, project_files, max_items)
 
 
 def remove_end_marker(code: str) -> str:
@@ -93,13 +154,18 @@ def get_relevant_file_paths(bug_report: str, project_files: Dict[str, str]) -> L
     """
     try:
         analyzer = CodeAnalyzer()
-        # 尝试对每个 Python 文件做 AST 解析
+        # 尝试对每个 Python 文件做 AST 解析，JS/CSS 文件做结构解析
         for file_path, content in project_files.items():
             if file_path.endswith('.py'):
                 try:
                     analyzer.parse_with_ast(content, file_path)
                 except Exception:
                     continue  # 单文件解析失败不中断
+            elif file_path.endswith(FRONTEND_EXTENSIONS):
+                try:
+                    analyzer.parse_frontend(content, file_path)
+                except Exception:
+                    continue
 
         # 使用 analyzer 查找与 bug_report 相关的元素
         try:
@@ -172,7 +238,7 @@ def call_llm_for_continuation_via_call_deepseek(context_code: str, truncation_hi
         try:
             print(f"[LLM请求] 调用 call_deepseek (尝试 {attempt + 1})...")
             # call_deepseek 接受一个 prompt，返回模型原始文本
-            raw = call_deepseek(full_prompt)
+            raw = call_deepseek(full_prompt, step="continuation")
             if not raw or not raw.strip():
                 raise AutomationError("LLM 返回为空内容。")
             return raw.strip()
@@ -310,8 +376,9 @@ def create_new_file_from_bug_report(file_path: str, bug_report: str, project_fil
     根据 bug 报告创建一个全新文件。
     适用于模型建议新增文件的场景（如新增工具类、新路由等）。
     """
-    # 构建上下文：提供现有项目结构供参考
-    existing_files_summary = "\n".join([f"- {fp}" for fp in project_files.keys()])
+    # 构建上下文：以骨架形式提供现有文件的接口（签名/路由/模板结构），而非仅文件名；
+    # 已包含全部文件，依赖图关联的参考文件无需另外提供
+    existing_files_summary = build_skeleton_dump(project_files)
 
     system_prompt = (
         "你是一个专业的全栈开发工程师。用户希望你根据需求创建一个全新的代码文件。\n"
@@ -319,19 +386,20 @@ def create_new_file_from_bug_report(file_path: str, bug_report: str, project_fil
     )
     user_prompt = (
         f"请根据以下需求创建一个新文件：{file_path}\n\n"
-        f"项目当前已有文件：\n{existing_files_summary}\n\n"
+        f"项目当前已有文件（骨架）：\n{existing_files_summary}\n\n"
         f"具体需求描述：{bug_report}\n\n"
         "请输出该文件的完整代码内容（纯代码，无任何额外文本）："
     )
 
-    raw_code = call_deepseek(system_prompt + "\n\n" + user_prompt).strip()
+    raw_code = call_deepseek(system_prompt + "\n\n" + user_prompt, step="create_file").strip()
     # 清理可能的 markdown 包裹
     return remove_triple_quotes(raw_code)
 
 
-def fix_single_file_like_chatpy(source_file: str, bug_report: str) -> str:
+def fix_single_file_like_chatpy(source_file: str, bug_report: str, reference: str = '') -> str:
     """
     完全模仿 聊天.py 的提示词和两阶段流程，修复单个文件。
+    reference 为相关文件的骨架，只作为只读上下文（见 build_reference_dump）。
     返回完整的新代码字符串。
     """
     # 读取源码
@@ -348,7 +416,9 @@ def fix_single_file_like_chatpy(source_file: str, bug_report: str) -> str:
         f"请根据以下要求修改代码并开始生成完整的新文件，如果生成完整就在文件最底下写上`<!-- 文件结束，勿再生成 -->`，修改需求：{bug_report}\n"
         f"完整源代码：\n```\n{source_code.strip()}\n```"
     )
-    part1 = call_deepseek(system1 + "\n\n" + user1).strip()
+    if reference:
+        user1 += f"\n\n以下相关文件仅供参考（只读，不要修改或输出它们）：\n{reference}"
+    part1 = call_deepseek(system1 + "\n\n" + user1, step="repair").strip()
 
     if "<!-- 文件结束，勿再生成 -->" in part1:
         cleaned = remove_triple_quotes(part1)
@@ -368,7 +438,7 @@ def fix_single_file_like_chatpy(source_file: str, bug_report: str) -> str:
         f"原始修改需求是：【{bug_report}】\n\n"
         f"请根据此需求和原始源代码，从上一次生成的代码结尾处开始，继续生成剩余的代码，直到文件结构完整。**绝对不要重复已有的代码或任何解释**。"
     )
-    part2 = call_deepseek(system2 + "\n\n" + user2).strip()
+    part2 = call_deepseek(system2 + "\n\n" + user2, step="continuation").strip()
 
     # 拼接
     p1_clean = remove_triple_quotes(part1)
@@ -392,7 +462,7 @@ def fix_single_file_like_chatpy(source_file: str, bug_report: str) -> str:
 def extract_relevant_content_with_ast(bug_report: str, project_files: Dict[str, str]) -> str:
     try:
         analyzer = CodeAnalyzer()
-        # 先尝试对每个 Python 文件做 AST 解析（解析失败不致命）
+        # 先尝试对每个 Python 文件做 AST 解析、JS/CSS 文件做结构解析（解析失败不致命）
         for file_path, content in project_files.items():
             if file_path.endswith('.py'):
                 try:
@@ -400,6 +470,11 @@ def extract_relevant_content_with_ast(bug_report: str, project_files: Dict[str,
                 except Exception:
                     # 单文件解析失败：记录但继续处理其他文件
                     continue
+            elif file_path.endswith(FRONTEND_EXTENSIONS):
+                try:
+                    analyzer.parse_frontend(content, file_path)
+                except Exception:
+                    continue
 
         # 使用 analyzer 查找与 bug_report 相关的元素（函数/类/route 等）
         try:
@@ -430,11 +505,18 @@ def extract_relevant_content_with_ast(bug_report: str, project_files: Dict[str,
                 else:
                     for el in els:
                         parts.append(f"---FILE: {el.get('file_path','unknown.py')}\n{el.get('content','')}\n---END_FILE---")
+            # 其余文件只提供骨架，保留跨文件接口感知
+            allow_ext = ('.py', '.md', '.txt', '.html', '.js', '.css', '.json')
+            others = {p: c for p, c in project_files.items() if any(p.endswith(e) for e in allow_ext)}
+            parts.append(build_skeleton_dump(others, exclude=grouped.keys()))
             return '\n'.join(parts)
 
-        # 回退到全量 dump（但过滤掉大型二进制或不常见扩展）
+        # 回退：报告中点名的文件给全文，其余文件给骨架（过滤掉大型二进制或不常见扩展）
         allow_ext = ('.py', '.md', '.txt', '.html', '.js', '.css', '.json')
-        all_parts = [f"---FILE: {p}\n{c}\n---END_FILE---" for p, c in project_files.items() if any(p.endswith(e) for e in allow_ext)]
+        candidates = {p: c for p, c in project_files.items() if any(p.endswith(e) for e in allow_ext)}
+        named = [p for p in candidates if p in bug_report or os.path.basename(p) in bug_report]
+        all_parts = [f"---FILE: {p}\n{candidates[p]}\n---END_FILE---" for p in named]
+        all_parts.append(build_skeleton_dump(candidates, exclude=named))
         return '\n'.join(all_parts)
     except Exception as e:
         try:
@@ -447,7 +529,7 @@ def extract_relevant_content_with_ast(bug_report: str, project_files: Dict[str,
 def generate_project_from_requirements(initial_requirements: str) -> None:
     prompt = PROJECT_PROMPT.format(requirements=initial_requirements)
     print("正在调用模型生成项目（首次）... 若模型未严格按格式输出，请根据提示重试。")
-    raw = call_deepseek(prompt)
+    raw = call_deepseek(prompt, step="generate")
     files = parse_files_from_model(raw)
     if not files:
         print('\n未能从模型输出解析到文件块。模型原始返回如下（前400000字符）：\n')
@@ -467,43 +549,110 @@ def detect_files_to_delete(bug_report: str, existing_files: List[str]) -> List[s
     根据 bug 报告检测需要删除的文件。
     返回应删除的文件路径列表（相对路径）。
     """
-    DELETE_PROMPT = """你是一个 Python 全栈开发专家。请根据以下 bug 报告，判断是否需要删除某些文件。
-如果需要删除，请仅输出要删除的文件路径（相对路径），每行一个。
-如果不需要删除任何文件，请输出“无”。
-不要输出任何解释、代码或 markdown。
+    max_items = get_model_route("detect_delete").get("max_items", 5)
+
+    DELETE_PROMPT = """你是一个 Python 全栈开发专家。请根据以下 bug 报告，判断是否需要删除某些文件（最多 {max_items} 个）。
+只输出一个 JSON 对象，格式如下，不要输出任何解释、代码或 markdown：
+{{"files": [{{"path": "static/js/old.js", "reason": "一句话说明原因"}}]}}
+如果不需要删除任何文件，输出 {{"files": []}}。
 
 Bug 报告：
 {bug}
 
 项目当前文件列表：
 {file_list}
-
-需要删除的文件："""
+"""
 
     file_list_str = "\n".join(f"- {fp}" for fp in existing_files)
-    prompt = DELETE_PROMPT.format(bug=bug_report, file_list=file_list_str)
+    prompt = DELETE_PROMPT.format(bug=bug_report, file_list=file_list_str, max_items=max_items)
 
     try:
-        response = call_deepseek(prompt)
-        if "无" in response or not response.strip():
-            return []
-
-        lines = [line.strip() for line in response.split('\n') if line.strip()]
+        response = call_deepseek(prompt, step="detect_delete")
         delete_paths = []
-        for line in lines:
-            # 过滤非路径内容
-            if any(c in line for c in ['：', '。', '?', '!', '“', '”', '{', '}']):
+        for item in parse_detected_files(response):
+            # 只能删除索引中实际存在的文件
+            resolved = resolve_project_path(item['path'], existing_files, strict=True)
+            if resolved is None:
+                print(f"⚠️ 忽略不存在的删除目标: {item['path']}")
                 continue
-            if '/' in line or '\\' in line or '.' in line:
-                clean_path = line.split()[-1]
-                if any(clean_path.endswith(ext) for ext in ['.py', '.html', '.js', '.css', '.json', '.md', '.txt']):
-                    delete_paths.append(clean_path)
-        return list(dict.fromkeys(delete_paths))  # 去重保序
+            delete_paths.append(resolved)
+        return list(dict.fromkeys(delete_paths))[:max_items]  # 去重保序，限制条目数
     except Exception as e:
         print(f"⚠️ 删除文件检测失败: {e}")
         return []
 
 
+def refresh_flashphoto(project_files: Dict[str, str]) -> int:
+    """检测之后、与修复并行地为变更文件重新摘要，供下次检测使用；失败不影响修复，返回可用摘要数"""
+    try:
+        return len(update_flashphoto(project_files))
+    except Exception as e:
+        print(f"⚠️ flashphoto 摘要更新失败: {e}")
+        return 0
+
+
+def delete_project_files(rel_paths: List[str], files: Dict[str, str]) -> List[str]:
+    """删除检测阶段给出的文件，返回实际删除成功的路径。"""
+    deleted = []
+    for rel_path in rel_paths:
+        abs_path = os.path.join(OUTPUT_DIR, rel_path)
+        if os.path.exists(abs_path):
+            try:
+                os.remove(abs_path)
+                print(f"🗑️ 成功删除文件: {rel_path}")
+                # 从内存中移除，避免后续误操作
+                files.pop(rel_path, None)
+                deleted.append(rel_path)
+            except Exception as e:
+                print(f"❌ 删除失败 {rel_path}: {e}")
+                traceback.print_exc()
+        else:
+            print(f"⚠️ 文件不存在，跳过删除: {rel_path}")
+    return deleted
+
+
+def apply_bug_fix_to_files(bug_report: str, target_file_paths: List[str], files: Dict[str, str],
+                           context_paths: List[str] = ()) -> None:
+    """逐个处理定位到的文件：已存在则修复，不存在则创建；context_paths 只作为只读参考，不会被改写。"""
+    if not target_file_paths:
+        print("❌ 未能定位到任何需修改或创建的文件。")
+        return
+
+    print(f"🔍 模型定位到 {len(target_file_paths)} 个需处理文件：")
+    for fp in target_file_paths:
+        print(f" - {fp}")
+    context_paths = [p for p in context_paths if p not in target_file_paths]
+    if context_paths:
+        print(f"📎 只读参考文件：{', '.join(context_paths)}")
+    reference = build_reference_dump(context_paths, files)
+
+    for rel_path in target_file_paths:
+        abs_path = os.path.join(OUTPUT_DIR, rel_path)
+        if os.path.exists(abs_path):
+            # 修复现有文件
+            print(f"\n🔧 正在修复: {rel_path}")
+            try:
+                fixed_content = fix_single_file_like_chatpy(abs_path, bug_report, reference)
+                with open(abs_path, 'w', encoding='utf-8') as f:
+                    f.write(fixed_content)
+                print(f"✅ 成功修复: {rel_path}")
+            except Exception as e:
+                print(f"❌ 修复失败 {rel_path}: {e}")
+                traceback.print_exc()
+        else:
+            # 创建新文件
+            print(f"\n🆕 正在创建: {rel_path}")
+            try:
+                new_content = create_new_file_from_bug_report(rel_path, bug_report, files)
+                os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+                with open(abs_path, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+                print(f"✅ 成功创建: {rel_path}")
+            except Exception as e:
+                print(f"❌ 创建失败 {rel_path}: {e}")
+                traceback.print_exc()
+
+
 # 若干交互输入工具
 def prompt_for_requirements() -> str:
     print('请输入需求（输入完毕后按 Enter，支持多行，单独一行输入 ".done" 结束输入）：')
@@ -566,7 +715,7 @@ def chat_with_model() -> None:
                     prompt += f"用户: {msg['content']}\n"
                 else:
                     prompt += f"助手: {msg['content']}\n"
-            response = call_deepseek(prompt)
+            response = call_deepseek(prompt, step="chat")
             conversation_history.append({"role": "assistant", "content": response})
             print(f"模型: {response}\n")
         except Exception as e:
@@ -647,60 +796,27 @@ def repair_project_loop(initial_requirements: str = None) -> None:
                 print('项目文件为空，请先运行 generate 命令生成项目。')
                 continue
 
-            # === 第一步：检测并删除文件（新增）===
-            existing_file_list = list(files.keys())
-            files_to_delete = detect_files_to_delete(bug_report, existing_file_list)
-            for rel_path in files_to_delete:
-                abs_path = os.path.join(OUTPUT_DIR, rel_path)
-                if os.path.exists(abs_path):
-                    try:
-                        os.remove(abs_path)
-                        print(f"🗑️ 成功删除文件: {rel_path}")
-                        # 可选：从内存中移除，避免后续误操作
-                        files.pop(rel_path, None)
-                    except Exception as e:
-                        print(f"❌ 删除失败 {rel_path}: {e}")
-                        traceback.print_exc()
-                else:
-                    print(f"⚠️ 文件不存在，跳过删除: {rel_path}")
-
-            # === 第二步：定位需修改/创建的文件（复用你原有的函数）===
-            target_file_paths = detect_relevant_files_with_model(bug_report, files)
-            if not target_file_paths:
-                print("❌ 未能定位到任何需修改或创建的文件。")
-                continue
-
-            print(f"🔍 模型定位到 {len(target_file_paths)} 个需处理文件：")
-            for fp in target_file_paths:
-                print(f" - {fp}")
-
-            # === 第三步：逐个处理（修复或创建）===
-            for rel_path in target_file_paths:
-                abs_path = os.path.join(OUTPUT_DIR, rel_path)
-                if os.path.exists(abs_path):
-                    # 修复现有文件
-                    print(f"\n🔧 正在修复: {rel_path}")
-                    try:
-                        fixed_content = fix_single_file_like_chatpy(abs_path, bug_report)
-                        with open(abs_path, 'w', encoding='utf-8') as f:
-                            f.write(fixed_content)
-                        print(f"✅ 成功修复: {rel_path}")
-                    except Exception as e:
-                        print(f"❌ 修复失败 {rel_path}: {e}")
-                        traceback.print_exc()
-                else:
-                    # 创建新文件
-                    print(f"\n🆕 正在创建: {rel_path}")
-                    try:
-                        new_content = create_new_file_from_bug_report(rel_path, bug_report, files)
-                        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-                        with open(abs_path, 'w', encoding='utf-8') as f:
-                            f.write(new_content)
-                        print(f"✅ 成功创建: {rel_path}")
-                    except Exception as e:
-                        print(f"❌ 创建失败 {rel_path}: {e}")
-                        traceback.print_exc()
-            continue
+            # === 检测阶段并发执行：删除检测只需文件列表，修改检测需要相关内容，两者互不依赖 ===
+            snapshot = dict(files)
+            stages = [
+                PipelineStage("detect_delete", lambda: detect_files_to_delete(bug_report, list(snapshot.keys()))),
+                PipelineStage("detect_files", lambda: detect_relevant_files_with_model(bug_report, snapshot)),
+                PipelineStage("apply_delete", lambda paths: delete_project_files(paths, files), deps=["detect_delete"]),
+                PipelineStage("mutate", lambda deleted, detected: apply_bug_fix_to_files(
+                                  bug_report, [t for t in detected[0] if t not in deleted], files,
+                                  [c for c in detected[1] if c not in deleted]),
+                              deps=["apply_delete", "detect_files"]),
+                # 检测用的是已有摘要，摘要刷新放在检测之后，与修复并行
+                PipelineStage("refresh_flashphoto", lambda deleted, detected: refresh_flashphoto(
+                                  {p: c for p, c in snapshot.items() if p not in deleted}),
+                              deps=["apply_delete", "detect_files"]),
+            ]
+            try:
+                result = run_pipeline(stages)
+                print(result.report())
+            except PipelineError as e:
+                print(f"❌ 修复流水线失败: {e}")
+                traceback.print_exc()
             continue
 
 
@@ -719,7 +835,7 @@ def repair_project_loop(initial_requirements: str = None) -> None:
             prompt = DEBUG_PROMPT.format(files_dump=files_dump, debug=debug_desc)
             print(f"正在调用模型进行只读诊断: {debug_desc[:50]}...")
             try:
-                raw = call_deepseek(prompt)
+                raw = call_deepseek(prompt, step="debug")
                 print('\n--- 诊断结果 ---\n')
                 print(raw)
                 print('\n--- 诊断结束 ---')
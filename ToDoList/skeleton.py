@@ -0,0 +1,168 @@
+# file: skeleton.py
+import ast
+import os
+from typing import Dict, Iterable, List
+
+from ToDoList.code_analyzer import CodeAnalyzer
+from ToDoList.APIexplorer.parser_registry import DEFAULT_REGISTRY
+
+
+# 非目标文件进入提示词时的形态：只保留签名/路由/类属性/文档首行（Python），
+# extends/block/include/表单/url_for 目标（模板），类/函数/事件/fetch（JS）或选择器（CSS），
+# 足以让模型感知跨文件接口。
+SKELETON_GENERIC_LINES = 15
+
+
+def python_skeleton(source: str, file_path: str = "") -> str:
+    """基于 CodeAnalyzer 的元素数据生成 Python 文件骨架。"""
+    result = CodeAnalyzer().parse_with_ast(source, file_path)
+    if 'error' in result:
+        return generic_skeleton(source)
+
+    # (起始行, 输出行) 按源码顺序合并模块级语句与定义
+    items: List[tuple] = []
+    try:
+        tree = ast.parse(source)
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                items.append((node.lineno, [ast.unparse(node)]))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                line = ast.unparse(node)
+                items.append((node.lineno, [line if len(line) <= 120 else line[:117] + '...']))
+    except SyntaxError:
+        pass
+
+    methods_by_class: Dict[str, List[dict]] = {}
+    for m in result['methods']:
+        methods_by_class.setdefault(m['class'], []).append(m)
+
+    # ast.walk 也会返回嵌套函数（如装饰器内部的 wrapper），骨架只保留最外层定义
+    defs = result['functions'] + result['classes']
+    top_level = [e for e in defs
+                 if not any(o is not e and o['start_line'] < e['start_line'] <= o['end_line'] for o in defs)]
+    for el in top_level:
+        if el['type'] == 'function':
+            items.append((el['start_line'], [''] + _function_lines(el, indent='')))
+            continue
+        lines = [''] + [f"@{d}" for d in el['decorators']]
+        bases = f"({', '.join(el['bases'])})" if el['bases'] else ''
+        lines.append(f"class {el['name']}{bases}:  # L{el['start_line']}-{el['end_line']}")
+        if el['docstring']:
+            lines.append(f'    """{el["docstring"]}"""')
+        lines.extend(f"    {a}" for a in el['attributes'])
+        for m in methods_by_class.get(el['name'], []):
+            lines.extend(_function_lines(m, indent='    '))
+        if not el['attributes'] and el['name'] not in methods_by_class:
+            lines.append('    ...')
+        items.append((el['start_line'], lines))
+
+    out: List[str] = []
+    for _, lines in sorted(items, key=lambda x: x[0]):
+        out.extend(lines)
+    return '\n'.join(out).strip()
+
+
+def _function_lines(el: dict, indent: str) -> List[str]:
+    lines = [f"{indent}@{d}" for d in el['decorators']]
+    lines.append(f"{indent}{el['signature']}: ...  # L{el['start_line']}-{el['end_line']}")
+    if el['docstring']:
+        lines.append(f'{indent}    """{el["docstring"]}"""')
+    return lines
+
+
+def template_skeleton(source: str, file_path: str = "") -> str:
+    """生成 HTML/Jinja 模板骨架：继承、块、包含、宏、表单（action/method/字段）与 url_for 目标。"""
+    elements = DEFAULT_REGISTRY.parse(source, file_path, language='html')['elements']
+
+    def names(*kinds: str) -> List[str]:
+        return list(dict.fromkeys(el.qualname for el in elements if el.kind in kinds))
+
+    out: List[str] = [f"extends: {name}" for name in names('extends')]
+    for label, kinds in (('includes', ('include', 'import')), ('blocks', ('block',)), ('macros', ('macro',))):
+        found = names(*kinds)
+        if found:
+            out.append(f"{label}: {', '.join(found)}")
+
+    forms = [el for el in elements if el.kind == 'form']
+    for el in sorted(forms, key=lambda f: int(f.qualname.rsplit('_', 1)[-1])):
+        out.append(f"{el.qualname.replace('form_', 'form[')}] <form {el['attrs']}> fields: {', '.join(el['fields']) or '-'}")
+
+    targets = names('url_for')
+    if targets:
+        out.append(f"url_for: {', '.join(targets)}")
+    return '\n'.join(out) or generic_skeleton(source)
+
+
+def js_skeleton(source: str, file_path: str = "") -> str:
+    """生成 JS 文件骨架：类与方法签名、函数签名，以及事件绑定和 fetch 请求（标注所在函数）。"""
+    elements = DEFAULT_REGISTRY.parse(source, file_path, language='javascript')['elements']
+    out: List[str] = []
+    for el in elements:
+        lines = f"  # L{el['start_line']}-{el['end_line']}"
+        if el.kind == 'class':
+            bases = f" extends {el['bases'][0]}" if el['bases'] else ''
+            out.append(f"class {el.qualname}{bases}{lines}")
+        elif el.kind == 'method':
+            prefix = 'async ' if el['async'] else ''
+            out.append(f"    {prefix}{el.qualname.split('.', 1)[1]}({el['params']}){lines}")
+        elif el.kind == 'function':
+            prefix = 'async ' if el['async'] else ''
+            out.append(f"{prefix}function {el.qualname}({el['params']}){lines}")
+        else:
+            where = f" in {el['container']}" if el.get('container') else ''
+            if el.kind == 'event':
+                out.append(f"on {el['event']}: {el['target']}{where}{lines}")
+            else:
+                out.append(f"fetch {el['method']} {el['url']}{where}{lines}")
+    return '\n'.join(out) or generic_skeleton(source)
+
+
+def css_skeleton(source: str, file_path: str = "") -> str:
+    """生成 CSS 文件骨架：@import、@media 等条件组及其中的选择器、@keyframes。"""
+    out: List[str] = []
+    for el in DEFAULT_REGISTRY.parse(source, file_path, language='css')['elements']:
+        media = el.get('media', '')
+        indent = '    ' * (media.count(' and @') + 1) if media else ''
+        if el.kind == 'css_rule':
+            out.append(f"{indent}{el['selector']}  # L{el['start_line']}")
+        elif el.kind == 'media':
+            out.append(f"{indent}{el.qualname}  # L{el['start_line']}-{el['end_line']}")
+        elif el.kind == 'import':
+            out.append(f"@import {el.qualname}")
+        else:
+            out.append(f"{indent}@{el.kind.replace('_', '-')} {el.qualname}  # L{el['start_line']}-{el['end_line']}")
+    return '\n'.join(out) or generic_skeleton(source)
+
+
+def generic_skeleton(source: str, max_lines: int = SKELETON_GENERIC_LINES) -> str:
+    """其他文件：只保留开头若干行并注明总行数。"""
+    lines = source.splitlines()
+    head = '\n'.join(lines[:max_lines])
+    if len(lines) > max_lines:
+        head += f"\n... (共 {len(lines)} 行，其余省略)"
+    return head
+
+
+def build_file_skeleton(file_path: str, content: str) -> str:
+    """按扩展名选择骨架生成方式。"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.py':
+        return python_skeleton(content, file_path)
+    if ext in ('.html', '.jinja', '.j2'):
+        return template_skeleton(content, file_path)
+    if ext == '.js':
+        return js_skeleton(content, file_path)
+    if ext == '.css':
+        return css_skeleton(content, file_path)
+    return generic_skeleton(content)
+
+
+def build_skeleton_dump(project_files: Dict[str, str], exclude: Iterable[str] = ()) -> str:
+    """把非目标文件以骨架形式拼接为文件块，exclude 中的文件（目标文件）不输出。"""
+    excluded = set(exclude)
+    parts = []
+    for fp, content in project_files.items():
+        if fp in excluded:
+            continue
+        parts.append(f"---FILE (skeleton): {fp}\n{build_file_skeleton(fp, content)}\n---END_FILE---")
+    return '\n'.join(parts)
@@ -2,10 +2,9 @@
 # file: interactive_usage.py
 
 import os
-import ast
 import hashlib
-import json
-import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any
 # 原来的代码（第10行）
 # from .api_exposer import MultiLanguageParser, AdvancedAPIExposer
@@ -15,335 +14,159 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from api_exposer import MultiLanguageParser, AdvancedAPIExposer
+from element_record import ElementRecord, SourceFile, StaleSourceError
+from symbol_index import SymbolIndex
+from parser_registry import DEFAULT_REGISTRY, enable_disk_cache
+
+try:
+    import readline
+except ImportError:
+    # Windows 等环境没有 readline，交互输入时不提供 Tab 补全
+    readline = None
+
+# 项目解析支持的文件类型
+PROJECT_FILE_EXTENSIONS = ['.py', '.html', '.jinja', '.j2', '.json', '.js', '.css', '.md', '.txt']
+
+
+def _element_content(element_data) -> str:
+    """
+    元素源码；文件在解析后被修改时返回提示，需重新解析项目
+    - symbolName: _element_content
+    """
+    try:
+        return element_data['content']
+    except StaleSourceError as e:
+        return f"（{e}）"
+
+
+def _read_source(file_path: str) -> str:
+    """
+    读取源文件：先尝试UTF-8，失败后尝试GBK；均失败时抛出 UnicodeDecodeError
+    - symbolName: _read_source
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='gbk') as f:
+            return f.read()
+
+
+_worker_exposer = None
+
+
+def _init_worker(disk_cache):
+    """
+    进程池初始化：父进程开启了磁盘缓存时，工作进程使用同一缓存（spawn 方式启动的进程不继承注册表设置）
+    - symbolName: _init_worker
+    """
+    if disk_cache is not None:
+        DEFAULT_REGISTRY.disk_cache = disk_cache
+
+
+def _parse_file_worker(task):
+    """
+    进程池工作函数：读取并解析单个文件，返回可 pickle 的 (相对路径, 解析结果, 错误信息)
+    - symbolName: _parse_file_worker
+    """
+    global _worker_exposer
+    project_root = task[2]
+    if _worker_exposer is None or _worker_exposer.project_root != project_root:
+        _worker_exposer = ProjectAPIExposer(project_root)
+    return _worker_exposer._parse_task(task)
+
 
 class ProjectAPIExposer:
     """项目级API暴露器，用于解析整个项目目录"""
 
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, jobs: int = 1):
         self.project_root = project_root
+        self.jobs = jobs
         self.index_table = {}
+        self.symbols = SymbolIndex()
+        self.registry = DEFAULT_REGISTRY
 
-    def parse_project(self) -> Dict[str, Any]:
+    def _collect_files(self) -> List[tuple]:
         """
-        解析整个项目目录
-        - symbolName: parse_project
+        收集待解析文件，按相对路径排序以保证合并顺序确定
+        - symbolName: _collect_files
         """
-        project_structure = {}
-
-        # 遍历项目目录
+        tasks = []
         for root, _, files in os.walk(self.project_root):
             for file in files:
                 # 支持多种文件类型
-                if any(file.endswith(ext) for ext in ['.py', '.html', '.jinja', '.j2', '.json', '.css', '.md', '.txt']):
+                if any(file.endswith(ext) for ext in PROJECT_FILE_EXTENSIONS):
                     file_path = os.path.join(root, file)
                     relative_path = os.path.relpath(file_path, self.project_root)
+                    tasks.append((file_path, relative_path, self.project_root))
+        tasks.sort(key=lambda t: t[1])
+        return tasks
 
-                    try:
-                        # 尝试以UTF-8编码读取文件
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                    except UnicodeDecodeError:
-                        # 如果UTF-8解码失败，尝试其他编码或跳过二进制文件
-                        try:
-                            with open(file_path, 'r', encoding='gbk') as f:
-                                content = f.read()
-                        except:
-                            print(f"无法解码文件 {relative_path}，跳过该文件")
-                            continue
-                    except Exception as e:
-                        print(f"解析文件 {relative_path} 时出错: {e}")
-                        continue
-
-                    try:
-                        # 根据文件类型解析单个文件
-                        file_elements = self._parse_file_by_type(content, relative_path)
-                        project_structure[relative_path] = file_elements
-
-                        # 建立索引
-                        self._build_index(file_elements, relative_path)
-                    except Exception as e:
-                        print(f"解析文件 {relative_path} 时出错: {e}")
-
-        return {
-            'project_root': self.project_root,
-            'files': project_structure,
-            'total_elements': len(self.index_table)
-        }
-
-    def _parse_file_by_type(self, content: str, file_path: str) -> Dict[str, Any]:
+    def parse_project(self, jobs: int = None) -> Dict[str, Any]:
         """
-        根据文件类型选择合适的解析器
-        - symbolName: _parse_file_by_type
+        解析整个项目目录
+        jobs > 1 时把文件分片到进程池并行解析，结果按相对路径顺序合并到 index_table
+        - symbolName: parse_project
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
-
-        if file_extension == '.py':
-            return self._parse_python_file(content, file_path)
-        elif file_extension in ['.html', '.jinja', '.j2']:
-            return self._parse_html_template(content, file_path)
-        elif file_extension == '.json':
-            return self._parse_json_file(content, file_path)
-        elif file_extension in ['.md', '.txt']:
-            return self._parse_text_file(content, file_path)
-        elif file_extension == '.css':
-            return self._parse_css_file(content, file_path)
-        else:
-            # 默认处理为文本文件
-            return self._parse_generic_file(content, file_path)
+        jobs = jobs or self.jobs
+        tasks = self._collect_files()
+        project_structure = {}
+        # 重新解析时以当前文件为准重建索引
+        self.index_table = {}
+        self.symbols.clear()
 
-    def _parse_python_file(self, content: str, file_path: str) -> Dict[str, Any]:
-        """
-        解析Python文件
-        - symbolName: _parse_python_file
-        """
-        try:
-            tree = ast.parse(content)
-            functions = self._extract_functions(tree, content)
-            classes = self._extract_classes(tree, content)
-            methods = self._extract_methods(tree, content)
-
-            return {
-                'functions': functions,
-                'classes': classes,
-                'methods': methods,
-                'elements': functions + classes + methods,
-                'type': 'python'
-            }
-        except SyntaxError as e:
-            return {'error': f'语法错误: {str(e)}', 'type': 'python'}
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(self.registry.disk_cache,)) as executor:
+                chunksize = max(1, len(tasks) // (jobs * 4))
+                results = list(executor.map(_parse_file_worker, tasks, chunksize=chunksize))
+        else:
+            results = [self._parse_task(task) for task in tasks]
 
-    def _parse_html_template(self, content: str, file_path: str) -> Dict[str, Any]:
-        """
-        解析HTML模板文件
-        - symbolName: _parse_html_template
-        """
-        elements = []
-
-        # 提取模板中的表单
-        form_matches = re.finditer(r'<form[^>]*>.*?</form>', content, re.DOTALL)
-        for i, match in enumerate(form_matches, 1):
-            elements.append({
-                'name': f'form_{i}',
-                'content': match.group(),
-                'start_line': content[:match.start()].count('\n') + 1,
-                'end_line': content[:match.end()].count('\n') + 1,
-                'type': 'form'
-            })
-
-        # 提取模板中的url_for调用
-        url_for_matches = re.finditer(r'url_for\([\'"]([^\'"]+)[\'"]', content)
-        for match in url_for_matches:
-            elements.append({
-                'name': match.group(1),
-                'content': match.group(),
-                'start_line': content[:match.start()].count('\n') + 1,
-                'end_line': content[:match.end()].count('\n') + 1,
-                'type': 'url_for'
-            })
+        for relative_path, file_elements, error in results:
+            if error:
+                print(error)
+                continue
+            project_structure[relative_path] = file_elements
+            # 建立索引
+            self._build_index(file_elements, relative_path)
+            # 索引建立后释放源码，元素访问 content 时再从磁盘按需读取
+            for element in file_elements.get('elements', [])[:1]:
+                if isinstance(element, ElementRecord):
+                    element.source.release()
 
         return {
-            'elements': elements,
-            'type': 'html'
+            'project_root': self.project_root,
+            'files': project_structure,
+            'total_elements': len(self.index_table)
         }
 
-    def _parse_json_file(self, content: str, file_path: str) -> Dict[str, Any]:
+    def _parse_task(self, task) -> tuple:
         """
-        解析JSON文件
-        - symbolName: _parse_json_file
+        读取并解析单个文件，返回 (相对路径, 解析结果, 错误信息)
+        - symbolName: _parse_task
         """
+        file_path, relative_path, _ = task
         try:
-            data = json.loads(content)
-            elements = []
-
-            # 如果是对象数组，为每个对象创建元素
-            if isinstance(data, list):
-                for i, item in enumerate(data):
-                    elements.append({
-                        'name': f'item_{i}',
-                        'content': json.dumps(item, indent=2),
-                        'start_line': 0,  # JSON文件难以确定具体行号
-                        'end_line': 0,
-                        'type': 'json_item'
-                    })
-            # 如果是对象，提取关键字段
-            elif isinstance(data, dict):
-                for key in data.keys():
-                    elements.append({
-                        'name': key,
-                        'content': json.dumps(data[key], indent=2),
-                        'start_line': 0,
-                        'end_line': 0,
-                        'type': 'json_field'
-                    })
-
-            return {
-                'elements': elements,
-                'type': 'json'
-            }
-        except json.JSONDecodeError as e:
-            return {'error': f'JSON解析错误: {str(e)}', 'type': 'json'}
-
-    def _parse_text_file(self, content: str, file_path: str) -> Dict[str, Any]:
-        """
-        解析文本文件（如README.md）
-        - symbolName: _parse_text_file
-        """
-        lines = content.split('\n')
-        elements = []
-
-        # 提取标题
-        for i, line in enumerate(lines):
-            if line.startswith('#'):
-                elements.append({
-                    'name': line.strip('# ').replace(' ', '_'),
-                    'content': line,
-                    'start_line': i + 1,
-                    'end_line': i + 1,
-                    'type': 'header'
-                })
-
-        return {
-            'elements': elements,
-            'type': 'text'
-        }
-
-    def _parse_css_file(self, content: str, file_path: str) -> Dict[str, Any]:
-        """
-        解析CSS文件
-        - symbolName: _parse_css_file
-        """
-        # 提取CSS选择器
-        selector_matches = re.finditer(r'([^{]+)\s*{([^}]*)}', content)
-        elements = []
-
-        for i, match in enumerate(selector_matches, 1):
-            selector = match.group(1).strip()
-            rules = match.group(2).strip()
-
-            elements.append({
-                'name': selector.replace('.', '').replace('#', '').replace(' ', '_').replace(':', '_'),
-                'content': match.group(),
-                'start_line': content[:match.start()].count('\n') + 1,
-                'end_line': content[:match.end()].count('\n') + 1,
-                'type': 'css_rule'
-            })
-
-        return {
-            'elements': elements,
-            'type': 'css'
-        }
-
-    def _parse_generic_file(self, content: str, file_path: str) -> Dict[str, Any]:
-        """
-        解析通用文件
-        - symbolName: _parse_generic_file
-        """
-        # 对于不支持的文件类型，简单地将其作为一个整体元素处理
-        return {
-            'elements': [{
-                'name': os.path.basename(file_path),
-                'content': content,
-                'start_line': 1,
-                'end_line': len(content.split('\n')),
-                'type': 'file'
-            }],
-            'type': 'generic'
-        }
+            content = _read_source(file_path)
+        except UnicodeDecodeError:
+            return relative_path, None, f"无法解码文件 {relative_path}，跳过该文件"
+        except Exception as e:
+            return relative_path, None, f"解析文件 {relative_path} 时出错: {e}"
+        # 元素记录跨进程传回时只携带磁盘路径，主进程访问 content 时再按需读取
+        source = SourceFile(relative_path, content, disk_path=file_path)
+        try:
+            return relative_path, self._parse_file_by_type(content, relative_path, source), None
+        except Exception as e:
+            return relative_path, None, f"解析文件 {relative_path} 时出错: {e}"
 
-    def _extract_functions(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        提取函数定义
-        - symbolName: _extract_functions
-        """
-        functions = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                in_class = False
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            in_class = True
-                            break
-
-                # 如果在类内部，则跳过（由_extract_methods处理）
-                if in_class:
-                    continue
-
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
-                function_source = '\n'.join(lines[start_line:end_line])
-
-                functions.append({
-                    'name': node.name,
-                    'content': function_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'function',
-                    'args': [arg.arg for arg in node.args.args]
-                })
-
-        return functions
-
-    def _extract_classes(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        提取类定义
-        - symbolName: _extract_classes
+    def _parse_file_by_type(self, content: str, file_path: str, source: SourceFile = None) -> Dict[str, Any]:
         """
-        classes = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
-                class_source = '\n'.join(lines[start_line:end_line])
-
-                classes.append({
-                    'name': node.name,
-                    'content': class_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'class'
-                })
-
-        return classes
-
-    def _extract_methods(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        提取方法定义
-        - symbolName: _extract_methods
+        根据文件类型选择合适的解析器（见 parser_registry），内容未变化的文件直接复用缓存的解析结果
+        source 为该文件的共享源码句柄，未提供时按 content 新建
+        - symbolName: _parse_file_by_type
         """
-        methods = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                parent_class = None
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            parent_class = parent.name
-                            break
-
-                if parent_class:
-                    start_line = node.lineno - 1
-                    end_line = getattr(node, 'end_lineno', start_line + 1)
-                    method_source = '\n'.join(lines[start_line:end_line])
-
-                    methods.append({
-                        'name': f"{parent_class}.{node.name}",
-                        'content': method_source,
-                        'start_line': start_line + 1,
-                        'end_line': end_line,
-                        'type': 'method',
-                        'class': parent_class
-                    })
-
-        return methods
+        return self.registry.parse(content, file_path, source)
 
     def _build_index(self, file_elements: Dict[str, Any], file_path: str):
         """
@@ -356,11 +179,18 @@ class ProjectAPIExposer:
             identifier = f"{file_path}:{element['name']}"
             hash_key = self._generate_hash(identifier)
 
-            self.index_table[hash_key] = {
+            info = {
                 'element': element,
                 'file_path': file_path,
                 'full_identifier': identifier
             }
+            existing = self.index_table.get(hash_key)
+            if existing is not None:
+                # 同一文件中的同名元素以最后一个为准，原地更新使符号表保持一致
+                existing.update(info)
+            else:
+                self.index_table[hash_key] = info
+                self.symbols.add(element['name'], info, file_path)
 
     def _generate_hash(self, identifier: str) -> str:
         """
@@ -383,13 +213,25 @@ class ProjectAPIExposer:
             if hash_key in self.index_table:
                 results.append(self.index_table[hash_key])
         else:
-            # 模糊查询所有匹配的元素
-            for hash_key, info in self.index_table.items():
-                if info['element']['name'] == element_name:
-                    results.append(info)
+            # 按限定名/短名称在符号表中查找所有文件中的同名元素
+            results = self.symbols.lookup(element_name)
 
         return results
 
+    def search_elements(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        搜索元素：精确匹配、前缀匹配、模糊（容错）匹配依次补充
+        - symbolName: search_elements
+        """
+        return self.symbols.search(query, limit)
+
+    def complete_names(self, prefix: str, limit: int = 20) -> List[str]:
+        """
+        元素名称前缀补全
+        - symbolName: complete_names
+        """
+        return self.symbols.complete(prefix, limit)
+
     def get_project_structure(self) -> Dict[str, List[str]]:
         """
         获取项目结构信息
@@ -407,9 +249,28 @@ class ProjectAPIExposer:
         return structure
 
 
-def interactive_demo():
+def _install_completer(project_exposer: ProjectAPIExposer):
+    """
+    有 readline 时为交互输入安装 Tab 补全，候选来自项目符号表
+    - symbolName: _install_completer
+    """
+    if readline is None:
+        return
+
+    def completer(text, state):
+        matches = project_exposer.complete_names(text, limit=50)
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(completer)
+    # 元素名可能包含 '.'（类名.方法名），只按空白分词
+    readline.set_completer_delims(' \t\n')
+    readline.parse_and_bind('tab: complete')
+
+
+def interactive_demo(jobs: int = 1):
     """
     API暴露器交互式演示程序
+    jobs: 解析项目目录时使用的进程数
     - symbolName: interactive_demo
     """
 
@@ -427,9 +288,10 @@ def interactive_demo():
         print("4. 解析项目目录")
         print("5. 查询项目元素")
         print("6. 查看项目结构")
-        print("7. 退出")
+        print("7. 搜索/补全项目元素")
+        print("8. 退出")
 
-        choice = input("请输入选项 (1-7): ").strip()
+        choice = input("请输入选项 (1-8): ").strip()
 
         if choice == "1":
             # 2. 解析Python代码
@@ -471,7 +333,7 @@ def interactive_demo():
                         print(f"  参数: {element_data['args']}")
                     if 'class' in element_data:
                         print(f"  所属类: {element_data['class']}")
-                    print(f"  内容:\n{element_data['content']}")
+                    print(f"  内容:\n{_element_content(element_data)}")
                 else:
                     print(f"未找到元素 '{element_name}'")
             else:
@@ -495,12 +357,13 @@ def interactive_demo():
                 project_path = "."
 
             if os.path.exists(project_path):
-                project_exposer = ProjectAPIExposer(project_path)
-                print("正在解析项目...")
+                project_exposer = ProjectAPIExposer(project_path, jobs=jobs)
+                print(f"正在解析项目...（进程数: {jobs}）")
                 result = project_exposer.parse_project()
                 print(f"解析完成! 发现 {result['total_elements']} 个代码元素")
                 # 保存项目解析器实例供后续使用
                 globals()['project_exposer'] = project_exposer
+                _install_completer(project_exposer)
             else:
                 print(f"项目路径 {project_path} 不存在")
 
@@ -526,7 +389,7 @@ def interactive_demo():
                         if 'class' in element_data:
                             print(f"     所属类: {element_data['class']}")
                         print(f"     内容:")
-                        print(element_data['content'])
+                        print(_element_content(element_data))
                         print()
                 else:
                     print(f"未找到元素 '{element_name}'")
@@ -547,6 +410,31 @@ def interactive_demo():
                     print(f"    - {element}")
 
         elif choice == "7":
+            # 搜索项目元素：精确 -> 前缀 -> 模糊（容错）
+            if 'project_exposer' not in globals():
+                print("请先解析项目目录")
+                continue
+
+            query = input("请输入名称或前缀 (支持Tab补全): ").strip()
+            if not query:
+                print("请输入有效的查询内容")
+                continue
+
+            project_exposer = globals()['project_exposer']
+            completions = project_exposer.complete_names(query, limit=10)
+            if completions:
+                print(f"\n名称补全: {', '.join(completions)}")
+            results = project_exposer.search_elements(query)
+            if results:
+                print(f"\n找到 {len(results)} 个相关元素:")
+                for i, result in enumerate(results, 1):
+                    element_data = result['element']
+                    print(f"  {i}. {element_data['name']} ({element_data['type']}) "
+                          f"{result['file_path']}:{element_data['start_line']}-{element_data['end_line']}")
+            else:
+                print(f"未找到与 '{query}' 相关的元素")
+
+        elif choice == "8":
             print("退出程序")
             break
 
@@ -556,4 +444,20 @@ def interactive_demo():
 
 if __name__ == "__main__":
     # symbolName: __main__
-    interactive_demo()
+    arg_parser = argparse.ArgumentParser(description='API暴露器交互式演示')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=1,
+                            help='解析项目目录时使用的进程数（默认1，即串行）')
+    arg_parser.add_argument('--project', help='直接解析指定项目目录并输出统计，不进入交互模式')
+    arg_parser.add_argument('--disk-cache', action='store_true',
+                            help='开启用户级磁盘解析缓存，跨进程、跨工作区复用解析结果')
+    arg_parser.add_argument('--cache-dir', help='磁盘缓存目录（默认 XDG 缓存目录下的 apiexplorer）')
+    cli_args = arg_parser.parse_args()
+
+    if cli_args.disk_cache:
+        enable_disk_cache(cli_args.cache_dir)
+
+    if cli_args.project:
+        result = ProjectAPIExposer(cli_args.project, jobs=cli_args.jobs).parse_project()
+        print(f"解析完成! {len(result['files'])} 个文件，发现 {result['total_elements']} 个代码元素")
+    else:
+        interactive_demo(jobs=cli_args.jobs)
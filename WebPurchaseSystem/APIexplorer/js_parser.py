@@ -0,0 +1,462 @@
+# project_generator/APIexplorer/js_parser.py
+# file: js_parser.py
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .element_record import ElementRecord, SourceFile
+except ImportError:
+    from element_record import ElementRecord, SourceFile
+
+# 词法单元类型
+NAME = 'name'
+PUNCT = 'punct'
+STRING = 'string'
+TEMPLATE = 'template'
+NUMBER = 'number'
+REGEX = 'regex'
+
+# 多字符运算符，按长度优先匹配
+_PUNCTUATORS = sorted([
+    '>>>=', '...', '===', '!==', '**=', '<<=', '>>=', '>>>', '&&=', '||=', '??=',
+    '=>', '==', '!=', '<=', '>=', '&&', '||', '??', '?.', '++', '--', '+=', '-=', '*=', '/=',
+    '%=', '&=', '|=', '^=', '<<', '>>', '**',
+], key=len, reverse=True)
+# 这些关键字之后的 '/' 是正则字面量而不是除号
+# 空白/注释、标识符、数字与运算符一次匹配；字符串、模板字符串与正则字面量由专门的函数跳过
+_TOKEN_RE = re.compile(
+    r'(\s+|//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))'
+    r'|((?:[^\W\d]|\$)(?:\w|\$)*)'
+    r'|(\.?\d[\w.]*)'
+    r'|(' + '|'.join(re.escape(p) for p in _PUNCTUATORS) + r'|[^\s\w"\'`])'
+)
+_REGEX_AFTER_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                         'delete', 'void', 'throw', 'instanceof', 'yield', 'await'}
+_NOT_METHOD_NAMES = {'if', 'for', 'while', 'switch', 'catch', 'function', 'return', 'with'}
+_METHOD_MODIFIERS = {'static', 'async', 'get', 'set'}
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+_HTTP_VERBS = {'get', 'post', 'put', 'patch', 'delete'}
+
+Token = Tuple[str, str, int, int]
+
+
+def tokenize_js(text: str) -> Iterator[Token]:
+    """
+    轻量 JS 词法分析：产出 (类型, 文本, 起始偏移, 结束偏移)，跳过空白与注释。
+    正确处理字符串、模板字符串（含嵌套 ${...}）与正则字面量，保证括号配对不被其中的符号干扰。
+    - symbolName: tokenize_js
+    """
+    pos = 0
+    length = len(text)
+    prev: Optional[Token] = None
+    match_token = _TOKEN_RE.match
+    while pos < length:
+        ch = text[pos]
+        start = pos
+        if ch in '"\'':
+            pos = _skip_string(text, pos, ch)
+            token = (STRING, text[start:pos], start, pos)
+        elif ch == '`':
+            pos = _skip_template(text, pos)
+            token = (TEMPLATE, text[start:pos], start, pos)
+        else:
+            match = match_token(text, pos)
+            pos = match.end()
+            group = match.lastindex
+            if group == 1:
+                continue
+            value = match.group(group)
+            if group == 2:
+                token = (NAME, value, start, pos)
+            elif group == 3:
+                token = (NUMBER, value, start, pos)
+            elif ch == '/' and _regex_allowed(prev):
+                pos = _skip_regex(text, start)
+                token = (REGEX, text[start:pos], start, pos)
+            else:
+                token = (PUNCT, value, start, pos)
+        prev = token
+        yield token
+
+
+def _regex_allowed(prev: Optional[Token]) -> bool:
+    if prev is None:
+        return True
+    kind, value = prev[0], prev[1]
+    if kind == PUNCT:
+        return value not in (')', ']', '}', '++', '--')
+    if kind == NAME:
+        return value in _REGEX_AFTER_KEYWORDS
+    return False
+
+
+def _skip_string(text: str, pos: int, quote: str) -> int:
+    pos += 1
+    length = len(text)
+    while pos < length:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == quote or ch == '\n':
+            return pos + 1
+        pos += 1
+    return length
+
+
+def _skip_template(text: str, pos: int) -> int:
+    """
+    跳过模板字符串，${...} 内部按代码处理（可包含字符串与嵌套模板）
+    - symbolName: _skip_template
+    """
+    pos += 1
+    length = len(text)
+    while pos < length:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+        elif ch == '`':
+            return pos + 1
+        elif ch == '$' and text.startswith('${', pos):
+            pos += 2
+            depth = 1
+            while pos < length and depth:
+                c = text[pos]
+                if c in '"\'':
+                    pos = _skip_string(text, pos, c)
+                    continue
+                if c == '`':
+                    pos = _skip_template(text, pos)
+                    continue
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                pos += 1
+        else:
+            pos += 1
+    return length
+
+
+def _skip_regex(text: str, pos: int) -> int:
+    pos += 1
+    length = len(text)
+    in_class = False
+    while pos < length:
+        ch = text[pos]
+        if ch == '\\':
+            pos += 2
+            continue
+        if ch == '\n':
+            return pos
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            pos += 1
+            while pos < length and text[pos].isalpha():
+                pos += 1
+            return pos
+        pos += 1
+    return length
+
+
+def _literal_value(token: Token) -> Optional[str]:
+    """
+    字符串/模板字符串字面量的内容（去掉引号），其他单元返回 None
+    - symbolName: _literal_value
+    """
+    if token[0] in (STRING, TEMPLATE) and len(token[1]) >= 2:
+        return token[1][1:-1]
+    return None
+
+
+class _JSIndexer:
+    """
+    基于词法单元与括号配对表的结构索引：类、方法、函数、事件绑定与 fetch 调用
+    - symbolName: _JSIndexer
+    """
+
+    def __init__(self, text: str, source: SourceFile):
+        self.text = text
+        self.source = source
+        self.tokens: List[Token] = list(tokenize_js(text))
+        self.pair: Dict[int, int] = {}
+        stack: List[int] = []
+        for i, token in enumerate(self.tokens):
+            if token[0] != PUNCT:
+                continue
+            if token[1] in _OPENERS:
+                stack.append(i)
+            elif token[1] in (')', ']', '}'):
+                # 不配对的右括号直接忽略，尽量容忍残缺代码
+                while stack and _OPENERS[self.tokens[stack[-1]][1]] != token[1]:
+                    stack.pop()
+                if stack:
+                    opener = stack.pop()
+                    self.pair[opener] = i
+                    self.pair[i] = opener
+        self.definitions: List[list] = []   # [起始偏移, 结束偏移, 类型, 名称, 附加字段]
+        self.references: List[list] = []
+
+    # ---- 工具 ----
+    def _is(self, i: int, kind: str, value: Optional[str] = None) -> bool:
+        if i < 0 or i >= len(self.tokens):
+            return False
+        token = self.tokens[i]
+        return token[0] == kind and (value is None or token[1] == value)
+
+    def _end_of(self, i: int) -> int:
+        """
+        第 i 个单元若为左括号，返回配对右括号的结束偏移；未配对时到文件末尾
+        - symbolName: _end_of
+        """
+        j = self.pair.get(i)
+        return self.tokens[j][3] if j is not None else len(self.text)
+
+    def _statement_start(self, i: int) -> int:
+        """
+        向前吸收 export/default/const/let/var/async/static 等修饰，返回定义的起始偏移
+        - symbolName: _statement_start
+        """
+        while i > 0 and self.tokens[i - 1][0] == NAME and self.tokens[i - 1][1] in (
+                'export', 'default', 'const', 'let', 'var', 'async', 'static', 'get', 'set'):
+            i -= 1
+        return self.tokens[i][2]
+
+    # ---- 索引 ----
+    def run(self):
+        tokens = self.tokens
+        for i, (kind, value, start, end) in enumerate(tokens):
+            if kind == NAME:
+                if value == 'class' and not self._is(i - 1, PUNCT, '.'):
+                    self._class_at(i)
+                elif value == 'function' and not self._is(i - 1, PUNCT, '.'):
+                    self._function_at(i)
+                elif value == 'addEventListener' and self._is(i - 1, PUNCT, '.') and self._is(i + 1, PUNCT, '('):
+                    self._event_listener_at(i)
+                elif (value.startswith('on') and len(value) > 2 and self._is(i - 1, PUNCT, '.')
+                      and self._is(i + 1, PUNCT, '=')):
+                    self._event_property_at(i)
+                elif value == 'fetch' and self._is(i + 1, PUNCT, '(') and (
+                        not self._is(i - 1, PUNCT, '.') or self._is(i - 2, NAME, 'window')):
+                    self._request_at(i, i + 1, None)
+                elif (value in _HTTP_VERBS and self._is(i - 1, PUNCT, '.') and self._is(i - 2, NAME, 'axios')
+                      and self._is(i + 1, PUNCT, '(')):
+                    self._request_at(i - 2, i + 1, value.upper())
+            elif kind == PUNCT and value == '=>':
+                self._arrow_at(i)
+        return self
+
+    def _class_at(self, i: int):
+        name = self.tokens[i + 1][1] if self._is(i + 1, NAME) and self.tokens[i + 1][1] != 'extends' else ''
+        j = i + 1
+        while j < len(self.tokens) and not self._is(j, PUNCT, '{'):
+            j += 1
+        if j >= len(self.tokens) or not name:
+            return
+        base = ''
+        for k in range(i + 1, j):
+            if self._is(k, NAME, 'extends'):
+                base = self.text[self.tokens[k + 1][2]:self.tokens[j - 1][3]] if k + 1 < j else ''
+        body_end = self.pair.get(j, len(self.tokens))
+        self.definitions.append([self._statement_start(i), self._end_of(j), 'class', name, {'bases': [base] if base else []}])
+        # 类体顶层的 name(...) { ... } 为方法
+        k = j + 1
+        while k < body_end:
+            token = self.tokens[k]
+            if (token[0] == NAME and token[1] not in _NOT_METHOD_NAMES and self._is(k + 1, PUNCT, '(')
+                    and (k + 1) in self.pair and self._is(self.pair[k + 1] + 1, PUNCT, '{')):
+                body = self.pair[k + 1] + 1
+                params = self.text[self.tokens[k + 1][3]:self.tokens[self.pair[k + 1]][2]]
+                start = k
+                while start > j + 1 and self.tokens[start - 1][0] == NAME and self.tokens[start - 1][1] in _METHOD_MODIFIERS:
+                    start -= 1
+                self.definitions.append([self.tokens[start][2], self._end_of(body), 'method', f"{name}.{token[1]}",
+                                         {'class': name, 'params': ' '.join(params.split()),
+                                          'async': self._has_modifier(start, k, 'async')}])
+                k = self.pair.get(body, body) + 1
+                continue
+            if token[0] == PUNCT and token[1] in _OPENERS and k in self.pair:
+                k = self.pair[k] + 1
+                continue
+            k += 1
+
+    def _has_modifier(self, start: int, end: int, modifier: str) -> bool:
+        return any(self._is(m, NAME, modifier) for m in range(start, end))
+
+    def _function_at(self, i: int):
+        j = i + 1
+        if self._is(j, PUNCT, '*'):
+            j += 1
+        name = ''
+        if self._is(j, NAME) and self._is(j + 1, PUNCT, '('):
+            name = self.tokens[j][1]
+            j += 1
+        if not self._is(j, PUNCT, '(') or j not in self.pair or not self._is(self.pair[j] + 1, PUNCT, '{'):
+            return
+        start_index = i - 1 if self._is(i - 1, NAME, 'async') else i
+        if not name:
+            # 匿名函数表达式：取赋值/属性名 `x = function` / `x: function`
+            before = start_index - 1
+            if self._named_assignment(before):
+                name = self.tokens[before - 1][1]
+                start_index = before - 1
+        if not name:
+            return
+        params = self.text[self.tokens[j][3]:self.tokens[self.pair[j]][2]]
+        self.definitions.append([self._statement_start(start_index), self._end_of(self.pair[j] + 1), 'function', name,
+                                 {'params': ' '.join(params.split()), 'async': self._is(i - 1, NAME, 'async')}])
+
+    def _arrow_at(self, i: int):
+        # 参数：(a, b) 或单个标识符
+        if self._is(i - 1, PUNCT, ')') and (i - 1) in self.pair:
+            params_open = self.pair[i - 1]
+            params = self.text[self.tokens[params_open][3]:self.tokens[i - 1][2]]
+        elif self._is(i - 1, NAME):
+            params_open = i - 1
+            params = self.tokens[i - 1][1]
+        else:
+            return
+        start_index = params_open - 1 if self._is(params_open - 1, NAME, 'async') else params_open
+        before = start_index - 1
+        if not self._named_assignment(before):
+            return  # 只索引具名（赋值/属性）的箭头函数，回调参数由事件绑定记录
+        name = self.tokens[before - 1][1]
+        if self._is(i + 1, PUNCT, '{'):
+            end = self._end_of(i + 1)
+        else:
+            end = self._expression_end(i + 1)
+        self.definitions.append([self._statement_start(before - 1), end, 'function', name,
+                                 {'params': ' '.join(params.split()), 'async': start_index != params_open}])
+
+    def _named_assignment(self, i: int) -> bool:
+        """
+        第 i 个单元是否为 `name =` / `name:` 中的 = 或 :（obj.name = ... 这类成员赋值除外）
+        - symbolName: _named_assignment
+        """
+        return ((self._is(i, PUNCT, '=') or self._is(i, PUNCT, ':')) and self._is(i - 1, NAME)
+                and not self._is(i - 2, PUNCT, '.'))
+
+    def _expression_end(self, i: int) -> int:
+        """
+        表达式体箭头函数的结束位置：同层遇到 ; , 或右括号为止
+        - symbolName: _expression_end
+        """
+        end = self.tokens[i - 1][3]
+        while i < len(self.tokens):
+            kind, value = self.tokens[i][0], self.tokens[i][1]
+            if kind == PUNCT and value in (';', ',', ')', ']', '}'):
+                break
+            if kind == PUNCT and value in _OPENERS and i in self.pair:
+                i = self.pair[i]
+            end = self.tokens[i][3]
+            i += 1
+        return end
+
+    def _member_chain_start(self, dot: int) -> int:
+        """
+        从 '.' 向前找到成员访问链（如 this.taskList / document.getElementById('x')）的起始单元
+        - symbolName: _member_chain_start
+        """
+        k = dot - 1
+        while k >= 0:
+            token = self.tokens[k]
+            if token[0] == PUNCT and token[1] in (')', ']') and k in self.pair:
+                k = self.pair[k] - 1
+                continue
+            if token[0] == NAME:
+                if self._is(k - 1, PUNCT, '.') or self._is(k - 1, PUNCT, '?.'):
+                    k -= 2
+                    continue
+                return k
+            return k + 1
+        return 0
+
+    def _event_listener_at(self, i: int):
+        open_paren = i + 1
+        event = _literal_value(self.tokens[open_paren + 1]) if open_paren + 1 < len(self.tokens) else None
+        if event is None:
+            return
+        target_start = self._member_chain_start(i - 1)
+        target = self.text[self.tokens[target_start][2]:self.tokens[i - 1][2]]
+        close = self.pair.get(open_paren)
+        handler = ''
+        if close is not None and self._is(open_paren + 2, PUNCT, ','):
+            handler = ' '.join(self.text[self.tokens[open_paren + 3][2]:self.tokens[close][2]].split())
+        self.references.append([self.tokens[target_start][2], self._end_of(open_paren), 'event', f"{target}:{event}",
+                                {'target': target, 'event': event, 'handler': _short(handler)}])
+
+    def _event_property_at(self, i: int):
+        target_start = self._member_chain_start(i - 1)
+        target = self.text[self.tokens[target_start][2]:self.tokens[i - 1][2]]
+        event = self.tokens[i][1][2:]
+        end = self._expression_end(i + 2) if i + 2 < len(self.tokens) else self.tokens[i][3]
+        if self._is(i + 2, PUNCT, '{'):
+            end = self._end_of(i + 2)
+        handler = ' '.join(self.text[self.tokens[i + 2][2]:end].split()) if i + 2 < len(self.tokens) else ''
+        self.references.append([self.tokens[target_start][2], end, 'event', f"{target}:{event}",
+                                {'target': target, 'event': event, 'handler': _short(handler)}])
+
+    def _request_at(self, start_index: int, open_paren: int, method: Optional[str]):
+        if open_paren + 1 >= len(self.tokens):
+            return
+        url = _literal_value(self.tokens[open_paren + 1])
+        if url is None:
+            return
+        close = self.pair.get(open_paren, len(self.tokens) - 1)
+        if method is None:
+            method = 'GET'
+            # fetch(url, { method: 'POST', ... })
+            for k in range(open_paren + 2, close):
+                if self._is(k, NAME, 'method') and self._is(k + 1, PUNCT, ':'):
+                    value = _literal_value(self.tokens[k + 2]) if k + 2 < close else None
+                    if value:
+                        method = value.upper()
+                    break
+        self.references.append([self.tokens[start_index][2], self._end_of(open_paren), 'fetch', url,
+                                {'url': url, 'method': method}])
+
+
+def _short(text: str, limit: int = 80) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def parse_js(text: str, file_path: str = '', source: Optional[SourceFile] = None) -> List[ElementRecord]:
+    """
+    解析 JavaScript，返回按起始位置排序的元素记录：
+    class、method（类名.方法名）、function（函数声明及具名函数表达式/箭头函数）、
+    event（addEventListener 与 onxxx 赋值，名称为 目标:事件）、fetch（请求 URL 与方法）。
+    事件与 fetch 带 container 字段，指向所在的最内层函数、方法或事件回调。
+    - symbolName: parse_js
+    """
+    source = source or SourceFile(file_path, text)
+    indexer = _JSIndexer(text, source).run()
+
+    # 按 (起始, -结束) 排序后一次扫描，用栈维护当前所在的定义与事件回调：
+    # 类体中以箭头函数/函数表达式定义的字段视为方法；
+    # 事件回调本身也是容器，回调中的 fetch 归属到对应的事件绑定
+    items = sorted(indexer.definitions + indexer.references, key=lambda d: (d[0], -d[1]))
+    stack: List[list] = []
+    for item in items:
+        start, end, kind, name, extra = item
+        while stack and not (stack[-1][0] <= start and end <= stack[-1][1]):
+            stack.pop()
+        if kind == 'function':
+            owner = next((d for d in reversed(stack) if d[2] != 'event'), None)
+            if owner is not None and owner[2] == 'class':
+                item[2] = 'method'
+                item[3] = f"{owner[3]}.{name}"
+                extra['class'] = owner[3]
+        elif kind in ('event', 'fetch'):
+            owner = next((d for d in reversed(stack) if d[2] in ('function', 'method', 'event')), None)
+            if owner is not None:
+                extra['container'] = owner[3]
+        if kind != 'fetch':
+            stack.append(item)
+
+    return [ElementRecord.from_span(source, start, end, kind, name, **extra)
+            for start, end, kind, name, extra in items]
+
@@ -0,0 +1,225 @@
+# project_generator/APIexplorer/parse_cache.py
+# file: parse_cache.py
+
+import argparse
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+try:
+    from .element_record import ElementRecord, SourceFile
+except ImportError:
+    from element_record import ElementRecord, SourceFile
+
+# 解析器输出格式变化时递增，旧版本的缓存条目自然失效
+CACHE_VERSION = 2
+# 缓存目录的默认容量上限（字节），超出后按最近使用时间淘汰
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 淘汰时清理到上限的该比例以下，避免每次写入都触发淘汰
+_EVICT_TO = 0.8
+# 设置为 0/false/no 时禁用磁盘缓存
+CACHE_ENV = 'APIEXPLORER_CACHE'
+CACHE_DIR_ENV = 'APIEXPLORER_CACHE_DIR'
+
+
+def default_cache_dir() -> str:
+    """
+    用户级缓存目录：$APIEXPLORER_CACHE_DIR，否则 $XDG_CACHE_HOME/apiexplorer（默认 ~/.cache/apiexplorer）
+    - symbolName: default_cache_dir
+    """
+    explicit = os.environ.get(CACHE_DIR_ENV)
+    if explicit:
+        return explicit
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'apiexplorer')
+
+
+def cache_enabled() -> bool:
+    return os.environ.get(CACHE_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def dump_result(result: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+    """
+    把解析结果转换为与文件路径无关的可 JSON 序列化数据：元素记录只保存偏移、行号、类型、名称与附加字段，
+    多个列表共享的元素只保存一次；以文件名命名的元素（如整体文件元素）记为 null，加载时换成新的文件名
+    - symbolName: dump_result
+    """
+    basename = os.path.basename(file_path)
+    records: List[list] = []
+    positions: Dict[int, int] = {}
+    payload: Dict[str, Any] = {}
+    for key, value in result.items():
+        if isinstance(value, list) and value and isinstance(value[0], ElementRecord):
+            indices = []
+            for element in value:
+                position = positions.get(id(element))
+                if position is None:
+                    position = positions[id(element)] = len(records)
+                    records.append([element.start, element.end, element.start_line, element.end_line, element.kind,
+                                    None if element.qualname == basename else element.qualname, element.extra])
+                indices.append(position)
+            payload[key] = {'records': indices}
+        else:
+            payload[key] = value
+    return {'records': records, 'result': payload}
+
+
+def load_result(data: Dict[str, Any], source: SourceFile) -> Dict[str, Any]:
+    """
+    由 dump_result 的数据重建解析结果，元素绑定到调用方的源码句柄
+    - symbolName: load_result
+    """
+    basename = os.path.basename(source.path)
+    records = [ElementRecord(source, start, end, start_line, end_line, kind,
+                             basename if qualname is None else qualname, extra)
+               for start, end, start_line, end_line, kind, qualname, extra in data['records']]
+    result = {}
+    for key, value in data['result'].items():
+        if isinstance(value, dict) and set(value) == {'records'}:
+            result[key] = [records[i] for i in value['records']]
+        else:
+            result[key] = value
+    return result
+
+
+class DiskParseCache:
+    """
+    按内容 sha256 存放解析结果的用户级磁盘缓存，多个工作区（四份生成器副本、不同项目）共用。
+    条目写入临时文件后原子替换，多进程并发读写安全；读取时更新修改时间，
+    总大小超过 max_bytes 时按修改时间从旧到新淘汰。所有 I/O 错误都只导致缓存未命中，不影响解析。
+    - symbolName: DiskParseCache
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = os.path.join(directory or default_cache_dir(), f'v{CACHE_VERSION}')
+        self.max_bytes = max_bytes
+        # 目录当前总大小的估计值，首次写入时统计
+        self._size: Optional[int] = None
+
+    def _path(self, parser: str, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f'{parser}-{digest}.json')
+
+    def get(self, parser: str, digest: str, source: SourceFile) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的解析结果并绑定到 source；未命中或条目损坏时返回 None
+        - symbolName: get
+        """
+        path = self._path(parser, digest)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+            return load_result(data, source)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, parser: str, digest: str, result: Dict[str, Any], file_path: str):
+        """
+        写入解析结果（临时文件 + os.replace），必要时淘汰旧条目
+        - symbolName: put
+        """
+        path = self._path(parser, digest)
+        try:
+            payload = json.dumps(dump_result(result, file_path), ensure_ascii=False, separators=(',', ':'))
+            data = payload.encode('utf-8')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                _remove(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError):
+            return
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[tuple]:
+        """
+        所有缓存条目：[(路径, 大小, 修改时间)]
+        - symbolName: _entries
+        """
+        entries = []
+        try:
+            buckets = list(os.scandir(self.directory))
+        except OSError:
+            return entries
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            try:
+                for entry in os.scandir(bucket.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self):
+        """
+        按修改时间从旧到新删除条目，直到总大小降到上限的 80% 以下
+        - symbolName: evict
+        """
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * _EVICT_TO
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            if _remove(path):
+                total -= size
+        self._size = total
+
+    def clear(self):
+        """
+        删除全部缓存条目
+        - symbolName: clear
+        """
+        for path, _, _ in self._entries():
+            _remove(path)
+        self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes
+        }
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='APIexplorer 解析结果磁盘缓存')
+    parser.add_argument('--clear', action='store_true', help='清空缓存')
+    parser.add_argument('--dir', help='缓存目录（默认 XDG 缓存目录下的 apiexplorer）')
+    args = parser.parse_args()
+
+    cache = DiskParseCache(args.dir)
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"缓存目录: {stats['directory']}")
+    print(f"条目数: {stats['entries']}, 大小: {stats['bytes'] / 1024 / 1024:.1f} MB / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,139 +1,55 @@
 # file: code_analyzer.py
-import ast
 import hashlib
+import os
 from typing import Dict, List, Any
 from pathlib import Path
 
+from WebPurchaseSystem.APIexplorer.parser_registry import DEFAULT_REGISTRY, ParserRegistry
+
+# 前端文件：由解析器注册表中的 JS/CSS 结构解析器处理
+FRONTEND_EXTENSIONS = ('.js', '.css')
+
 
 class CodeAnalyzer:
-    """专业的代码解析器，使用AST进行精确分割"""
+    """专业的代码解析器，使用AST进行精确分割；解析与结果缓存由共享的解析器注册表完成"""
 
-    def __init__(self):
+    def __init__(self, registry: ParserRegistry = None):
         self.function_index = {}
+        self.registry = registry or DEFAULT_REGISTRY
 
     def parse_with_ast(self, source_code: str, file_path: str = "") -> Dict[str, Any]:
         """
         使用AST精确解析Python代码
         """
-        try:
-            tree = ast.parse(source_code)
-            functions = self._extract_functions_from_ast(tree, source_code)
-            classes = self._extract_classes_from_ast(tree, source_code)
-            methods = self._extract_methods_from_ast(tree, source_code)
-
-            # 建立精确索引
-            all_elements = functions + classes + methods
-            for element in all_elements:
-                func_hash = self._generate_hash(element['name'])
-                self.function_index[func_hash] = element
-
-            return {
-                'functions': functions,
-                'classes': classes,
-                'methods': methods,
-                'elements': all_elements,
-                'file_path': file_path
-            }
-        except SyntaxError as e:
-            return {'error': f'语法错误: {str(e)}'}
-
-    def _extract_functions_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        从AST中提取函数定义
-        """
-        functions = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                in_class = False
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            in_class = True
-                            break
-
-                # 如果在类内部，则跳过（由_extract_methods_from_ast处理）
-                if in_class:
-                    continue
+        result = self.registry.parse(source_code, file_path, language='python')
+        if 'error' in result:
+            return {'error': result['error']}
 
-                # 获取函数源码
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
+        # 建立精确索引
+        for element in result['elements']:
+            func_hash = self._generate_hash(element['name'])
+            self.function_index[func_hash] = element
 
-                function_source = '\n'.join(lines[start_line:end_line])
+        # 注册表中的结果为共享对象，返回副本
+        return dict(result, file_path=file_path)
 
-                functions.append({
-                    'name': node.name,
-                    'content': function_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'function',
-                    'file_path': ''
-                })
-
-        return functions
-
-    def _extract_classes_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
+    def parse_frontend(self, source_code: str, file_path: str) -> Dict[str, Any]:
         """
-        从AST中提取类定义
+        解析 JS/CSS 文件：JS 提取类、方法、函数、事件绑定与 fetch 请求，CSS 提取规则与 @media 等条件组，
+        元素与 Python 元素一起进入索引，供 find_relevant_elements 按元素粒度检索
         """
-        classes = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                start_line = node.lineno - 1
-                end_line = getattr(node, 'end_lineno', start_line + 1)
-
-                class_source = '\n'.join(lines[start_line:end_line])
-
-                classes.append({
-                    'name': node.name,
-                    'content': class_source,
-                    'start_line': start_line + 1,
-                    'end_line': end_line,
-                    'type': 'class',
-                    'file_path': ''
-                })
-
-        return classes
-
-    def _extract_methods_from_ast(self, tree: ast.AST, source: str) -> List[Dict]:
-        """
-        从AST中提取类方法
-        """
-        methods = []
-        lines = source.split('\n')
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # 检查是否在类内部
-                parent_class = None
-                for parent in ast.walk(tree):
-                    if isinstance(parent, ast.ClassDef):
-                        if parent.lineno <= node.lineno <= getattr(parent, 'end_lineno', float('inf')):
-                            parent_class = parent.name
-                            break
-
-                if parent_class:
-                    start_line = node.lineno - 1
-                    end_line = getattr(node, 'end_lineno', start_line + 1)
-
-                    method_source = '\n'.join(lines[start_line:end_line])
-
-                    methods.append({
-                        'name': f"{parent_class}.{node.name}",
-                        'content': method_source,
-                        'start_line': start_line + 1,
-                        'end_line': end_line,
-                        'type': 'method',
-                        'class': parent_class,
-                        'file_path': ''
-                    })
-
-        return methods
+        if os.path.splitext(file_path)[1].lower() not in FRONTEND_EXTENSIONS:
+            return {'error': f'不支持的文件类型: {file_path}'}
+        elements = self.registry.parse(source_code, file_path)['elements']
+        for element in elements:
+            # 同一样式表中同名规则常见（如 @media 中的覆盖），索引键带上文件与行号
+            func_hash = self._generate_hash(f"{file_path}:{element['name']}:{element['start_line']}")
+            self.function_index[func_hash] = element
+
+        return {
+            'elements': elements,
+            'file_path': file_path
+        }
 
     def _generate_hash(self, name: str) -> str:
         """
@@ -9,6 +9,35 @@ DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
 
 OUTPUT_DIR = "generated_project"
 
+# =============== 模型路由 ===============
+# 每个流水线步骤 -> 模型与调用参数。分类类步骤（定位/删除检测）与文件摘要只需要短输出，
+# 使用低 max_tokens、temperature 0 和短超时；整文件生成类步骤保留长输出与长超时。
+# max_items：该步骤最多接受的输出条目数（例如检测步骤最多返回几个路径）。
+DEEPSEEK_MODEL = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat")
+# 短输出步骤所用的模型。DeepSeek 目前只有 deepseek-chat 一个非推理模型，默认与 DEEPSEEK_MODEL 相同，
+# 这些步骤的节省来自上述 max_tokens/超时限制；有更便宜的模型或自建端点时用环境变量 DEEPSEEK_FAST_MODEL 指定
+DEEPSEEK_FAST_MODEL = os.environ.get("DEEPSEEK_FAST_MODEL", DEEPSEEK_MODEL)
+
+MODEL_ROUTES = {
+    "default":       {"model": DEEPSEEK_MODEL, "max_tokens": None, "temperature": 0.2, "timeout": 180},
+    # 代码生成 / 修复 / 续写：整文件输出
+    "generate":      {"model": DEEPSEEK_MODEL, "max_tokens": 8192, "temperature": 0.2, "timeout": 600},
+    "repair":        {"model": DEEPSEEK_MODEL, "max_tokens": 8192, "temperature": 0.2, "timeout": 600},
+    "continuation":  {"model": DEEPSEEK_MODEL, "max_tokens": 8192, "temperature": 0.2, "timeout": 600},
+    "create_file":   {"model": DEEPSEEK_MODEL, "max_tokens": 8192, "temperature": 0.2, "timeout": 600},
+    # 文本类：诊断与对话
+    "debug":         {"model": DEEPSEEK_MODEL, "max_tokens": 4096, "temperature": 0.2, "timeout": 300},
+    "chat":          {"model": DEEPSEEK_MODEL, "max_tokens": 2048, "temperature": 0.7, "timeout": 120},
+    # 分类类：只输出少量路径或一个结论
+    # 检测步骤使用 JSON 输出模式（response_format），按 {"files": [{"path", "reason"}]} 解析
+    "detect_files":  {"model": DEEPSEEK_FAST_MODEL, "max_tokens": 512, "temperature": 0.0, "timeout": 20, "max_items": 8,
+                      "response_format": {"type": "json_object"}},
+    "detect_delete": {"model": DEEPSEEK_FAST_MODEL, "max_tokens": 256, "temperature": 0.0, "timeout": 20, "max_items": 5,
+                      "response_format": {"type": "json_object"}},
+    # 文件摘要（flashphoto）：短输出，按文件并发调用
+    "summarize":     {"model": DEEPSEEK_FAST_MODEL, "max_tokens": 400, "temperature": 0.0, "timeout": 60},
+}
+
 # 接口文档目录与文件
 IFACE_DIR = os.path.join(OUTPUT_DIR, "interface_doc")
 IFACE_MD = os.path.join(IFACE_DIR, "INTERFACE_DOC.md")
@@ -19,6 +48,7 @@ RAG_INDEX = os.path.join(IFACE_DIR, "rag_index.json")
 FLASH_PHOTO_DIR = os.path.join(OUTPUT_DIR, "flashphoto")
 FLASH_PHOTO_FILE = os.path.join(FLASH_PHOTO_DIR, "flashphoto_snapshot.md")
 FLASH_PHOTO_META = os.path.join(FLASH_PHOTO_DIR, "flashphoto_meta.json")
+FLASH_PHOTO_WORKERS = 4  # 并发摘要的线程数
 
 # 分块备用参数（未使用向量检索，仅作工具参数）
 CHUNK_SIZE = 800
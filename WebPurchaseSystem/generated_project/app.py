@@ -4,14 +4,46 @@ import json
 from datetime import datetime
 import hashlib
 from security import hash_password, verify_password, require_login, require_admin, require_user, generate_csrf_token
-from database import DatabaseManager
+from database import PAGE_SIZE, DatabaseManager
+from storage import SORT_FIELDS, ConflictError, create_storage
+import config
 from forms import BuyProductForm, RechargeForm, AddressForm, LoginForm, RegisterForm, ProductForm
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
-# 初始化数据库管理器
-db = DatabaseManager()
+# 初始化数据库管理器（存储后端见 config.py）
+db = DatabaseManager(config.DATA_DIR, create_storage(config.STORAGE_BACKEND, config.DATA_DIR,
+                                                     config.SQLALCHEMY_DATABASE_URI))
+
+# 列表页每页条数的上限
+MAX_PER_PAGE = 100
+
+# JSON 接口按字段白名单输出记录，版本号 _version 等内部字段与今后新增的敏感字段不会随记录外泄
+API_FIELDS = {
+    'products': ('id', 'name', 'price', 'stock', 'category', 'description', 'created_at'),
+    'orders': ('id', 'user_id', 'product_id', 'product_name', 'quantity', 'total_price', 'status',
+               'payment_method', 'created_at', 'updated_at', 'paid_at'),
+}
+
+def api_items(collection, records):
+    """只保留 API_FIELDS 中列出的字段（记录中没有的字段不输出）"""
+    fields = API_FIELDS[collection]
+    return [{field: record[field] for field in fields if field in record} for record in records]
+
+def listing_args(collection):
+    """
+    从查询参数读取分页参数：page、per_page、sort（须为 SORT_FIELDS 中的字段，否则按ID）、
+    order=desc 倒序、cursor（按ID键集分页）
+    """
+    sort = request.args.get('sort')
+    return {
+        'page': request.args.get('page', 1, type=int),
+        'per_page': min(max(request.args.get('per_page', PAGE_SIZE, type=int), 1), MAX_PER_PAGE),
+        'sort': sort if sort in SORT_FIELDS[collection] else None,
+        'descending': request.args.get('order') == 'desc',
+        'cursor': request.args.get('cursor', type=int)
+    }
 
 @app.route('/favicon.ico')
 def favicon():
@@ -188,27 +220,37 @@ def edit_profile():
 @app.route('/products')
 @require_login
 def products():
-    """商品列表"""
-    products_list = db.get_products()
-    return render_template('products.html', products=products_list)
+    """商品列表（分页）"""
+    pagination = db.get_products_page(**listing_args('products'))
+    return render_template('products.html', products=pagination['items'], pagination=pagination)
 
 @app.route('/search')
 @require_login
 def search_products():
     """商品搜索"""
     query = request.args.get('q', '').strip()
-    if query:
-        products = db.search_products(query)
-    else:
-        products = db.get_products()
-    return render_template('products.html', products=products, search_query=query)
+    if not query:
+        return redirect(url_for('products'))
+    page = request.args.get('page', 1, type=int)
+    pagination = db.search_products(query, page)
+    return render_template('products.html', products=pagination['items'], pagination=pagination,
+                           search_query=query)
+
+@app.route('/api/products')
+@require_login
+def api_products():
+    """商品列表 JSON：按 cursor（上一页返回的 next_cursor）键集分页，参数见 listing_args"""
+    pagination = db.get_products_page(**listing_args('products'), category=request.args.get('category'))
+    return jsonify({'success': True, 'items': api_items('products', pagination['items']),
+                    'total': pagination['total'], 'next_cursor': pagination['next_cursor']})
 
 @app.route('/products/category/<category_name>')
 @require_login
 def products_by_category(category_name):
-    """按分类浏览商品"""
-    products = db.get_products_by_category(category_name)
-    return render_template('products.html', products=products, current_category=category_name)
+    """按分类浏览商品（分页）"""
+    pagination = db.get_products_page(**listing_args('products'), category=category_name)
+    return render_template('products.html', products=pagination['items'], pagination=pagination,
+                           current_category=category_name)
 
 @app.route('/products/add', methods=['GET', 'POST'])
 @require_admin
@@ -284,26 +326,35 @@ def buy_product(product_id):
             flash('购买数量必须大于0！', 'error')
             return render_template('buy_product.html', product=product, form=form)
 
-        if product['stock'] < quantity:
-            flash('商品库存不足！', 'error')
-            return render_template('buy_product.html', product=product, form=form)
+        # 库存与余额的检查和扣减、订单创建在同一事务内完成，任一步失败全部回滚
+        with db.transaction():
+            # 事务内重新读取，检查与扣减之间不会插入其他写入
+            product = db.get_product_by_id(product_id)
+            user = db.get_user_by_id(session['user_id'])
+            if not product:
+                flash('商品不存在！', 'error')
+                return redirect(url_for('products'))
 
-        total_price = product['price'] * quantity
+            if product['stock'] < quantity:
+                flash('商品库存不足！', 'error')
+                return render_template('buy_product.html', product=product, form=form)
 
-        if user['balance'] < total_price:
-            flash('余额不足！', 'error')
-            return render_template('buy_product.html', product=product, form=form)
+            total_price = product['price'] * quantity
 
-        # 更新商品库存
-        product['stock'] -= quantity
-        db.save_product(product)
+            if user['balance'] < total_price:
+                flash('余额不足！', 'error')
+                return render_template('buy_product.html', product=product, form=form)
 
-        # 更新用户余额
-        user['balance'] -= total_price
-        db.save_user(user)
+            # 更新商品库存
+            product['stock'] -= quantity
+            db.save_product(product)
+
+            # 更新用户余额
+            user['balance'] -= total_price
+            db.save_user(user)
 
-        # 创建订单 - 初始状态为"未发货"
-        order = db.create_order(user['id'], product_id, quantity, total_price)
+            # 创建订单 - 初始状态为"未发货"
+            order = db.create_order(user['id'], product_id, quantity, total_price)
 
         flash(f'购买成功！已扣除 {total_price} 元', 'success')
         return redirect(url_for('products'))
@@ -339,9 +390,9 @@ def recharge():
 @app.route('/admin/users')
 @require_admin
 def user_management():
-    """用户管理"""
-    users = db.get_users()
-    return render_template('user_management.html', users=users)
+    """用户管理（分页）"""
+    pagination = db.get_users_page(**listing_args('users'))
+    return render_template('user_management.html', users=pagination['items'], pagination=pagination)
 
 @app.route('/admin/users/<int:user_id>/update-role', methods=['POST'])
 @require_admin
@@ -380,22 +431,24 @@ def orders():
         return redirect(url_for('admin_orders'))
     else:
         # 普通用户只查看自己的订单
-        user_orders = db.get_orders_by_user(session['user_id'])
-    return render_template('orders.html', orders=user_orders)
+        pagination = db.get_orders_page(**listing_args('orders'), user_id=session['user_id'])
+    return render_template('orders.html', orders=pagination['items'], pagination=pagination)
+
+@app.route('/api/orders')
+@require_login
+def api_orders():
+    """订单列表 JSON：管理员为全部订单，普通用户为自己的订单；按 cursor 键集分页，参数见 listing_args"""
+    user_id = None if session.get('role') == 'admin' else session['user_id']
+    pagination = db.get_orders_page(**listing_args('orders'), user_id=user_id)
+    return jsonify({'success': True, 'items': api_items('orders', pagination['items']),
+                    'total': pagination['total'], 'next_cursor': pagination['next_cursor']})
 
 @app.route('/order/<int:order_id>')
 @require_login
 def order_detail(order_id):
     """订单详情页面"""
-    # 获取所有订单
-    all_orders = db.get_orders()
-
-    # 查找指定ID的订单
-    order = None
-    for o in all_orders:
-        if o['id'] == order_id:
-            order = o
-            break
+    # 按主键索引查找指定ID的订单
+    order = db.get_order_by_id(order_id)
 
     # 检查订单是否存在
     if not order:
@@ -431,8 +484,9 @@ def add_review(order_id):
 @require_admin
 def admin_orders():
     """管理员订单管理 - 查看所有用户订单"""
-    all_orders = db.get_orders()
-    return render_template('admin_orders.html', orders=all_orders)
+    pagination = db.get_orders_page(**listing_args('orders'))
+    users = db.get_users_by_ids([order['user_id'] for order in pagination['items']])
+    return render_template('admin_orders.html', orders=pagination['items'], users=users, pagination=pagination)
 
 @app.route('/admin/orders/<int:order_id>/ship', methods=['POST'])
 @require_admin
@@ -456,46 +510,45 @@ def ship_order(order_id):
 @require_login
 def confirm_order(order_id):
     """确认收货"""
-    order = db.get_order_by_id(order_id)
-    if not order:
-        flash('订单不存在！', 'error')
-        return redirect(url_for('orders'))
-
-    # 检查订单是否属于当前用户
-    if order['user_id'] != session['user_id']:
-        flash('您无权操作此订单！', 'error')
-        return redirect(url_for('orders'))
-
-    if order['status'] != '已发货':
-        flash('只能对已发货的订单进行确认收货操作！', 'error')
-        return redirect(url_for('orders'))
-
+    # 状态检查、状态更新与店铺余额增加在同一事务内完成：同一订单被并发确认时只入账一次，任一步失败全部回滚
     try:
-        # 更新订单状态为"已收货"
-        if not db.update_order_status(order_id, '已收货'):
-            flash('订单状态更新失败！', 'error')
-            return redirect(url_for('orders'))
-
-        # 将款项增加到店铺余额
-        new_balance = db.update_shop_balance(order['total_price'])
-        if new_balance is None:
-            flash('店铺余额更新失败！', 'error')
-            # 回滚订单状态 - 添加错误处理
-            try:
-                db.update_order_status(order_id, '已发货')
-                flash('已回滚订单状态', 'warning')
-            except Exception as rollback_error:
-                app.logger.error(f"回滚订单状态失败: {str(rollback_error)}")
-                flash('系统错误：订单状态回滚失败，请联系管理员', 'error')
-            return redirect(url_for('orders'))
-
-        flash(f'订单确认收货成功！款项 {order["total_price"]} 元已转入店铺余额。当前店铺余额：{new_balance} 元', 'success')
-
+        with db.transaction():
+            # 事务内读取，检查与更新之间不会插入其他写入
+            order = db.get_order_by_id(order_id)
+            if not order:
+                flash('订单不存在！', 'error')
+                return redirect(url_for('orders'))
+
+            # 检查订单是否属于当前用户
+            if order['user_id'] != session['user_id']:
+                flash('您无权操作此订单！', 'error')
+                return redirect(url_for('orders'))
+
+            if order['status'] != '已发货':
+                flash('只能对已发货的订单进行确认收货操作！', 'error')
+                return redirect(url_for('orders'))
+
+            # 更新订单状态为"已收货"；失败时抛出异常，事务回滚，余额不会入账
+            if not db.update_order_status(order_id, '已收货'):
+                raise RuntimeError('订单状态更新失败')
+
+            # 将款项增加到店铺余额，新余额在事务内取得
+            new_balance = db.update_shop_balance(order['total_price'])
+            if new_balance is None:
+                raise RuntimeError('店铺余额更新失败')
+
+    except ConflictError as e:
+        # 订单在读取后被其他请求修改（如重复确认），本次确认已整体回滚
+        app.logger.warning(f"确认收货冲突: {str(e)}")
+        flash('订单已被其他请求修改，请刷新后重试！', 'error')
+        return redirect(url_for('orders'))
     except Exception as e:
         flash(f'操作失败：{str(e)}', 'error')
         # 记录错误日志
         app.logger.error(f"确认收货失败: {str(e)}")
+        return redirect(url_for('orders'))
 
+    flash(f'订单确认收货成功！款项 {order["total_price"]} 元已转入店铺余额。当前店铺余额：{new_balance} 元', 'success')
     return redirect(url_for('orders'))
 
 @app.route('/cart')
@@ -507,8 +560,10 @@ def view_cart():
     total_price = 0
 
     if user_cart:
-        for item in user_cart.get('items', []):
-            product = db.get_product_by_id(item['product_id'])
+        items = user_cart.get('items', [])
+        products = db.get_products_by_ids([item['product_id'] for item in items])
+        for item in items:
+            product = products.get(item['product_id'])
             if product:
                 item_total = product['price'] * item['quantity']
                 cart_items.append({
@@ -623,59 +678,63 @@ def checkout_cart():
             flash('无效的请求令牌！', 'error')
             return redirect(url_for('view_cart'))
 
-        user_cart = db.get_cart_by_user_id(session['user_id'])
-        if not user_cart or not user_cart.get('items'):
-            flash('购物车为空！', 'error')
-            return redirect(url_for('view_cart'))
+        # 整个结算是一个工作单元：库存与余额只检查一次，扣款、减库存、建订单、清空购物车
+        # 缓冲到块结束时每个集合只写入一次；任一步出错全部回滚，不会留下扣了款却没有订单的状态
+        with db.transaction():
+            user_cart = db.get_cart_by_user_id(session['user_id'])
+            if not user_cart or not user_cart.get('items'):
+                flash('购物车为空！', 'error')
+                return redirect(url_for('view_cart'))
 
-        cart_items = []
-        total_price = 0
+            cart_items = []
+            total_price = 0
 
-        # 计算总价并检查库存
-        for item in user_cart.get('items', []):
-            product = db.get_product_by_id(item['product_id'])
-            if not product:
-                flash(f'商品 {item["product_id"]} 不存在！', 'error')
-                return redirect(url_for('view_cart'))
+            # 计算总价并检查库存
+            products = db.get_products_by_ids([item['product_id'] for item in user_cart['items']])
+            for item in user_cart['items']:
+                product = products.get(item['product_id'])
+                if not product:
+                    flash(f'商品 {item["product_id"]} 不存在！', 'error')
+                    return redirect(url_for('view_cart'))
 
-            if product['stock'] < item['quantity']:
-                flash(f'商品 {product["name"]} 库存不足！', 'error')
-                return redirect(url_for('view_cart'))
+                if product['stock'] < item['quantity']:
+                    flash(f'商品 {product["name"]} 库存不足！', 'error')
+                    return redirect(url_for('view_cart'))
 
-            item_total = product['price'] * item['quantity']
-            cart_items.append({
-                'product': product,
-                'quantity': item['quantity'],
-                'total_price': item_total
-            })
-            total_price += item_total
+                item_total = product['price'] * item['quantity']
+                cart_items.append({
+                    'product': product,
+                    'quantity': item['quantity'],
+                    'total_price': item_total
+                })
+                total_price += item_total
 
-        # 检查用户余额
-        user = db.get_user_by_id(session['user_id'])
-        if user['balance'] < total_price:
-            flash('余额不足！', 'error')
-            return redirect(url_for('view_cart'))
+            # 检查用户余额
+            user = db.get_user_by_id(session['user_id'])
+            if user['balance'] < total_price:
+                flash('余额不足！', 'error')
+                return redirect(url_for('view_cart'))
 
-        # 扣款
-        user['balance'] -= total_price
-        db.save_user(user)
+            # 扣款
+            user['balance'] -= total_price
+            db.save_user(user)
 
-        # 更新库存并创建订单（状态为"未发货"）
-        for item in cart_items:
-            product = item['product']
-            product['stock'] -= item['quantity']
-            db.save_product(product)
+            # 更新库存并创建订单（状态为"未发货"）
+            for item in cart_items:
+                product = item['product']
+                product['stock'] -= item['quantity']
+                db.save_product(product)
 
-            # 创建订单 - 初始状态为"未发货"
-            db.create_order(
-                user['id'],
-                product['id'],
-                item['quantity'],
-                item['total_price']
-            )
+                # 创建订单 - 初始状态为"未发货"
+                db.create_order(
+                    user['id'],
+                    product['id'],
+                    item['quantity'],
+                    item['total_price']
+                )
 
-        # 清空购物车
-        db.clear_cart(session['user_id'])
+            # 清空购物车
+            db.clear_cart(session['user_id'])
 
         flash(f'结算成功！共支付 {total_price} 元，等待发货', 'success')
         return redirect(url_for('orders'))
@@ -735,5 +794,11 @@ def not_found_error(error):
 def internal_error(error):
     return render_template('500.html'), 500
 
+@app.errorhandler(ConflictError)
+def conflict_error(error):
+    """保存时记录已被其他请求修改：本次写入已整体回滚，提示用户刷新后重试"""
+    flash('数据已被其他请求修改，请刷新后重试！', 'error')
+    return redirect(request.referrer or url_for('index'))
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,10 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 存储后端：json（项目目录下的 users.json 等数据文件）或 sqlite（下面的数据库，首次启动时自动导入 JSON 数据）
+STORAGE_BACKEND = os.environ.get('SHOP_STORAGE', 'json')
+DATA_DIR = os.environ.get('SHOP_DATA_DIR', '.')
+SQLALCHEMY_DATABASE_URI = os.environ.get(
+    'DATABASE_URL', 'sqlite:///' + os.path.join(BASE_DIR, 'instance', 'ecommerce.db')
+)
@@ -1,93 +1,98 @@
-import json
-import os
-import threading
+import math
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, List, Optional
+
+from search_index import SearchIndex
+from storage import JSONStorage, Storage
+
+# 分页查询默认的每页条数
+PAGE_SIZE = 20
 
 class DatabaseManager:
-    """数据库管理器 - 统一管理所有数据操作"""
-    
-    def __init__(self, data_dir='.'):
+    """数据库管理器 - 统一管理所有数据操作
+
+    数据的存取由可替换的存储后端完成（见 storage.py）：默认为 data_dir 下的 JSON 数据文件，
+    也可以传入 SQLiteStorage 等其他实现，各方法的签名与行为不变。
+    列表查询返回的记录只读；按条件取得的单条记录为副本，修改后需调用对应的 save_* 保存。
+    记录带版本号 _version：保存时若记录已被其他请求修改则抛出 storage.ConflictError，需重新读取后再改。
+    """
+
+    def __init__(self, data_dir='.', storage: Optional[Storage] = None):
         self.data_dir = data_dir
-        self.lock = threading.Lock()
-        
-        # 数据文件路径
-        self.users_file = os.path.join(data_dir, 'users.json')
-        self.products_file = os.path.join(data_dir, 'products.json')
-        self.orders_file = os.path.join(data_dir, 'orders.json')
-        self.shop_balance_file = os.path.join(data_dir, 'shop_balance.json')
-        self.carts_file = os.path.join(data_dir, 'carts.json')
-        self.reviews_file = os.path.join(data_dir, 'reviews.json')
-        
-        # 初始化数据文件
-        self._init_data_files()
-    
-    def _init_data_files(self):
-        """初始化数据文件"""
-        files = [self.users_file, self.products_file, self.orders_file, self.carts_file, self.reviews_file]
-        for file_path in files:
-            if not os.path.exists(file_path):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([], f, ensure_ascii=False, indent=2)
-        
-        # 初始化店铺余额文件
-        if not os.path.exists(self.shop_balance_file):
-            with open(self.shop_balance_file, 'w', encoding='utf-8') as f:
-                json.dump({"balance": 0.0}, f, ensure_ascii=False, indent=2)
-    
-    def _read_json(self, file_path: str) -> List[Dict]:
-        """读取JSON文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
-    def _write_json(self, file_path: str, data: List[Dict]):
-        """写入JSON文件"""
-        with self.lock:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-    
+        self.storage = storage or JSONStorage(data_dir)
+        self.search_index = SearchIndex()
+        self.storage.subscribe('products', self.search_index.on_change)
+
+    def _paginate(self, name: str, page: int, per_page: int, sort: Optional[str], descending: bool,
+                  cursor: Optional[int], field: Optional[str] = None, value: Any = None) -> Dict:
+        """
+        分页查询，返回 {'items', 'total', 'page', 'per_page', 'pages', 'next_cursor'}。
+        cursor 给出时按ID键集分页（取ID在 cursor 之后的一页，忽略 page 与 sort，page 为 None），
+        否则按 sort 排序取第 page 页。next_cursor 为按ID顺序继续取下一页所需的游标，没有下一页时为 None
+        """
+        if cursor is not None:
+            # 多取一条判断是否还有下一页
+            items, total = self.storage.page_after(name, cursor, per_page + 1, descending, field, value)
+            page = None
+        else:
+            page = max(page, 1)
+            items, total = self.storage.page(name, (page - 1) * per_page, per_page + 1, sort, descending,
+                                             field, value)
+        has_more = len(items) > per_page
+        items = items[:per_page]
+        keyset = cursor is not None or sort in (None, 'id')
+        return {
+            'items': items,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': math.ceil(total / per_page),
+            'next_cursor': items[-1]['id'] if has_more and keyset else None
+        }
+
+    def transaction(self):
+        """
+        工作单元：with db.transaction(): 块内的 save_*/create_*/delete_* 等写入先缓冲（块内读取可见），
+        块正常结束时每个涉及的集合只写入一次，发生异常时全部回滚
+        """
+        return self.storage.transaction()
+
     # 用户管理
     def get_users(self) -> List[Dict]:
         """获取所有用户"""
-        return self._read_json(self.users_file)
-    
+        return self.storage.all('users')
+
+    def get_users_page(self, page: int = 1, per_page: int = PAGE_SIZE, sort: Optional[str] = None,
+                       descending: bool = False, cursor: Optional[int] = None) -> Dict:
+        """分页获取用户（参数与返回值见 _paginate）"""
+        return self._paginate('users', page, per_page, sort, descending, cursor)
+
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """根据ID获取用户"""
-        users = self.get_users()
-        return next((u for u in users if u['id'] == user_id), None)
-    
+        return self.storage.get('users', user_id)
+
+    def get_users_by_ids(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """批量获取用户：用户ID -> 用户，不存在的ID不出现在结果中"""
+        return self.storage.get_many('users', user_ids)
+
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         """根据用户名获取用户"""
-        users = self.get_users()
-        return next((u for u in users if u['username'] == username), None)
-    
+        users = self.storage.find('users', 'username', username)
+        return self.storage.get('users', users[0]['id']) if users else None
+
     def save_user(self, user: Dict):
         """保存用户"""
-        users = self.get_users()
-        existing_index = next((i for i, u in enumerate(users) if u['id'] == user['id']), None)
-        
-        if existing_index is not None:
-            users[existing_index] = user
-        else:
-            users.append(user)
-        
-        self._write_json(self.users_file, users)
-    
+        self.storage.put('users', user)
+
     def delete_user(self, user_id: int) -> bool:
         """删除用户"""
-        users = self.get_users()
-        users = [u for u in users if u['id'] != user_id]
-        self._write_json(self.users_file, users)
+        self.storage.delete('users', user_id)
         return True
-    
+
     def create_user(self, username: str, password_hash: str, role: str = 'user') -> Dict:
         """创建新用户"""
-        users = self.get_users()
-        new_id = max([u['id'] for u in users], default=0) + 1
-        
+        new_id = self.storage.next_id('users')
+
         user = {
             'id': new_id,
             'username': username,
@@ -103,43 +108,42 @@ class DatabaseManager:
                 'phone': ''
             }
         }
-        
+
         self.save_user(user)
         return user
-    
+
     # 商品管理
     def get_products(self) -> List[Dict]:
         """获取所有商品"""
-        return self._read_json(self.products_file)
-    
+        return self.storage.all('products')
+
+    def get_products_page(self, page: int = 1, per_page: int = PAGE_SIZE, sort: Optional[str] = None,
+                          descending: bool = False, cursor: Optional[int] = None,
+                          category: Optional[str] = None) -> Dict:
+        """分页获取商品，category 给出时只取该分类（参数与返回值见 _paginate）"""
+        return self._paginate('products', page, per_page, sort, descending, cursor,
+                              'category' if category is not None else None, category)
+
     def get_product_by_id(self, product_id: int) -> Optional[Dict]:
         """根据ID获取商品"""
-        products = self.get_products()
-        return next((p for p in products if p['id'] == product_id), None)
-    
+        return self.storage.get('products', product_id)
+
+    def get_products_by_ids(self, product_ids: List[int]) -> Dict[int, Dict]:
+        """批量获取商品：商品ID -> 商品，不存在的ID不出现在结果中"""
+        return self.storage.get_many('products', product_ids)
+
     def save_product(self, product: Dict):
         """保存商品"""
-        products = self.get_products()
-        existing_index = next((i for i, p in enumerate(products) if p['id'] == product['id']), None)
-        
-        if existing_index is not None:
-            products[existing_index] = product
-        else:
-            products.append(product)
-        
-        self._write_json(self.products_file, products)
+        self.storage.put('products', product)
 
     def delete_product(self, product_id: int) -> bool:
         """删除商品"""
-        products = self.get_products()
-        products = [p for p in products if p['id'] != product_id]
-        self._write_json(self.products_file, products)
+        self.storage.delete('products', product_id)
         return True
 
     def create_product(self, name: str, price: float, stock: int, category: str, description: str = '') -> Dict:
         """创建新商品"""
-        products = self.get_products()
-        new_id = max([p['id'] for p in products], default=0) + 1
+        new_id = self.storage.next_id('products')
 
         product = {
             'id': new_id,
@@ -154,49 +158,61 @@ class DatabaseManager:
         self.save_product(product)
         return product
 
-    def search_products(self, query: str) -> List[Dict]:
-        """搜索商品"""
-        products = self.get_products()
-        query_lower = query.lower()
-        return [p for p in products if query_lower in p['name'].lower() or 
-                query_lower in p.get('description', '').lower()]
+    def search_products(self, query: str, page: int = 1, per_page: int = PAGE_SIZE) -> Dict:
+        """
+        搜索商品（名称、分类、描述），按相关度排序并分页，返回 {'items', 'total', 'page', 'per_page', 'pages'}。
+        使用倒排索引，按存储的变更回调只更新变化的商品，见 search_index.py
+        """
+        page = max(page, 1)
+        index = self.search_index
+        with index.lock:
+            # 先取标记：读取时合并的其他进程的日志同样经回调记下
+            token = self.storage.version('products')
+            index.catch_up()
+            if token != index.token:
+                index.refresh(token, self.get_products())
+            ids, total = index.search(query, per_page, (page - 1) * per_page)
+        products = self.get_products_by_ids(ids)
+        items = [products[product_id] for product_id in ids if product_id in products]
+        return {
+            'items': items,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': math.ceil(total / per_page)
+        }
 
     def get_products_by_category(self, category: str) -> List[Dict]:
         """按分类获取商品"""
-        products = self.get_products()
-        return [p for p in products if p['category'] == category]
+        return self.storage.find('products', 'category', category)
 
     # 订单管理
     def get_orders(self) -> List[Dict]:
         """获取所有订单"""
-        return self._read_json(self.orders_file)
-    
+        return self.storage.all('orders')
+
     def get_orders_by_user(self, user_id: int) -> List[Dict]:
         """获取用户的订单"""
-        orders = self.get_orders()
-        return [o for o in orders if o['user_id'] == user_id]
+        return self.storage.find('orders', 'user_id', user_id)
+
+    def get_orders_page(self, page: int = 1, per_page: int = PAGE_SIZE, sort: Optional[str] = None,
+                        descending: bool = False, cursor: Optional[int] = None,
+                        user_id: Optional[int] = None) -> Dict:
+        """分页获取订单，user_id 给出时只取该用户的订单（参数与返回值见 _paginate）"""
+        return self._paginate('orders', page, per_page, sort, descending, cursor,
+                              'user_id' if user_id is not None else None, user_id)
 
     def get_order_by_id(self, order_id: int) -> Optional[Dict]:
         """根据ID获取订单"""
-        orders = self.get_orders()
-        return next((o for o in orders if o['id'] == order_id), None)
+        return self.storage.get('orders', order_id)
 
     def save_order(self, order: Dict):
         """保存订单"""
-        orders = self.get_orders()
-        existing_index = next((i for i, o in enumerate(orders) if o['id'] == order['id']), None)
-
-        if existing_index is not None:
-            orders[existing_index] = order
-        else:
-            orders.append(order)
+        self.storage.put('orders', order)
 
-        self._write_json(self.orders_file, orders)
-    
     def create_order(self, user_id: int, product_id: int, quantity: int, total_price: float) -> Dict:
         """创建新订单"""
-        orders = self.get_orders()
-        new_id = max([o['id'] for o in orders], default=0) + 1
+        new_id = self.storage.next_id('orders')
 
         # 获取商品信息
         product = self.get_product_by_id(product_id)
@@ -242,59 +258,43 @@ class DatabaseManager:
 
     def update_order_payment_status(self, order_id: int, payment_method: str, status: str = '已支付'):
         """更新订单支付状态"""
-        orders = self._read_json(self.orders_file)
-        for order in orders:
-            if order['id'] == order_id:
-                order['payment_method'] = payment_method
-                order['status'] = status
-                order['paid_at'] = datetime.now().isoformat()
-                self._write_json(self.orders_file, orders)
-                return True
+        order = self.get_order_by_id(order_id)
+        if order:
+            order['payment_method'] = payment_method
+            order['status'] = status
+            order['paid_at'] = datetime.now().isoformat()
+            self.save_order(order)
+            return True
         return False
 
     # 店铺余额管理
     def get_shop_balance(self) -> float:
         """获取店铺余额"""
-        try:
-            with open(self.shop_balance_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('balance', 0.0)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return 0.0
+        return self.storage.get_value('balance', 0.0)
 
     def update_shop_balance(self, amount: float):
-        """更新店铺余额"""
-        current_balance = self.get_shop_balance()
-        new_balance = current_balance + amount
-        
-        with self.lock:
-            with open(self.shop_balance_file, 'w', encoding='utf-8') as f:
-                json.dump({"balance": new_balance}, f, ensure_ascii=False, indent=2)
-        
-        return new_balance
+        """更新店铺余额（原子地增加 amount，多个进程同时更新不会丢失）"""
+        return self.storage.increment_value('balance', amount)
 
     # 购物车管理
     def get_cart_by_user_id(self, user_id: int) -> Optional[Dict]:
         """获取用户的购物车"""
-        carts = self._read_json(self.carts_file)
-        return next((c for c in carts if c['user_id'] == user_id), None)
+        return self.storage.get('carts', user_id)
 
     def create_or_update_cart(self, user_id: int, product_id: int, quantity: int, set_quantity: bool = False) -> Dict:
         """创建或更新购物车商品"""
-        carts = self._read_json(self.carts_file)
         user_cart = self.get_cart_by_user_id(user_id)
-        
+
         if not user_cart:
             user_cart = {
                 'user_id': user_id,
                 'items': [],
                 'updated_at': datetime.now().isoformat()
             }
-            carts.append(user_cart)
-        
+
         # 查找是否已存在该商品
         existing_item = next((item for item in user_cart['items'] if item['product_id'] == product_id), None)
-        
+
         if existing_item:
             if set_quantity:
                 existing_item['quantity'] = quantity  # 设置特定数量
@@ -306,28 +306,27 @@ class DatabaseManager:
                 'quantity': quantity,
                 'added_at': datetime.now().isoformat()
             })
-        
+
         user_cart['updated_at'] = datetime.now().isoformat()
-        self._write_json(self.carts_file, carts)
+        self.storage.put('carts', user_cart)
         return user_cart
 
     def remove_from_cart(self, user_id: int, product_id: int) -> bool:
         """从购物车移除商品"""
         try:
-            carts = self._read_json(self.carts_file)
-            user_cart_index = next((i for i, c in enumerate(carts) if c['user_id'] == user_id), None)
-            
-            if user_cart_index is not None:
-                user_cart = carts[user_cart_index]
+            user_cart = self.get_cart_by_user_id(user_id)
+
+            if user_cart is not None:
                 original_length = len(user_cart.get('items', []))
                 user_cart['items'] = [item for item in user_cart.get('items', []) if item['product_id'] != product_id]
-                
+
                 if len(user_cart['items']) < original_length:
                     user_cart['updated_at'] = datetime.now().isoformat()
                     # 如果购物车为空，移除整个购物车
                     if not user_cart['items']:
-                        carts.pop(user_cart_index)
-                    self._write_json(self.carts_file, carts)
+                        self.storage.delete('carts', user_id)
+                    else:
+                        self.storage.put('carts', user_cart)
                     return True
             return False
         except Exception as e:
@@ -335,22 +334,13 @@ class DatabaseManager:
 
     def clear_cart(self, user_id: int) -> bool:
         """清空购物车"""
-        carts = self._read_json(self.carts_file)
-        user_cart = self.get_cart_by_user_id(user_id)
-        
-        if user_cart:
-            carts = [c for c in carts if c['user_id'] != user_id]
-            self._write_json(self.carts_file, carts)
-            return True
-        return False
+        return self.storage.delete('carts', user_id)
 
     # 评价管理
     def add_review(self, order_id: int, product_id: int, user_id: int, rating: int, comment: str):
         """添加商品评价"""
-        reviews = self._read_json('reviews.json')  # 需要创建新的数据文件
-        
         review = {
-            'id': len(reviews) + 1,
+            'id': self.storage.next_id('reviews'),
             'order_id': order_id,
             'product_id': product_id,
             'user_id': user_id,
@@ -358,10 +348,9 @@ class DatabaseManager:
             'comment': comment,
             'created_at': datetime.now().isoformat()
         }
-        
-        reviews.append(review)
-        self._write_json('reviews.json', reviews)
+
+        self.storage.put('reviews', review)
         return review
 
 # 全局数据库实例
-db = DatabaseManager()
\ No newline at end of file
+db = DatabaseManager()
@@ -0,0 +1,163 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from storage import VERSION_FIELD
+
+# 参与检索的字段及其权重：名称命中比分类、描述命中更相关
+FIELD_WEIGHTS = {'name': 3, 'category': 2, 'description': 1}
+
+# 字母数字组成的词（字母与数字交界处拆开，如 mate27 -> mate、27），以及中日韩文字（基本区、扩展 A 区与兼容区）的连续片段
+_ASCII_WORD = re.compile(r'[a-z0-9]+')
+_TERM = re.compile(r'([a-z]+|[0-9]+)|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+
+def tokenize(text: str, unigrams: bool = True) -> List[str]:
+    """
+    切分文本：中文按相邻两字（bigram，建索引时另加单字，单字查询也能命中），英文与数字按词并在字母、数字交界处拆开
+    （27 能命中 华为mate27，iphone15 与 iPhone 15 互相命中），统一小写。
+    查询时 unigrams=False，多字查询只用 bigram，相当于要求字序相邻
+    """
+    tokens = []
+    for match in _TERM.finditer((text or '').lower()):
+        run = match.group()
+        if match.group(1) is not None:
+            tokens.append(run)
+            continue
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        if unigrams or len(run) == 1:
+            tokens.extend(run)
+    return tokens
+
+
+class SearchIndex:
+    """
+    商品的倒排索引：词 -> {商品ID: 加权词频}，按 TF-IDF 排序返回结果。
+
+    本进程的写入经存储的变更回调（on_change，见 Storage.subscribe）记下，查询前由 catch_up 只更新变化的商品；
+    变更没能衔接上（其他进程的写入、日志被压缩后重新加载等）时，refresh 按记录的版本号 _version
+    重新切分新增、修改的商品并移除已删除的商品。多个线程共用一个实例。
+    """
+
+    # 等待应用的变更条数上限，超出时丢弃最早的，衔接不上后由 refresh 整体比对
+    MAX_PENDING = 10000
+
+    def __init__(self, fields: Dict[str, int] = None):
+        self.fields = fields or FIELD_WEIGHTS
+        self.lock = threading.Lock()
+        self.token: Any = None
+        self.postings: Dict[str, Dict[int, int]] = {}
+        # 商品ID -> (版本号, 词 -> 加权词频)，用于增量更新时找出变化的商品并撤销其旧的倒排项
+        self.documents: Dict[int, Tuple[int, Dict[str, int]]] = {}
+        # 字母数字词的有序词表，供前缀匹配；词表变化时置为 None，下次查询时重建
+        self._words: Optional[List[str]] = None
+        # 存储回调记下的 (写入前标记, 写入后标记, {商品ID: 新记录或 None})；回调时不取 self.lock，避免与存储的锁互相等待
+        self._pending = deque(maxlen=self.MAX_PENDING)
+
+    def on_change(self, before: Any, after: Any, changes: Dict[int, Optional[Dict]]):
+        """存储的变更回调：只记下变更，由下次查询时的 catch_up 应用"""
+        self._pending.append((before, after, changes))
+
+    def catch_up(self):
+        """按标记顺序应用记下的变更，只重新切分变化的商品（调用方持有 self.lock）；衔接不上的变更丢弃"""
+        chain = {}
+        while self._pending:
+            before, after, changes = self._pending.popleft()
+            chain[before] = (after, changes)
+        while self.token is not None and self.token in chain:
+            self.token, changes = chain.pop(self.token)
+            for doc_id, record in changes.items():
+                self._remove(doc_id)
+                if record is not None:
+                    self._add(record)
+
+    def refresh(self, token: Any, records: Iterable[Dict]):
+        """按变更标记 token 与当前全部记录增量更新索引（调用方持有 self.lock）"""
+        if self.token is not None and token == self.token:
+            return
+        seen = set()
+        for record in records:
+            doc_id = record['id']
+            seen.add(doc_id)
+            indexed = self.documents.get(doc_id)
+            if indexed is None or indexed[0] != record.get(VERSION_FIELD, 0):
+                self._remove(doc_id)
+                self._add(record)
+        for doc_id in [doc_id for doc_id in self.documents if doc_id not in seen]:
+            self._remove(doc_id)
+        self.token = token
+
+    def _add(self, record: Dict):
+        doc_id = record['id']
+        terms: Dict[str, int] = {}
+        for field, weight in self.fields.items():
+            for token, count in Counter(tokenize(str(record.get(field) or ''))).items():
+                terms[token] = terms.get(token, 0) + count * weight
+        for token, frequency in terms.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                self._words = None
+            postings[doc_id] = frequency
+        self.documents[doc_id] = (record.get(VERSION_FIELD, 0), terms)
+
+    def _remove(self, doc_id: int):
+        indexed = self.documents.pop(doc_id, None)
+        if indexed is None:
+            return
+        for token in indexed[1]:
+            postings = self.postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[token]
+                self._words = None
+
+    def _expand(self, token: str) -> List[str]:
+        """查询词对应的索引词：中文为自身；字母数字词按前缀匹配（如 iph 匹配 iphone）"""
+        if not _ASCII_WORD.fullmatch(token):
+            return [token] if token in self.postings else []
+        if self._words is None:
+            self._words = sorted(word for word in self.postings if _ASCII_WORD.fullmatch(word))
+        words = []
+        for i in range(bisect_left(self._words, token), len(self._words)):
+            if not self._words[i].startswith(token):
+                break
+            words.append(self._words[i])
+        return words
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[int], int]:
+        """
+        返回 (按相关度排序的第 offset 起 limit 个商品ID, 命中总数)。
+        每个查询词（中文 bigram、英文词前缀）都须命中；得分为各词 (1 + log 加权词频) × log(1 + N / df) 之和
+        """
+        groups = []
+        for token in dict.fromkeys(tokenize(query, unigrams=False)):
+            words = self._expand(token)
+            if not words:
+                return [], 0
+            groups.append(words)
+        if not groups:
+            return [], 0
+
+        # 从文档最少的查询词开始求交集
+        candidates: Optional[Set[int]] = None
+        for words in sorted(groups, key=lambda ws: sum(len(self.postings[w]) for w in ws)):
+            matched = set().union(*(self.postings[w] for w in words))
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return [], 0
+
+        total_docs = len(self.documents)
+        idf = {w: math.log(1 + total_docs / len(self.postings[w])) for words in groups for w in words}
+
+        def score(doc_id: int) -> float:
+            return sum((1 + math.log(self.postings[w][doc_id])) * idf[w]
+                       for words in groups for w in words if doc_id in self.postings[w])
+
+        # 只取前 offset + limit 个，同分按ID升序
+        top = heapq.nlargest(offset + limit, candidates, key=lambda doc_id: (score(doc_id), -doc_id))
+        return top[offset:], len(candidates)
@@ -0,0 +1,1154 @@
+import argparse
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，JSON 存储只有进程内的锁
+    fcntl = None
+
+# 集合名 -> (主键字段, 二级索引字段)
+COLLECTIONS = {
+    'users': ('id', ('username',)),
+    'products': ('id', ('category',)),
+    'orders': ('id', ('user_id',)),
+    'carts': ('user_id', ()),
+    'reviews': ('id', ()),
+}
+
+# 分页查询除主键外可用的排序字段（SQLite 为其建立表达式索引）
+SORT_FIELDS = {
+    'users': ('username', 'balance', 'created_at'),
+    'products': ('name', 'price', 'stock', 'created_at'),
+    'orders': ('total_price', 'status', 'created_at'),
+    'carts': ('updated_at',),
+    'reviews': ('rating', 'created_at'),
+}
+
+# 店铺余额等单值设置在 JSON 存储中所在的文件
+SETTINGS_FILE = 'shop_balance.json'
+# 单值设置在 JSON 存储中的锁名
+SETTINGS = 'settings'
+# 各集合已分配的最大 ID 在 JSON 存储中所在的文件，及其锁名
+SEQUENCES_FILE = 'sequences.json'
+SEQUENCES = 'sequences'
+# 记录的版本号字段：每次保存加一，用于乐观并发检查
+VERSION_FIELD = '_version'
+
+
+class ConflictError(Exception):
+    """保存时记录已被其他请求修改（版本号不符）、已被删除，或插入的主键已存在"""
+
+    def __init__(self, name: str, key: Any):
+        super().__init__(f'{name} 中主键为 {key} 的记录已被其他请求修改，请重新读取后再保存')
+        self.name = name
+        self.key = key
+
+
+class Storage:
+    """存储后端接口：按集合存取记录（字典），另有少量单值设置（如店铺余额）
+
+    get 返回调用方可自由修改的记录副本（带版本号 _version）；all/find 返回的记录只读。
+    put 做乐观并发检查：记录带 _version 时，存储中的版本必须与之相同；不带时为插入，主键必须不存在；
+    不满足时抛出 ConflictError。保存成功后存储中的版本加一，再次修改前需重新读取。
+    """
+
+    def all(self, name: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def get(self, name: str, key: Any) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_many(self, name: str, keys: List[Any]) -> Dict[Any, Dict]:
+        """按主键批量读取：主键 -> 记录副本（同 get），不存在的主键不出现在结果中"""
+        raise NotImplementedError
+
+    def find(self, name: str, field: str, value: Any) -> List[Dict]:
+        """按二级索引字段（见 COLLECTIONS）查询"""
+        raise NotImplementedError
+
+    def put(self, name: str, record: Dict):
+        """按主键插入或替换记录（版本检查见类说明）"""
+        raise NotImplementedError
+
+    def delete(self, name: str, key: Any) -> bool:
+        raise NotImplementedError
+
+    def page(self, name: str, offset: int, limit: int, sort: Optional[str] = None, descending: bool = False,
+             field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        """
+        偏移分页：按 sort（SORT_FIELDS 中的字段，默认主键）排序、同值按主键，取第 offset 起的 limit 条；
+        field 给出时只取该二级索引字段等于 value 的记录。返回 (记录, 符合条件的总数)，缺少排序字段的记录排在最前
+        """
+        raise NotImplementedError
+
+    def page_after(self, name: str, after: Any, limit: int, descending: bool = False,
+                   field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        """键集分页：按主键排序，取主键在 after 之后（descending 时为之前）的 limit 条；after 为 None 时从头开始"""
+        raise NotImplementedError
+
+    def get_value(self, name: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set_value(self, name: str, value: Any):
+        raise NotImplementedError
+
+    def increment_value(self, name: str, amount: float) -> Any:
+        """原子地给单值设置加上 amount（不存在时从 0 开始），返回新值"""
+        raise NotImplementedError
+
+    def version(self, name: str) -> Any:
+        """集合的变更标记：集合内容（含其他进程的写入）变化后必然不同，用于判断搜索索引等派生数据是否需要更新"""
+        raise NotImplementedError
+
+    def subscribe(self, name: str, listener: Callable[[Any, Any, Dict[Any, Optional[Dict]]], None]):
+        """
+        登记集合的变更回调 listener(before, after, changes)：本进程的写入生效后调用，before/after 为写入前后的变更标记
+        （同 version），changes 为 {主键: 新记录（只读），删除时为 None}。回调可能在存储的锁内执行，只应记下变更，
+        不能访问存储或等待其他锁；其他进程的写入不一定回调，派生数据仍需比对 version
+        """
+        if not hasattr(self, '_listeners'):
+            self._listeners: Dict[str, List[Callable]] = {}
+        self._listeners.setdefault(name, []).append(listener)
+
+    def _notify(self, name: str, before: Any, after: Any, changes: Dict[Any, Optional[Dict]]):
+        for listener in getattr(self, '_listeners', {}).get(name, ()):
+            listener(before, after, changes)
+
+    def next_id(self, name: str) -> int:
+        """分配集合的下一个 ID：单调递增、持久化，多个进程同时分配也不会重复（事务回滚后可能留下空号）"""
+        raise NotImplementedError
+
+    def transaction(self):
+        """
+        工作单元：with storage.transaction(): 块内的写入先缓冲（块内读取可见），正常结束时一次性提交，
+        发生异常时全部回滚；嵌套调用并入最外层事务
+        """
+        raise NotImplementedError
+
+
+class _Transaction:
+    """JSONStorage 的事务缓冲：集合名 -> {主键: 新记录，删除时为 None}，以及修改过的单值设置"""
+
+    def __init__(self):
+        self.changes: Dict[str, Dict[Any, Optional[Dict]]] = {}
+        # 集合名 -> {主键: 首次保存时记录所带的版本号}，提交时与存储中的版本比对
+        self.expected: Dict[str, Dict[Any, Optional[int]]] = {}
+        self.values: Dict[str, Any] = {}
+        self.increments: Dict[str, float] = {}
+
+
+def _check_sort(name: str, sort: Optional[str]) -> str:
+    key = COLLECTIONS[name][0]
+    if sort in (None, key):
+        return key
+    if sort not in SORT_FIELDS[name]:
+        raise ValueError(f'{name} 不支持按 {sort} 排序')
+    return sort
+
+
+def _sort_key(record: Dict, key: str, sort: str) -> tuple:
+    value = record.get(sort)
+    return value is not None, value if value is not None else 0, record[key]
+
+
+def _sort_records(records: List[Dict], key: str, sort: str) -> List[Dict]:
+    """按 (sort 字段, 主键) 升序排列，缺少 sort 字段的记录排在最前（与 SQLite 中 NULL 的顺序一致）"""
+    return sorted(records, key=lambda r: _sort_key(r, key, sort))
+
+
+def _slice_page(records: List[Dict], offset: int, limit: int, descending: bool) -> List[Dict]:
+    """从升序排列的记录中取一页；descending 时从末尾倒数"""
+    if not descending:
+        return records[offset:offset + limit]
+    end = max(len(records) - offset, 0)
+    return records[max(end - limit, 0):end][::-1]
+
+
+def _slice_after(records: List[Dict], keys: List[Any], after: Any, limit: int, descending: bool) -> List[Dict]:
+    """从按主键升序排列的记录（keys 为对应的主键）中取 after 之后的一页"""
+    if not descending:
+        start = 0 if after is None else bisect_right(keys, after)
+        return records[start:start + limit]
+    end = len(keys) if after is None else bisect_left(keys, after)
+    return records[max(end - limit, 0):end][::-1]
+
+
+class _Collection:
+    """
+    一个数据文件的记录列表及其索引：主键 -> 列表位置，二级索引字段值 -> 主键列表（按文件顺序）。
+    分页用的有序视图在首次查询时排序并缓存；记录变化时在各视图中二分查找位置，就地删除旧记录、插入新记录，不重新排序
+    """
+
+    # 缓存的有序视图个数上限（按二级索引值过滤的视图可能很多）
+    MAX_VIEWS = 64
+
+    def __init__(self, records: List[Dict], key: str, indexed_fields: Tuple[str, ...]):
+        self.records = records
+        self.key = key
+        self.indexed_fields = indexed_fields
+        # 加载时的数据文件签名，以及已合并到 records 的日志位置（字节）与日志文件的 inode
+        self.base_signature: Optional[tuple] = None
+        self.journal_offset = 0
+        self.journal_inode: Optional[int] = None
+        self.positions: Dict[Any, int] = {}
+        self.indexes: Dict[str, Dict[Any, List[Any]]] = {field: {} for field in indexed_fields}
+        # (排序字段, 过滤字段, 过滤值) -> (有序记录, 对应的主键, 对应的排序键)；按主键排序时排序键即主键列表本身
+        self._views: Dict[tuple, Tuple[List[Dict], List[Any], List[Any]]] = {}
+        for position, record in enumerate(records):
+            # 主键重复时以第一条为准，与原先的线性查找一致
+            if self.positions.setdefault(record[key], position) == position:
+                self._index(record)
+
+    def _index(self, record: Dict):
+        for field in self.indexed_fields:
+            self.indexes[field].setdefault(record.get(field), []).append(record[self.key])
+
+    def _unindex(self, record: Dict):
+        for field in self.indexed_fields:
+            bucket = self.indexes[field][record.get(field)]
+            bucket.remove(record[self.key])
+            if not bucket:
+                del self.indexes[field][record.get(field)]
+
+    def get(self, key: Any) -> Optional[Dict]:
+        position = self.positions.get(key)
+        return self.records[position] if position is not None else None
+
+    def find(self, field: str, value: Any) -> List[Dict]:
+        return [self.records[self.positions[key]] for key in self.indexes[field].get(value, ())]
+
+    def view(self, sort: str, field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], List[Any]]:
+        """按 (sort, 主键) 升序排列的记录（field 给出时只含该字段等于 value 的）及其主键"""
+        view_key = (sort, field, value)
+        view = self._views.get(view_key)
+        if view is None:
+            records = self.records if field is None else self.find(field, value)
+            records = _sort_records(records, self.key, sort)
+            if len(self._views) >= self.MAX_VIEWS:
+                self._views.clear()
+            keys = [record[self.key] for record in records]
+            order = keys if sort == self.key else [_sort_key(record, self.key, sort) for record in records]
+            view = self._views[view_key] = (records, keys, order)
+        return view[0], view[1]
+
+    def _order(self, sort: str, record: Dict) -> Any:
+        return record[self.key] if sort == self.key else _sort_key(record, self.key, sort)
+
+    def _update_views(self, old: Optional[Dict], new: Optional[Dict]):
+        """记录由 old 变为 new（None 表示不存在）：从各缓存视图中移除 old，并把 new 插入到有序位置"""
+        for view_key, (records, keys, order) in list(self._views.items()):
+            sort, field, value = view_key
+            if old is not None and (field is None or old.get(field) == value):
+                i = bisect_left(order, self._order(sort, old))
+                if i >= len(records) or records[i] is not old:
+                    # 定位不到旧记录（如数据文件中主键重复）时作废该视图，下次查询时重新排序
+                    del self._views[view_key]
+                    continue
+                del records[i], keys[i]
+                if order is not keys:
+                    del order[i]
+            if new is not None and (field is None or new.get(field) == value):
+                sort_key = self._order(sort, new)
+                i = bisect_left(order, sort_key)
+                records.insert(i, new)
+                keys.insert(i, new[self.key])
+                if order is not keys:
+                    order.insert(i, sort_key)
+
+    def upsert(self, record: Dict):
+        """按主键替换或追加记录，同步更新索引与有序视图"""
+        key = record[self.key]
+        position = self.positions.get(key)
+        if self._views:
+            self._update_views(self.records[position] if position is not None else None, record)
+        if position is None:
+            self.positions[key] = len(self.records)
+            self.records.append(record)
+            self._index(record)
+            return
+        old = self.records[position]
+        self.records[position] = record
+        for field in self.indexed_fields:
+            if old.get(field) != record.get(field):
+                self._unindex(old)
+                self._index(record)
+                # 保持索引桶内的文件顺序
+                for bucket in (self.indexes[f][record.get(f)] for f in self.indexed_fields):
+                    bucket.sort(key=self.positions.__getitem__)
+                break
+
+    def delete(self, key: Any) -> bool:
+        """按主键删除记录；其后记录的位置前移"""
+        position = self.positions.pop(key, None)
+        if position is None:
+            return False
+        if self._views:
+            self._update_views(self.records[position], None)
+        self._unindex(self.records.pop(position))
+        for i in range(position, len(self.records)):
+            self.positions[self.records[i][self.key]] = i
+        return True
+
+
+class _FileLocks:
+    """
+    跨进程的读写锁：每个集合一个锁文件（.users.lock 等）上的 flock，共享锁用于读、排他锁用于写。
+    每次获取都打开新的文件描述符，同一进程的不同线程之间同样互斥；同一线程重复获取时直接复用已持有的锁
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._local = threading.local()
+
+    def _held(self) -> Dict[str, bool]:
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = {}
+        return held
+
+    @contextmanager
+    def _acquire(self, name: str, exclusive: bool):
+        held = self._held()
+        if name in held:
+            if exclusive and not held[name]:
+                raise RuntimeError(f'不能把 {name} 的共享锁升级为排他锁')
+            yield
+            return
+        fd = None
+        if fcntl is not None:
+            fd = os.open(os.path.join(self.directory, f'.{name}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            held[name] = exclusive
+            try:
+                yield
+            finally:
+                del held[name]
+        finally:
+            # 关闭描述符即释放 flock
+            if fd is not None:
+                os.close(fd)
+
+    def shared(self, name: str):
+        return self._acquire(name, False)
+
+    def exclusive(self, name: str):
+        return self._acquire(name, True)
+
+
+class JSONStorage(Storage):
+    """JSON 文件存储：每个集合一个数据文件（users.json 等）加一个追加写的变更日志（users.journal.jsonl 等）
+
+    写入只向日志追加一行（插入/替换的完整记录，或删除的主键），代价与集合大小无关；
+    加载时读取数据文件并按顺序重放日志。日志超过数据文件大小（且不小于 COMPACT_MIN_BYTES）时，
+    由后台线程把当前内容写入临时文件、原子替换数据文件并清空日志。
+    每个集合在进程内缓存一份记录及其主键与二级索引：数据文件签名（inode、修改时间、大小）不变时
+    只需读取日志新增的部分，其他进程的写入也据此增量合并。
+    所有写入都经过事务：写入缓冲在当前线程，提交时按名称顺序取得各集合的排他文件锁，
+    检查版本号后每个集合只追加一行（batch），写了一半的行在重放时被忽略。
+    读取在缓存失效、需要合并日志时取共享文件锁，不会读到压缩到一半的状态。
+    多个工作进程（如 gunicorn）可共用同一数据目录。
+    """
+
+    # 日志至少达到该大小才压缩，避免小集合频繁重写数据文件
+    COMPACT_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, data_dir: str = '.'):
+        self.data_dir = data_dir
+        # 进程内的写事务锁（可重入）：事务执行期间本进程的其他写事务等待
+        self.lock = threading.RLock()
+        # 跨进程的读写锁，每个集合及单值设置各一个
+        self.locks = _FileLocks(data_dir)
+        # 每个集合一把内存锁，保护进程内缓存的记录与索引；加锁顺序：self.lock -> 文件锁 -> 内存锁
+        self._memory_locks = {name: threading.RLock() for name in (*COLLECTIONS, SETTINGS, SEQUENCES)}
+        # 数据文件路径 -> (文件签名, 解析后的数据)，用于单值设置文件
+        self._cache: Dict[str, Tuple[Optional[tuple], Any]] = {}
+        # 集合名 -> 带索引的记录集合
+        self._collections: Dict[str, _Collection] = {}
+        # 正在后台压缩的集合
+        self._compacting: set = set()
+        # 当前线程的事务缓冲
+        self._local = threading.local()
+        self.settings_file = os.path.join(data_dir, SETTINGS_FILE)
+        self.sequences_file = os.path.join(data_dir, SEQUENCES_FILE)
+
+        # 初始化数据文件
+        for name in COLLECTIONS:
+            self._init_file(self.collection_file(name), [])
+        self._init_file(self.settings_file, {"balance": 0.0})
+
+    @staticmethod
+    def _init_file(file_path: str, initial: Any):
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(initial, f, ensure_ascii=False, indent=2)
+
+    def collection_file(self, name: str) -> str:
+        return os.path.join(self.data_dir, f'{name}.json')
+
+    def journal_file(self, name: str) -> str:
+        return os.path.join(self.data_dir, f'{name}.journal.jsonl')
+
+    @staticmethod
+    def _file_signature(file_path: str) -> Optional[tuple]:
+        """文件签名：inode、修改时间（纳秒）与大小，文件不存在时为 None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _load_json(file_path: str, default: Callable[[], Any]) -> Any:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default()
+
+    def _read_json(self, file_path: str, default: Callable[[], Any] = list) -> Any:
+        """读取JSON文件；文件签名未变化时直接返回缓存的数据"""
+        signature = self._file_signature(file_path)
+        cached = self._cache.get(file_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        # 先取签名再读取：读取期间文件若被其他进程改写，下次读取时签名不符会再次加载
+        data = self._load_json(file_path, default)
+        self._cache[file_path] = (signature, data)
+        return data
+
+    @staticmethod
+    def _atomic_write(file_path: str, data: Any, durable: bool = False) -> tuple:
+        """
+        写入JSON文件（临时文件 + os.replace，其他进程不会读到写了一半的文件），返回替换后文件的签名。
+        durable=True 时替换前先 fsync，断电后也不会回到旧内容
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                if durable:
+                    os.fsync(f.fileno())
+                # 重命名不改变 inode 与修改时间，临时文件的签名即为替换后数据文件的签名
+                stat = os.fstat(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _write_json(self, file_path: str, data: Any):
+        """整体写入JSON文件，同时更新缓存"""
+        try:
+            signature = self._atomic_write(file_path, data)
+        except BaseException:
+            self._cache.pop(file_path, None)
+            raise
+        self._cache[file_path] = (signature, data)
+
+    # ---------- 集合与变更日志 ----------
+    def _is_current(self, name: str, collection: Optional[_Collection]) -> bool:
+        """缓存的集合是否与磁盘一致：数据文件签名未变，日志没有新增"""
+        if collection is None or collection.base_signature != self._file_signature(self.collection_file(name)):
+            return False
+        journal = self._file_signature(self.journal_file(name))
+        if journal is None:
+            return collection.journal_offset == 0
+        return journal[0] == collection.journal_inode and journal[2] == collection.journal_offset
+
+    @contextmanager
+    def _reading(self, name: str):
+        """
+        得到与磁盘一致的集合（块内持有该集合的内存锁）：缓存有效时只需两次 stat；
+        否则在共享文件锁下合并日志新增的部分或完整重新加载
+        """
+        memory_lock = self._memory_locks[name]
+        with memory_lock:
+            collection = self._collections.get(name)
+            if self._is_current(name, collection):
+                yield collection
+                return
+        with self.locks.shared(name), memory_lock:
+            yield self._refresh(name)
+
+    def _refresh(self, name: str) -> _Collection:
+        """数据文件变化（被压缩或外部修改）时完整加载，否则只合并日志新增的部分（调用方持有内存锁）"""
+        signature = self._file_signature(self.collection_file(name))
+        collection = self._collections.get(name)
+        if collection is None or collection.base_signature != signature or not self._replay(name, collection):
+            collection = self._collections[name] = self._load_collection(name, signature)
+        return collection
+
+    def _load_collection(self, name: str, signature: Optional[tuple]) -> _Collection:
+        key, indexed_fields = COLLECTIONS[name]
+        collection = _Collection(self._load_json(self.collection_file(name), list), key, indexed_fields)
+        # 先取签名再读取：读取期间数据文件若被替换，下次访问时签名不符会再次加载
+        collection.base_signature = signature
+        self._replay(name, collection)
+        return collection
+
+    @staticmethod
+    def _token(collection: _Collection) -> tuple:
+        """集合的变更标记：数据文件签名加日志位置，任何写入都会追加日志或替换数据文件"""
+        return collection.base_signature, collection.journal_inode, collection.journal_offset
+
+    def _replay(self, name: str, collection: _Collection) -> bool:
+        """
+        把日志中 journal_offset 之后的完整行应用到集合，并通知变更回调；
+        日志被压缩替换（inode 变化）或截短时返回 False，由调用方完整重新加载
+        """
+        before = self._token(collection)
+        try:
+            with open(self.journal_file(name), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if collection.journal_offset == 0:
+                    collection.journal_inode = stat.st_ino
+                elif stat.st_ino != collection.journal_inode or stat.st_size < collection.journal_offset:
+                    return False
+                f.seek(collection.journal_offset)
+                data = f.read(stat.st_size - collection.journal_offset)
+        except FileNotFoundError:
+            return collection.journal_offset == 0
+
+        # 只处理以换行结尾的完整行，写了一半的行留到下次读取
+        complete = data[:data.rfind(b'\n') + 1]
+        changes = {}
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 进程崩溃时残留的半行，其后的追加以换行开头，残行被隔离为单独的一行
+                continue
+            self._apply(collection, entry, changes)
+        collection.journal_offset += len(complete)
+        if self._token(collection) != before:
+            self._notify(name, before, self._token(collection), changes)
+        return True
+
+    @classmethod
+    def _apply(cls, collection: _Collection, entry: Dict, changes: Optional[Dict[Any, Optional[Dict]]] = None):
+        """应用一条日志变更；changes 给出时记下受影响的主键 -> 新记录（删除时为 None）"""
+        if entry.get('op') == 'put':
+            collection.upsert(entry['record'])
+            if changes is not None:
+                changes[entry['record'][collection.key]] = entry['record']
+        elif entry.get('op') == 'delete':
+            collection.delete(entry['key'])
+            if changes is not None:
+                changes[entry['key']] = None
+        elif entry.get('op') == 'batch':
+            for item in entry['entries']:
+                cls._apply(collection, item, changes)
+
+    def _append(self, name: str, collection: _Collection, entries: List[Dict]):
+        """
+        向日志追加变更（单次 write，O_APPEND 保证多进程追加不交错），随后应用到内存中的集合。
+        多条变更合为一行 batch，整行要么完整写入要么在重放时被忽略。
+        追加位置紧接在已合并的部分之后时直接前移 journal_offset；
+        否则说明其他进程在此之前追加过，留待下次访问时按文件顺序一并重放（put/delete 可重复应用）。
+        """
+        entry = entries[0] if len(entries) == 1 else {'op': 'batch', 'entries': entries}
+        data = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        fd = os.open(self.journal_file(name), os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+        try:
+            size = os.fstat(fd).st_size
+            if size:
+                # 上一行不完整（写入时崩溃）时先换行，避免本次追加与残行连成一行
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b'\n':
+                    data = b'\n' + data
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            end = os.lseek(fd, 0, os.SEEK_END)
+            inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+
+        before = self._token(collection)
+        changes = {}
+        for entry in entries:
+            self._apply(collection, entry, changes)
+        if end - len(data) == collection.journal_offset and (collection.journal_offset == 0
+                                                              or inode == collection.journal_inode):
+            collection.journal_offset = end
+            collection.journal_inode = inode
+            self._notify(name, before, self._token(collection), changes)
+        self._maybe_compact(name, collection)
+
+    def _maybe_compact(self, name: str, collection: _Collection):
+        """日志超过数据文件大小时在后台线程中压缩"""
+        base_size = collection.base_signature[2] if collection.base_signature else 0
+        if collection.journal_offset <= max(self.COMPACT_MIN_BYTES, base_size) or name in self._compacting:
+            return
+        self._compacting.add(name)
+        threading.Thread(target=self.compact, args=(name,), name=f'compact-{name}', daemon=True).start()
+
+    def compact(self, name: str):
+        """
+        把日志合并进数据文件：当前记录写入临时文件后原子替换数据文件，再用空文件替换日志。
+        持有该集合的排他文件锁，其他进程的读写在压缩完成后继续
+        """
+        try:
+            with self.lock, self.locks.exclusive(name):
+                with self._memory_locks[name]:
+                    collection = self._refresh(name)
+                    records = list(collection.records)
+                    before = self._token(collection)
+                signature = self._atomic_write(self.collection_file(name), records)
+                journal_file = self.journal_file(name)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(journal_file)), prefix='.tmp-')
+                inode = os.fstat(fd).st_ino
+                os.close(fd)
+                os.replace(tmp_path, journal_file)
+                with self._memory_locks[name]:
+                    collection.base_signature = signature
+                    collection.journal_offset = 0
+                    collection.journal_inode = inode
+                    # 内容不变，只是变更标记前移
+                    self._notify(name, before, self._token(collection), {})
+        finally:
+            self._compacting.discard(name)
+
+    # ---------- 事务 ----------
+    def _transaction(self) -> Optional[_Transaction]:
+        return getattr(self._local, 'transaction', None)
+
+    @contextmanager
+    def transaction(self):
+        """
+        事务期间持有 self.lock，本进程的其他写事务等待提交；其他线程只读到已提交的数据。
+        提交时每个集合追加一次日志；某个集合写入失败时，对已写入的集合追加反向变更恢复原状
+        """
+        if self._transaction() is not None:
+            yield
+            return
+        with self.lock:
+            transaction = self._local.transaction = _Transaction()
+            try:
+                yield
+            finally:
+                self._local.transaction = None
+            self._flush(transaction)
+
+    def _flush(self, transaction: _Transaction):
+        names = sorted(transaction.changes)
+        locked = sorted([*names, SETTINGS] if transaction.values or transaction.increments else names)
+        with ExitStack() as stack:
+            # 按名称顺序加锁，多个进程同时提交时不会互相等待成环
+            for name in locked:
+                stack.enter_context(self.locks.exclusive(name))
+            for name in names:
+                stack.enter_context(self._memory_locks[name])
+
+            # 先检查全部版本号，全部通过后再写入
+            batches = []
+            for name in names:
+                collection = self._refresh(name)
+                expected = transaction.expected.get(name, {})
+                entries, undo = [], []
+                for key, record in transaction.changes[name].items():
+                    current = collection.get(key)
+                    current_version = None if current is None else current.get(VERSION_FIELD, 0)
+                    if key in expected and expected[key] != current_version:
+                        raise ConflictError(name, key)
+                    if record is not None:
+                        record = dict(record)
+                        record[VERSION_FIELD] = (current_version or 0) + 1
+                    entries.append(self._entry(key, record))
+                    undo.append(self._entry(key, current))
+                batches.append((name, collection, entries, undo))
+
+            written = []
+            try:
+                for name, collection, entries, undo in batches:
+                    self._append(name, collection, entries)
+                    written.append((name, collection, undo))
+                if SETTINGS in locked:
+                    self._write_settings(transaction)
+            except BaseException:
+                for name, collection, undo in reversed(written):
+                    self._append(name, collection, undo)
+                raise
+
+    def _write_settings(self, transaction: _Transaction):
+        with self._memory_locks[SETTINGS]:
+            settings = dict(self._read_json(self.settings_file, dict))
+            settings.update(transaction.values)
+            for name, amount in transaction.increments.items():
+                settings[name] = settings.get(name, 0) + amount
+            self._write_json(self.settings_file, settings)
+
+    @staticmethod
+    def _entry(key: Any, record: Optional[Dict]) -> Dict:
+        return {'op': 'put', 'record': record} if record is not None else {'op': 'delete', 'key': key}
+
+    def _overlay(self, name: str, records: List[Dict], match: Callable[[Dict], bool] = None) -> List[Dict]:
+        """把当前事务中未提交的修改叠加到查询结果上（替换、删除，新出现的记录追加在末尾）"""
+        transaction = self._transaction()
+        changes = transaction.changes.get(name) if transaction else None
+        if not changes:
+            return list(records)
+        key = COLLECTIONS[name][0]
+        result = []
+        seen = set()
+        for record in records:
+            seen.add(record[key])
+            if record[key] in changes:
+                record = changes[record[key]]
+                if record is None or (match is not None and not match(record)):
+                    continue
+            result.append(record)
+        result.extend(record for k, record in changes.items()
+                      if k not in seen and record is not None and (match is None or match(record)))
+        return result
+
+    def all(self, name: str) -> List[Dict]:
+        with self._reading(name) as collection:
+            return self._overlay(name, collection.records)
+
+    def get(self, name: str, key: Any) -> Optional[Dict]:
+        transaction = self._transaction()
+        if transaction is not None and key in transaction.changes.get(name, ()):
+            record = transaction.changes[name][key]
+        else:
+            with self._reading(name) as collection:
+                record = collection.get(key)
+        if record is None:
+            return None
+        record = copy.deepcopy(record)
+        record.setdefault(VERSION_FIELD, 0)
+        return record
+
+    def get_many(self, name: str, keys: List[Any]) -> Dict[Any, Dict]:
+        transaction = self._transaction()
+        changes = transaction.changes.get(name, {}) if transaction else {}
+        records = {}
+        # 一次取得集合，逐个按主键索引查找
+        with self._reading(name) as collection:
+            for key in keys:
+                record = changes[key] if key in changes else collection.get(key)
+                if record is not None:
+                    records[key] = record
+        result = {}
+        for key, record in records.items():
+            record = result[key] = copy.deepcopy(record)
+            record.setdefault(VERSION_FIELD, 0)
+        return result
+
+    def find(self, name: str, field: str, value: Any) -> List[Dict]:
+        with self._reading(name) as collection:
+            return self._overlay(name, collection.find(field, value), lambda record: record.get(field) == value)
+
+    def _pending(self, name: str) -> bool:
+        transaction = self._transaction()
+        return transaction is not None and bool(transaction.changes.get(name))
+
+    def _view(self, name: str, sort: str, field: Optional[str], value: Any,
+              take: Callable[[List[Dict], List[Any]], Any]) -> Any:
+        """
+        对有序视图 (记录, 主键) 调用 take 并返回其结果；当前事务修改过该集合时按叠加后的结果现场排序。
+        缓存的视图会被后续写入就地修改，take 在持有内存锁时执行
+        """
+        if self._pending(name):
+            records = self.all(name) if field is None else self.find(name, field, value)
+            records = _sort_records(records, COLLECTIONS[name][0], sort)
+            return take(records, [record[COLLECTIONS[name][0]] for record in records])
+        with self._reading(name) as collection:
+            return take(*collection.view(sort, field, value))
+
+    def page(self, name: str, offset: int, limit: int, sort: Optional[str] = None, descending: bool = False,
+             field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        return self._view(name, _check_sort(name, sort), field, value,
+                          lambda records, keys: (_slice_page(records, offset, limit, descending), len(records)))
+
+    def page_after(self, name: str, after: Any, limit: int, descending: bool = False,
+                   field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        return self._view(name, COLLECTIONS[name][0], field, value,
+                          lambda records, keys: (_slice_after(records, keys, after, limit, descending), len(records)))
+
+    def put(self, name: str, record: Dict):
+        transaction = self._transaction()
+        if transaction is None:
+            with self.transaction():
+                return self.put(name, record)
+        key = record[COLLECTIONS[name][0]]
+        changes = transaction.changes.setdefault(name, {})
+        if key in changes:
+            # 同一事务内再次保存：须基于事务内读到的版本
+            buffered = changes[key]
+            if buffered is not None and record.get(VERSION_FIELD, 0) != buffered.get(VERSION_FIELD, 0):
+                raise ConflictError(name, key)
+        else:
+            transaction.expected.setdefault(name, {})[key] = record.get(VERSION_FIELD)
+        changes[key] = copy.deepcopy(record)
+
+    def delete(self, name: str, key: Any) -> bool:
+        transaction = self._transaction()
+        if transaction is None:
+            with self.transaction():
+                return self.delete(name, key)
+        if self.get(name, key) is None:
+            return False
+        transaction.changes.setdefault(name, {})[key] = None
+        return True
+
+    def get_value(self, name: str, default: Any = None) -> Any:
+        transaction = self._transaction()
+        if transaction is not None and name in transaction.values:
+            value = transaction.values[name]
+        else:
+            with self._memory_locks[SETTINGS]:
+                value = self._read_json(self.settings_file, dict).get(name, default)
+        if transaction is not None and name in transaction.increments:
+            value = (value or 0) + transaction.increments[name]
+        return value
+
+    def set_value(self, name: str, value: Any):
+        transaction = self._transaction()
+        if transaction is None:
+            with self.transaction():
+                return self.set_value(name, value)
+        transaction.values[name] = value
+        transaction.increments.pop(name, None)
+
+    def increment_value(self, name: str, amount: float) -> Any:
+        transaction = self._transaction()
+        if transaction is None:
+            with self.transaction():
+                self.increment_value(name, amount)
+            return self.get_value(name, 0)
+        transaction.increments[name] = transaction.increments.get(name, 0) + amount
+        return self.get_value(name, 0)
+
+    def version(self, name: str) -> Any:
+        with self._reading(name) as collection:
+            return self._token(collection)
+
+    def next_id(self, name: str) -> int:
+        """
+        sequences.json 记录各集合已分配的最大 ID，在排他文件锁下读取、加一并立即写回（fsync），
+        不参与事务，先于记录本身落盘，崩溃后也不会再分配已用过的 ID。
+        集合首次分配时从现有记录（含当前事务中未提交的）的最大 ID 开始
+        """
+        key = COLLECTIONS[name][0]
+        with self.locks.exclusive(SEQUENCES), self._memory_locks[SEQUENCES]:
+            sequences = self._load_json(self.sequences_file, dict)
+            if name not in sequences:
+                sequences[name] = max((record[key] for record in self.all(name)), default=0)
+            sequences[name] += 1
+            self._atomic_write(self.sequences_file, sequences, durable=True)
+            return sequences[name]
+
+
+class SQLiteStorage(Storage):
+    """SQLite 存储：每个集合一张表，主键与二级索引字段为独立列（带索引），完整记录以 JSON 存于 data 列
+
+    使用 WAL 日志模式，读写互不阻塞，多个工作进程可共用同一数据库文件；写入只涉及单行。
+    每个线程一个连接，SQL 语句在构造时生成、始终以参数绑定执行，由连接的语句缓存复用预编译结果。
+    """
+
+    # get_many 每条语句绑定的主键个数上限（旧版 SQLite 默认最多 999 个变量）
+    MAX_VARIABLES = 500
+
+    def __init__(self, db_path: str, import_dir: Optional[str] = None):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._sql: Dict[str, Dict[str, str]] = {}
+        for name, (key, indexed_fields) in COLLECTIONS.items():
+            columns = [key, *indexed_fields, 'data']
+            self._sql[name] = {
+                'all': f'SELECT data FROM {name} ORDER BY {key}',
+                'get': f'SELECT data FROM {name} WHERE {key} = ?',
+                'put': f'INSERT OR REPLACE INTO {name} ({", ".join(columns)}) '
+                       f'VALUES ({", ".join("?" for _ in columns)})',
+                'delete': f'DELETE FROM {name} WHERE {key} = ?',
+                **{f'find:{field}': f'SELECT data FROM {name} WHERE {field} = ? ORDER BY {key}'
+                   for field in indexed_fields},
+            }
+        self._create_schema()
+        if import_dir is not None:
+            migrate_json_to_sqlite(import_dir, self)
+
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的连接（自动提交模式，需要事务时显式 BEGIN）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self.connection()
+        for name, (key, indexed_fields) in COLLECTIONS.items():
+            columns = ''.join(f', {field}' for field in indexed_fields)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {name} ({key} INTEGER PRIMARY KEY{columns}, data TEXT NOT NULL)')
+            for field in indexed_fields:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{name}_{field} ON {name} ({field})')
+            for field in SORT_FIELDS[name]:
+                if field not in indexed_fields:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{name}_sort_{field} '
+                                 f'ON {name} ({self._sort_expression(name, field)}, {key})')
+        conn.execute('CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        # 各集合的变更计数，随每次写入在同一事务中加一
+        conn.execute('CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    def _row_values(self, name: str, record: Dict) -> tuple:
+        key, indexed_fields = COLLECTIONS[name]
+        return (record[key], *(record.get(field) for field in indexed_fields),
+                json.dumps(record, ensure_ascii=False))
+
+    def all(self, name: str) -> List[Dict]:
+        return [json.loads(data) for data, in self.connection().execute(self._sql[name]['all'])]
+
+    def get(self, name: str, key: Any) -> Optional[Dict]:
+        row = self.connection().execute(self._sql[name]['get'], (key,)).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row[0])
+        record.setdefault(VERSION_FIELD, 0)
+        return record
+
+    def get_many(self, name: str, keys: List[Any]) -> Dict[Any, Dict]:
+        key_field = COLLECTIONS[name][0]
+        keys = list(dict.fromkeys(keys))
+        result = {}
+        # 分批绑定参数，不超过 SQLite 单条语句的变量个数上限
+        for start in range(0, len(keys), self.MAX_VARIABLES):
+            chunk = keys[start:start + self.MAX_VARIABLES]
+            rows = self.connection().execute(
+                f'SELECT data FROM {name} WHERE {key_field} IN ({", ".join("?" for _ in chunk)})', chunk)
+            for data, in rows:
+                record = json.loads(data)
+                record.setdefault(VERSION_FIELD, 0)
+                result[record[key_field]] = record
+        return result
+
+    def find(self, name: str, field: str, value: Any) -> List[Dict]:
+        rows = self.connection().execute(self._sql[name][f'find:{field}'], (value,))
+        return [json.loads(data) for data, in rows]
+
+    @staticmethod
+    def _sort_expression(name: str, sort: str) -> str:
+        """排序字段对应的 SQL 表达式：主键与二级索引字段为列，其余从 data 中提取（有同样表达式的索引）"""
+        key, indexed_fields = COLLECTIONS[name]
+        if sort == key or sort in indexed_fields:
+            return sort
+        return f"json_extract(data, '$.{sort}')"
+
+    def _count(self, name: str, field: Optional[str], value: Any) -> int:
+        if field is None:
+            return self.connection().execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]
+        return self.connection().execute(f'SELECT COUNT(*) FROM {name} WHERE {field} = ?', (value,)).fetchone()[0]
+
+    def page(self, name: str, offset: int, limit: int, sort: Optional[str] = None, descending: bool = False,
+             field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        key = COLLECTIONS[name][0]
+        order = 'DESC' if descending else 'ASC'
+        where, params = (f'WHERE {field} = ?', [value]) if field is not None else ('', [])
+        expression = self._sort_expression(name, _check_sort(name, sort))
+        ordering = f'{expression} {order}' if expression == key else f'{expression} {order}, {key} {order}'
+        rows = self.connection().execute(f'SELECT data FROM {name} {where} ORDER BY {ordering} LIMIT ? OFFSET ?',
+                                         (*params, limit, offset))
+        return [json.loads(data) for data, in rows], self._count(name, field, value)
+
+    def page_after(self, name: str, after: Any, limit: int, descending: bool = False,
+                   field: Optional[str] = None, value: Any = None) -> Tuple[List[Dict], int]:
+        key = COLLECTIONS[name][0]
+        conditions, params = [], []
+        if field is not None:
+            conditions.append(f'{field} = ?')
+            params.append(value)
+        if after is not None:
+            conditions.append(f'{key} < ?' if descending else f'{key} > ?')
+            params.append(after)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self.connection().execute(
+            f'SELECT data FROM {name} {where} ORDER BY {key} {"DESC" if descending else "ASC"} LIMIT ?',
+            (*params, limit))
+        return [json.loads(data) for data, in rows], self._count(name, field, value)
+
+    def put(self, name: str, record: Dict):
+        key = record[COLLECTIONS[name][0]]
+        conn = self.connection()
+        # 读取当前版本与写入在同一个写事务中，其他连接无法插入
+        with self.transaction():
+            row = conn.execute(self._sql[name]['get'], (key,)).fetchone()
+            current_version = None if row is None else json.loads(row[0]).get(VERSION_FIELD, 0)
+            if record.get(VERSION_FIELD) != current_version:
+                raise ConflictError(name, key)
+            record = dict(record)
+            record[VERSION_FIELD] = (current_version or 0) + 1
+            conn.execute(self._sql[name]['put'], self._row_values(name, record))
+            self._record_change(name, key, record)
+            self._bump_version(name)
+
+    def delete(self, name: str, key: Any) -> bool:
+        with self.transaction():
+            deleted = self.connection().execute(self._sql[name]['delete'], (key,)).rowcount > 0
+            if deleted:
+                self._record_change(name, key, None)
+                self._bump_version(name)
+        return deleted
+
+    def _record_change(self, name: str, key: Any, record: Optional[Dict]):
+        """记下当前事务对集合的修改（须在 _bump_version 之前调用），提交后通知变更回调"""
+        changes = getattr(self._local, 'changes', None)
+        if changes is None:
+            return
+        if name not in changes:
+            changes[name] = (self.version(name), {})
+        changes[name][1][key] = record
+
+    def _bump_version(self, name: str):
+        self.connection().execute('INSERT INTO versions (name, value) VALUES (?, 1) '
+                                  'ON CONFLICT (name) DO UPDATE SET value = value + 1', (name,))
+
+    def version(self, name: str) -> Any:
+        row = self.connection().execute('SELECT value FROM versions WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def get_value(self, name: str, default: Any = None) -> Any:
+        row = self.connection().execute('SELECT value FROM settings WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_value(self, name: str, value: Any):
+        self.connection().execute('INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)',
+                                  (name, json.dumps(value, ensure_ascii=False)))
+
+    def increment_value(self, name: str, amount: float) -> Any:
+        with self.transaction():
+            value = (self.get_value(name) or 0) + amount
+            self.set_value(name, value)
+        return value
+
+    def next_id(self, name: str) -> int:
+        """sequences 表记录已分配的最大 ID；与主键上的 MAX 取较大者，重新导入数据后也不会重复"""
+        key = COLLECTIONS[name][0]
+        conn = self.connection()
+        with self.transaction():
+            row = conn.execute('SELECT value FROM sequences WHERE name = ?', (name,)).fetchone()
+            largest = conn.execute(f'SELECT MAX({key}) FROM {name}').fetchone()[0]
+            value = max(row[0] if row else 0, largest or 0) + 1
+            conn.execute('INSERT OR REPLACE INTO sequences (name, value) VALUES (?, ?)', (name, value))
+        return value
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE 开始写事务（立即取得写锁，避免读后升级写锁时的死锁），异常时 ROLLBACK；
+        提交后按集合通知变更回调
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        changes = self._local.changes = {}
+        try:
+            yield
+            versions = {name: self.version(name) for name in changes}
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            self._local.changes = None
+        conn.execute('COMMIT')
+        for name, (before, records) in changes.items():
+            self._notify(name, before, versions[name], records)
+
+
+def migrate_json_to_sqlite(data_dir: str, storage: SQLiteStorage, force: bool = False) -> bool:
+    """
+    一次性把 JSON 数据文件（users.json、products.json、orders.json、carts.json、reviews.json、shop_balance.json）
+    导入 SQLite；在单个事务中完成，完成后记录标记，之后不再重复导入（force=True 时强制重新导入）。
+    标记在取得写锁后再检查一次：多个工作进程同时启动时只有第一个导入，其余的看到标记后直接返回
+    """
+    conn = storage.connection()
+    if not force and storage.get_value('migrated_from_json') is not None:
+        return False
+
+    # 经 JSONStorage 读取，变更日志中尚未压缩进数据文件的修改一并导入
+    source = JSONStorage(data_dir)
+    with storage.transaction():
+        if not force and storage.get_value('migrated_from_json') is not None:
+            return False
+        for name in COLLECTIONS:
+            records = source.all(name)
+            conn.executemany(storage._sql[name]['put'], [storage._row_values(name, r) for r in records])
+            storage._bump_version(name)
+        for setting, value in _load_json_file(os.path.join(data_dir, SETTINGS_FILE), dict).items():
+            storage.set_value(setting, value)
+        storage.set_value('migrated_from_json', {
+            'data_dir': os.path.abspath(data_dir),
+            'migrated_at': datetime.now().isoformat()
+        })
+    return True
+
+
+def _load_json_file(file_path: str, default: Callable[[], Any]) -> Any:
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default()
+
+
+def sqlite_path_from_uri(uri: str) -> str:
+    """从 sqlite:///路径 形式的数据库 URI 中取出文件路径"""
+    prefix = 'sqlite:///'
+    if not uri.startswith(prefix):
+        raise ValueError(f'不支持的数据库 URI: {uri}')
+    return uri[len(prefix):]
+
+
+def create_storage(backend: str = 'json', data_dir: str = '.', database_uri: Optional[str] = None) -> Storage:
+    """
+    按配置创建存储后端：json 使用 data_dir 下的数据文件；
+    sqlite 使用 database_uri 指定的数据库，首次打开时自动从 data_dir 中的 JSON 数据文件导入
+    """
+    if backend == 'json':
+        return JSONStorage(data_dir)
+    if backend == 'sqlite':
+        if not database_uri:
+            raise ValueError('sqlite 存储需要配置 SQLALCHEMY_DATABASE_URI')
+        return SQLiteStorage(sqlite_path_from_uri(database_uri), import_dir=data_dir)
+    raise ValueError(f'未知的存储后端: {backend}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把 JSON 数据文件导入 SQLite 数据库')
+    parser.add_argument('--data-dir', default='.', help='JSON 数据文件所在目录')
+    parser.add_argument('--database', default=os.path.join('instance', 'ecommerce.db'), help='SQLite 数据库文件')
+    parser.add_argument('--force', action='store_true', help='已导入过时仍重新导入（按主键覆盖）')
+    args = parser.parse_args()
+
+    storage = SQLiteStorage(args.database)
+    if migrate_json_to_sqlite(args.data_dir, storage, force=args.force):
+        counts = ', '.join(f'{name}: {len(storage.all(name))}' for name in COLLECTIONS)
+        print(f'导入完成 -> {args.database}（{counts}）')
+    else:
+        print(f'{args.database} 已导入过，使用 --force 重新导入')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ import os
 import json
 import re
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 # 尝试导入配置中的正则，如果失败则使用本地健壮性定义
 try:
@@ -49,6 +49,75 @@ def parse_files_from_model_with_continuation(text: str) -> Dict[str, Dict[str, A
     return files
 
 
+# 检测步骤允许返回的文件类型
+DETECTABLE_EXTENSIONS = ('.py', '.html', '.js', '.css', '.json', '.md', '.txt')
+
+
+def parse_detected_files(text: str) -> List[Dict[str, str]]:
+    """
+    解析检测步骤的 JSON 输出：{"files": [{"path": "...", "reason": "..."}]}。
+    兼容 ```json 包裹、顶层直接为数组、数组元素为纯字符串等情况；无法解析时抛出 ValueError。
+    """
+    text = text.strip()
+    if text.startswith('```'):
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # 模型偶尔在 JSON 前后夹带文字：截取第一个对象/数组
+        m = re.search(r'(\{.*\}|\[.*\])', text, re.DOTALL)
+        if not m:
+            raise ValueError(f"检测结果不是 JSON: {text[:200]}")
+        data = json.loads(m.group(1))
+
+    items = data.get('files', []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError(f"检测结果缺少 files 数组: {text[:200]}")
+
+    detected: List[Dict[str, str]] = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path'].strip():
+            continue
+        detected.append({'path': item['path'].strip(), 'reason': str(item.get('reason', '')).strip()})
+    return detected
+
+
+def resolve_project_path(path: str, known_paths, strict: bool = False) -> Optional[str]:
+    """
+    将模型给出的路径解析为项目索引中的实际路径。
+    依次尝试：精确匹配 -> 规范化后匹配 -> 去掉多写的前缀目录后唯一匹配（如 generated_project/app.py）
+    -> 只给出文件名时按唯一文件名匹配（如 cart.html）；无法唯一确定时返回 None。
+    带目录的路径不会按文件名或更短的后缀匹配到其他目录下的文件（如 static/js/app.js 不是 frontend/app.js），
+    以免把要新建的文件当成已有文件覆盖。strict=True（如删除目标）时只接受精确或规范化后的匹配。
+    """
+    known = list(known_paths)
+    known_set = set(known)
+    if path in known_set:
+        return path
+
+    norm = path.replace('\\', '/').strip().strip('`"\'')
+    while norm.startswith('./'):
+        norm = norm[2:]
+    norm_map = {k.replace('\\', '/'): k for k in known}
+    if norm in norm_map:
+        return norm_map[norm]
+    if strict:
+        return None
+
+    # 模型多写了前缀目录：给出的路径以某个已有路径结尾
+    suffix = [k for nk, k in norm_map.items() if norm.endswith('/' + nk)]
+    if len(suffix) == 1:
+        return suffix[0]
+
+    if '/' not in norm:
+        by_name = [k for nk, k in norm_map.items() if nk.rsplit('/', 1)[-1] == norm]
+        if len(by_name) == 1:
+            return by_name[0]
+    return None
+
+
 def sanitize_path(p: str) -> str:
     """清理文件路径，防止路径遍历或绝对路径。"""
     p = os.path.normpath(p)
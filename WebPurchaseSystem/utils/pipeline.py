@@ -0,0 +1,127 @@
+# project_generator/utils/pipeline.py
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+class PipelineError(Exception):
+    pass
+
+
+class PipelineStage:
+    """流水线中的一个阶段：name 唯一，func 接收依赖阶段的结果（按 deps 顺序传入）。"""
+
+    def __init__(self, name: str, func: Callable[..., Any], deps: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+class PipelineResult:
+    """执行结果：各阶段返回值、起止时间以及关键路径。"""
+
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, Tuple[float, float]], critical_path: List[str]):
+        self.results = results
+        self.timings = timings
+        self.critical_path = critical_path
+
+    def duration(self, name: str) -> float:
+        start, end = self.timings[name]
+        return end - start
+
+    @property
+    def total_time(self) -> float:
+        if not self.timings:
+            return 0.0
+        return max(end for _, end in self.timings.values()) - min(start for start, _ in self.timings.values())
+
+    def report(self) -> str:
+        """生成可打印的耗时报告：每阶段耗时 + 关键路径。"""
+        lines = ["⏱ 阶段耗时："]
+        for name, (start, end) in sorted(self.timings.items(), key=lambda kv: kv[1][0]):
+            lines.append(f"   - {name}: {end - start:.2f}s")
+        path = " -> ".join(f"{n}({self.duration(n):.2f}s)" for n in self.critical_path)
+        lines.append(f"⏱ 关键路径: {path}，总耗时 {self.total_time:.2f}s")
+        return "\n".join(lines)
+
+
+def _validate(stages: Sequence[PipelineStage]) -> Dict[str, PipelineStage]:
+    by_name: Dict[str, PipelineStage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise PipelineError(f"阶段名称重复: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise PipelineError(f"阶段 {stage.name} 依赖未知阶段: {dep}")
+
+    # 检测环：Kahn 拓扑排序
+    indegree = {name: len(stage.deps) for name, stage in by_name.items()}
+    ready = [name for name, d in indegree.items() if d == 0]
+    visited = 0
+    while ready:
+        name = ready.pop()
+        visited += 1
+        for other in by_name.values():
+            if name in other.deps:
+                indegree[other.name] -= 1
+                if indegree[other.name] == 0:
+                    ready.append(other.name)
+    if visited != len(by_name):
+        raise PipelineError("流水线存在循环依赖")
+    return by_name
+
+
+def _critical_path(by_name: Dict[str, PipelineStage], timings: Dict[str, Tuple[float, float]]) -> List[str]:
+    """从最晚结束的阶段开始，沿最晚结束的依赖回溯，得到决定总耗时的阶段链。"""
+    if not timings:
+        return []
+    current = max(timings, key=lambda n: timings[n][1])
+    path = [current]
+    while by_name[current].deps:
+        current = max(by_name[current].deps, key=lambda n: timings[n][1])
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def run_pipeline(stages: Sequence[PipelineStage], max_workers: int = 4) -> PipelineResult:
+    """
+    以 DAG 方式执行各阶段：依赖全部完成的阶段立即并发提交，互不依赖的阶段同时运行。
+    任一阶段抛出异常时，不再提交新阶段，等待已运行阶段结束后抛出 PipelineError。
+    """
+    by_name = _validate(stages)
+    results: Dict[str, Any] = {}
+    timings: Dict[str, Tuple[float, float]] = {}
+    pending = dict(by_name)
+    running = {}
+
+    def _run(stage: PipelineStage):
+        start = time.perf_counter()
+        try:
+            return stage.func(*[results[d] for d in stage.deps])
+        finally:
+            timings[stage.name] = (start, time.perf_counter())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        failure = None
+        while pending or running:
+            if failure is None:
+                for name in [n for n, s in pending.items() if all(d in results for d in s.deps)]:
+                    running[executor.submit(_run, pending.pop(name))] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    if failure is None:
+                        failure = (name, e)
+        if failure is not None:
+            name, e = failure
+            raise PipelineError(f"阶段 {name} 执行失败: {e}") from e
+
+    return PipelineResult(results, timings, _critical_path(by_name, timings))
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# 生成的项目与 APIexplorer 均以裸模块名互相导入（from storage import ...），测试时加入搜索路径
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in ('WebPurchaseSystem/generated_project', 'WebPurchaseSystem/APIexplorer'):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def storage(request, tmp_path):
+    """两种存储后端各运行一次"""
+    from storage import JSONStorage, SQLiteStorage
+    if request.param == 'json':
+        return JSONStorage(str(tmp_path))
+    return SQLiteStorage(str(tmp_path / 'shop.db'))
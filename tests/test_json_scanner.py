@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from json_scanner import iter_json_spans, scan_json
+
+
+def test_array_items_use_character_offsets():
+    text = '[\n  {"name": "华为"},\n  "中文字符串",\n  42\n]\n'
+    spans = list(iter_json_spans(text))
+    assert [(kind, name) for kind, name, _, _ in spans] == [
+        ('json_item', 'item_0'), ('json_item', 'item_1'), ('json_item', 'item_2')]
+    assert [json.loads(text[start:end]) for _, _, start, end in spans] == [{'name': '华为'}, '中文字符串', 42]
+
+
+def test_object_fields_span_key_and_value():
+    text = '{"商品": [1, 2], "b\\u0022": {"x": null}}'
+    spans = list(iter_json_spans(text))
+    assert [name for _, name, _, _ in spans] == ['商品', 'b"']
+    _, _, start, end = spans[0]
+    assert text[start:end] == '"商品": [1, 2]'
+
+
+def test_scalars_and_empty_containers_produce_nothing():
+    assert list(iter_json_spans(' 3 ')) == []
+    assert list(iter_json_spans('[]')) == []
+    assert list(iter_json_spans('{ }')) == []
+
+
+@pytest.mark.parametrize('text', ['', '[1, 2', '[1 2]', '{"a" 1}', '{1: 2}', '[1] x', '{} {}'])
+def test_malformed_documents_raise(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_spans(text))
+
+
+def test_scan_json_records_lines():
+    text = '[\n  1,\n  {\n    "a": 2\n  }\n]'
+    first, second = scan_json(text, 'data.json')
+    assert (first.start_line, first.end_line) == (2, 2)
+    assert (second.start_line, second.end_line) == (3, 5)
+    assert json.loads(second.content) == {'a': 2}
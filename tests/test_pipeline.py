@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from WebPurchaseSystem.utils.pipeline import PipelineError, PipelineStage, run_pipeline
+
+
+def test_duplicate_stage_name():
+    with pytest.raises(PipelineError, match='重复'):
+        run_pipeline([PipelineStage('a', lambda: 1), PipelineStage('a', lambda: 2)])
+
+
+def test_unknown_dependency():
+    with pytest.raises(PipelineError, match='未知阶段'):
+        run_pipeline([PipelineStage('a', lambda x: x, deps=['missing'])])
+
+
+def test_cycle_is_rejected_before_running():
+    ran = []
+    stages = [
+        PipelineStage('start', lambda: ran.append('start')),
+        PipelineStage('a', lambda x, y: ran.append('a'), deps=['start', 'b']),
+        PipelineStage('b', lambda x: ran.append('b'), deps=['a']),
+    ]
+    with pytest.raises(PipelineError, match='循环依赖'):
+        run_pipeline(stages)
+    assert ran == []
+
+
+def test_results_flow_along_dependencies():
+    result = run_pipeline([
+        PipelineStage('sum', lambda left, right: left + right, deps=['left', 'right']),
+        PipelineStage('left', lambda: 2),
+        PipelineStage('right', lambda: 3),
+    ])
+    assert result.results == {'left': 2, 'right': 3, 'sum': 5}
+    assert result.critical_path[-1] == 'sum'
+
+
+def test_independent_stages_run_concurrently():
+    # 两个阶段互相等待对方开始：串行执行时会超时
+    barrier = threading.Barrier(2, timeout=5)
+    result = run_pipeline([
+        PipelineStage('a', lambda: barrier.wait()),
+        PipelineStage('b', lambda: barrier.wait()),
+    ])
+    assert set(result.results) == {'a', 'b'}
+
+
+def test_failure_stops_dependents():
+    ran = []
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(PipelineError, match='阶段 fail 执行失败') as info:
+        run_pipeline([
+            PipelineStage('fail', fail),
+            PipelineStage('after', lambda x: ran.append(x), deps=['fail']),
+        ])
+    assert isinstance(info.value.__cause__, ValueError)
+    assert ran == []
@@ -0,0 +1,65 @@
+from project_graph import DEFINED_IN, EXTENDS, FETCH, IMPORTS, RENDERS, STATIC, URL_FOR, ProjectGraph
+
+FILES = {
+    'app.py': '''
+from flask import Flask, render_template
+from database import db
+
+app = Flask(__name__)
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/cart/add/<int:product_id>', methods=['POST'])
+def add_to_cart(product_id):
+    return ''
+
+@app.route('/api/products')
+def api_products():
+    return ''
+''',
+    'database.py': 'db = None\n',
+    'templates/base.html': '<link rel="stylesheet" href="{{ url_for(\'static\', filename=\'css/site.css\') }}">',
+    'templates/index.html': '''{% extends "base.html" %}
+<form method="post" action="{{ url_for('add_to_cart', product_id=1) }}"></form>
+<script src="/static/js/list.js"></script>
+''',
+    'static/css/site.css': 'body { color: red; }',
+    'static/js/list.js': "fetch(`${base}/api/products`).then(r => r.json());",
+}
+
+
+def test_edges():
+    graph = ProjectGraph.build(FILES)
+    edges = set(graph.edges())
+    assert ('app.py', 'database.py', IMPORTS) in edges
+    assert ('route:index', 'app.py', DEFINED_IN) in edges
+    assert ('route:index', 'templates/index.html', RENDERS) in edges
+    assert ('templates/index.html', 'templates/base.html', EXTENDS) in edges
+    assert ('templates/index.html', 'route:add_to_cart', URL_FOR) in edges
+    assert ('templates/base.html', 'static/css/site.css', STATIC) in edges
+    assert ('templates/index.html', 'static/js/list.js', STATIC) in edges
+    assert ('static/js/list.js', 'route:api_products', FETCH) in edges
+
+
+def test_reverse_and_transitive_queries():
+    graph = ProjectGraph.build(FILES)
+    assert graph.dependents('database.py') == {'app.py'}
+    assert 'templates/base.html' in graph.dependencies('route:index', transitive=True)
+
+
+def test_match_url_and_mentions():
+    graph = ProjectGraph.build(FILES)
+    assert [r.endpoint for r in graph.match_url('/cart/add/${id}', 'POST')] == ['add_to_cart']
+    assert graph.match_url('/cart/add/1', 'GET') == []
+    assert graph.routes_mentioned('点击 /cart/add/3 后 index 页面报错') == ['route:index', 'route:add_to_cart']
+
+
+def test_related_files():
+    graph = ProjectGraph.build(FILES)
+    # 接受 POST 的路由带上提交到它的模板
+    assert graph.related_files(['route:add_to_cart']) == ['app.py', 'templates/index.html']
+    assert graph.related_files(['templates/index.html']) == [
+        'app.py', 'static/js/list.js', 'templates/base.html', 'templates/index.html']
+    assert graph.related_files(['static/js/list.js']) == ['app.py', 'static/js/list.js', 'templates/index.html']
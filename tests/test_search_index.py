@@ -0,0 +1,84 @@
+import pytest
+
+from search_index import SearchIndex, tokenize
+
+
+@pytest.fixture
+def db(storage, tmp_path, monkeypatch):
+    # database 模块导入时在当前目录创建默认的 DatabaseManager
+    monkeypatch.chdir(tmp_path)
+    from database import DatabaseManager
+    return DatabaseManager(str(tmp_path), storage)
+
+
+def add(db, name, category='', description=''):
+    return db.create_product(name, 100, 10, category, description)
+
+
+def names(result):
+    return [item['name'] for item in result['items']]
+
+
+def test_tokenize_splits_letters_and_digits():
+    assert tokenize('华为Mate27') == ['华为', '华', '为', 'mate', '27']
+    assert tokenize('iphone15') == tokenize('iPhone 15')
+
+
+def test_digits_match_chinese_suffix(db):
+    add(db, '27寸显示器')
+    add(db, '24寸显示器')
+    assert names(db.search_products('27')) == ['27寸显示器']
+    assert names(db.search_products('27寸')) == ['27寸显示器']
+
+
+def test_writes_update_only_changed_documents(db, monkeypatch):
+    phone = add(db, '华为mate27', '手机')
+    add(db, '小米手环', '穿戴')
+    assert names(db.search_products('mate')) == ['华为mate27']
+
+    # 首次查询之后不应再整体比对
+    def full_refresh(*args):
+        raise AssertionError('refresh should not run for writes made through this storage')
+    monkeypatch.setattr(db.search_index, 'refresh', full_refresh)
+
+    product = db.get_product_by_id(phone['id'])
+    product['name'] = '华为pura70'
+    db.save_product(product)
+    add(db, '荣耀平板', '平板')
+    assert names(db.search_products('mate')) == []
+    assert names(db.search_products('pura')) == ['华为pura70']
+    assert names(db.search_products('平板')) == ['荣耀平板']
+
+    db.delete_product(phone['id'])
+    assert names(db.search_products('华为')) == []
+    assert db.search_index.token == db.storage.version('products')
+
+
+def test_rolled_back_transaction_leaves_index_unchanged(db):
+    phone = add(db, '华为mate27')
+    db.search_products('mate')
+    with pytest.raises(RuntimeError):
+        with db.storage.transaction():
+            product = db.get_product_by_id(phone['id'])
+            product['name'] = '小米14'
+            db.save_product(product)
+            raise RuntimeError
+    assert names(db.search_products('mate')) == ['华为mate27']
+    assert names(db.search_products('小米')) == []
+
+
+def test_out_of_order_changes_fall_back_to_refresh():
+    index = SearchIndex()
+    index.refresh(1, [{'id': 1, 'name': '键盘', '_version': 1}])
+    # 缺少 1 -> 2 的变更，衔接不上时丢弃，索引保持原标记
+    index.on_change(2, 3, {1: {'id': 1, 'name': '鼠标', '_version': 3}})
+    index.catch_up()
+    assert index.token == 1
+    assert index.search('键盘', 10) == ([1], 1)
+
+    index.on_change(1, 2, {2: {'id': 2, 'name': '鼠标垫', '_version': 1}})
+    index.on_change(2, 3, {1: None})
+    index.catch_up()
+    assert index.token == 3
+    assert index.search('鼠标', 10) == ([2], 1)
+    assert index.search('键盘', 10) == ([], 0)
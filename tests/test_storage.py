@@ -0,0 +1,133 @@
+import pytest
+
+from storage import VERSION_FIELD, ConflictError, JSONStorage
+
+
+def product(product_id, name='商品', price=10):
+    return {'id': product_id, 'name': name, 'price': price, 'stock': 5, 'category': '默认'}
+
+
+def category_name(product_id):
+    return '偶数' if product_id % 2 == 0 else '奇数'
+
+
+def test_put_assigns_and_checks_versions(storage):
+    storage.put('products', product(1))
+    saved = storage.get('products', 1)
+    assert saved[VERSION_FIELD] == 1
+
+    # 不带版本号为插入，主键已存在时冲突
+    with pytest.raises(ConflictError):
+        storage.put('products', product(1))
+
+    stale = storage.get('products', 1)
+    saved['price'] = 20
+    storage.put('products', saved)
+    assert storage.get('products', 1)[VERSION_FIELD] == 2
+
+    stale['price'] = 30
+    with pytest.raises(ConflictError):
+        storage.put('products', stale)
+    assert storage.get('products', 1)['price'] == 20
+
+
+def test_get_returns_copy(storage):
+    storage.put('products', product(1))
+    record = storage.get('products', 1)
+    record['name'] = '已修改'
+    assert storage.get('products', 1)['name'] == '商品'
+
+
+def test_transaction_rolls_back_on_error(storage):
+    storage.put('products', product(1))
+    storage.set_value('balance', 100)
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.put('products', product(2))
+            storage.delete('products', 1)
+            storage.increment_value('balance', 50)
+            raise RuntimeError
+    assert storage.get('products', 2) is None
+    assert storage.get('products', 1) is not None
+    assert storage.get_value('balance') == 100
+
+
+def test_conflict_rolls_back_whole_transaction(storage):
+    storage.put('products', product(1))
+    stale = storage.get('products', 1)
+    fresh = storage.get('products', 1)
+    fresh['price'] = 20
+    storage.put('products', fresh)
+
+    with pytest.raises(ConflictError):
+        with storage.transaction():
+            storage.put('users', {'id': 1, 'username': 'alice', 'balance': 0})
+            stale['price'] = 30
+            storage.put('products', stale)
+    assert storage.get('users', 1) is None
+    assert storage.get('products', 1)['price'] == 20
+
+
+def test_version_changes_on_write(storage):
+    before = storage.version('products')
+    storage.put('products', product(1))
+    after = storage.version('products')
+    assert after != before
+    assert storage.version('products') == after
+
+
+def test_keyset_pagination(storage):
+    for product_id in range(1, 8):
+        storage.put('products', product(product_id))
+
+    pages, after = [], None
+    while True:
+        records, total = storage.page_after('products', after, 3)
+        if not records:
+            break
+        pages.append([r['id'] for r in records])
+        after = records[-1]['id']
+    assert pages == [[1, 2, 3], [4, 5, 6], [7]]
+    assert total == 7
+
+    records, _ = storage.page_after('products', 5, 3, descending=True)
+    assert [r['id'] for r in records] == [4, 3, 2]
+
+
+def test_keyset_pagination_with_filter(storage):
+    for product_id in range(1, 8):
+        record = product(product_id)
+        record['category'] = category_name(product_id)
+        storage.put('products', record)
+    records, total = storage.page_after('products', 1, 2, field='category', value='奇数')
+    assert [r['id'] for r in records] == [3, 5]
+    assert total == 4
+
+
+def test_paginate_follows_next_cursor(storage, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from database import DatabaseManager
+    db = DatabaseManager(str(tmp_path), storage)
+    for i in range(5):
+        db.create_product(f'商品{i}', 10, 1, '默认')
+
+    seen, cursor = [], 0
+    while cursor is not None:
+        result = db.get_products_page(per_page=2, cursor=cursor)
+        seen.extend(item['id'] for item in result['items'])
+        cursor = result['next_cursor']
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_json_storage_sees_writes_from_another_instance(tmp_path):
+    first = JSONStorage(str(tmp_path))
+    second = JSONStorage(str(tmp_path))
+    first.put('products', product(1))
+    assert second.get('products', 1)['name'] == '商品'
+
+    record = second.get('products', 1)
+    record['name'] = '新名称'
+    second.put('products', record)
+    assert first.get('products', 1)['name'] == '新名称'
+    first.compact('products')
+    assert second.get('products', 1)[VERSION_FIELD] == 2
@@ -0,0 +1,40 @@
+from symbol_index import SymbolIndex
+
+
+def build():
+    index = SymbolIndex()
+    index.add('DatabaseManager', 'class', 'database.py')
+    index.add('DatabaseManager.get_user_by_id', 'method', 'database.py')
+    index.add('get_user_by_id', 'helper', 'utils.py')
+    index.add('login', 'view', 'app.py')
+    return index
+
+
+def test_lookup_by_qualname_and_short_name():
+    index = build()
+    assert index.lookup('DatabaseManager.get_user_by_id') == ['method']
+    # 同名元素不会互相覆盖，限定名优先
+    assert index.lookup('get_user_by_id') == ['helper', 'method']
+    assert len(index) == 4
+
+
+def test_complete_is_case_insensitive_and_sorted():
+    index = build()
+    assert index.complete('data') == ['DatabaseManager', 'DatabaseManager.get_user_by_id']
+    assert index.complete('zzz') == []
+
+
+def test_fuzzy_tolerates_typos():
+    index = build()
+    names = [name for name, _ in index.fuzzy('get_usr_by_id')]
+    assert 'get_user_by_id' in names
+    assert index.search('logn') == ['view']
+
+
+def test_remove_file():
+    index = build()
+    assert index.remove_file('database.py') == 2
+    assert index.lookup('get_user_by_id') == ['helper']
+    assert index.lookup('DatabaseManager') == []
+    assert index.complete('data') == []
+    assert len(index) == 2